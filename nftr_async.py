@@ -0,0 +1,200 @@
+import asyncio
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from nftr_fetch import should_read, CHUNK_SIZE
+from nftr_http2 import StageTrace, http2_available, httpx
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+
+class AsyncResponse:
+    def __init__(self, url, status_code, headers, content):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.encoding = get_encoding_from_headers(headers) or 'utf-8'
+        
+    @property
+    def text(self):
+        try:
+            return self.content.decode(self.encoding, errors='replace')
+        except LookupError:
+            return self.content.decode('utf-8', errors='replace')
+
+
+class AsyncFetchEngine:
+    def __init__(self, crawler):
+        if aiohttp is None:
+            raise RuntimeError("The async engine requires aiohttp (pip install aiohttp)")
+        self.crawler = crawler
+        self.frontier = crawler.frontier
+        self.wakeup = None
+        self.loop = None
+        self.http2 = crawler.http2 and not getattr(crawler, 'proxies', None)
+        if self.http2 and not http2_available():
+            raise RuntimeError("HTTP/2 requires httpx with h2 (pip install 'httpx[http2]')")
+        
+    def run(self):
+        asyncio.run(self.crawl())
+        
+    async def crawl(self):
+        self.wakeup = asyncio.Event()
+        self.loop = asyncio.get_running_loop()
+        self.frontier.listeners.append(self.wake)
+        try:
+            async with self.open_session() as session:
+                tasks = set()
+                while True:
+                    item = self.frontier.get(block=False)
+                    if item is None:
+                        if self.frontier.finished:
+                            break
+                        self.wakeup.clear()
+                        try:
+                            await asyncio.wait_for(self.wakeup.wait(), self.frontier.next_ready_delay())
+                        except asyncio.TimeoutError:
+                            pass
+                        continue
+                    task = asyncio.create_task(self.crawl_page(session, *item))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+        finally:
+            self.frontier.listeners.remove(self.wake)
+            
+    def open_session(self):
+        headers = dict(self.crawler.session.headers)
+        pool_size = self.crawler.pool_size or 0
+        if self.http2:
+            limits = httpx.Limits(max_connections=self.frontier.max_in_flight,
+                                  max_keepalive_connections=self.frontier.max_in_flight)
+            return httpx.AsyncClient(http2=True, limits=limits, timeout=self.crawler.timeout, headers=headers,
+                                     follow_redirects=True)
+        connector = aiohttp.TCPConnector(limit=self.frontier.max_in_flight, limit_per_host=pool_size, ttl_dns_cache=300)
+        timeout = aiohttp.ClientTimeout(total=self.crawler.timeout)
+        return aiohttp.ClientSession(connector=connector, timeout=timeout, headers=headers,
+                                     trace_configs=[self.trace_config()])
+        
+    def trace_config(self):
+        trace = aiohttp.TraceConfig()
+        trace.on_request_start.append(self.on_request_start)
+        trace.on_connection_create_start.append(self.on_connection_create_start)
+        trace.on_dns_resolvehost_start.append(self.on_dns_resolvehost_start)
+        trace.on_dns_resolvehost_end.append(self.on_dns_resolvehost_end)
+        trace.on_connection_create_end.append(self.on_connection_create_end)
+        trace.on_request_end.append(self.on_request_end)
+        return trace
+        
+    async def on_request_start(self, session, context, params):
+        context.request_start = self.loop.time()
+        context.dns = 0.0
+        self.crawler.metrics.count_request()
+        
+    async def on_connection_create_start(self, session, context, params):
+        context.connection_start = self.loop.time()
+        
+    async def on_dns_resolvehost_start(self, session, context, params):
+        context.dns_start = self.loop.time()
+        
+    async def on_dns_resolvehost_end(self, session, context, params):
+        context.dns = self.loop.time() - context.dns_start
+        self.crawler.metrics.observe('dns', context.dns)
+        
+    async def on_connection_create_end(self, session, context, params):
+        self.crawler.metrics.observe('connect', self.loop.time() - context.connection_start - context.dns)
+        self.crawler.metrics.count_connection()
+        
+    async def on_request_end(self, session, context, params):
+        self.crawler.metrics.observe('ttfb', self.loop.time() - context.request_start)
+        
+    def wake(self):
+        self.loop.call_soon_threadsafe(self.wakeup.set)
+        
+    async def fetch(self, session, url):
+        if self.http2:
+            return await self.fetch_http2(session, url)
+        proxy = None
+        if hasattr(self.crawler, 'get_random_proxy'):
+            proxy = self.crawler.get_random_proxy()
+        async with session.get(url, proxy=proxy, headers=self.crawler.request_headers(url)) as resp:
+            headers = CaseInsensitiveDict()
+            for key, value in resp.headers.items():
+                if key in headers:
+                    headers[key] = f"{headers[key]}, {value}"
+                else:
+                    headers[key] = value
+            return await self.receive(str(resp.url), resp.status, headers, resp.content.iter_chunked(CHUNK_SIZE))
+            
+    async def fetch_http2(self, session, url):
+        self.crawler.metrics.count_request()
+        started = self.loop.time()
+        request = session.build_request('GET', url, headers=self.crawler.request_headers(url),
+                                        extensions={'trace': StageTrace(self.crawler.metrics).atrace})
+        resp = await session.send(request, stream=True)
+        try:
+            self.crawler.metrics.observe('ttfb', self.loop.time() - started)
+            headers = CaseInsensitiveDict(resp.headers.items())
+            return await self.receive(str(resp.url), resp.status_code, headers, resp.aiter_bytes(CHUNK_SIZE))
+        finally:
+            await resp.aclose()
+            
+    async def receive(self, url, status, headers, chunks):
+        max_bytes = self.crawler.max_bytes
+        if status == 200 and not should_read(headers, max_bytes):
+            self.crawler.record_skipped()
+            return None
+        started = self.loop.time()
+        content = await self.read_body(chunks, max_bytes)
+        self.crawler.metrics.observe('download', self.loop.time() - started)
+        if content is None:
+            if status == 200:
+                self.crawler.record_skipped()
+                return None
+            content = b''
+        self.crawler.metrics.add_bytes(len(content))
+        return AsyncResponse(url, status, headers, content)
+        
+    async def read_body(self, chunks, max_bytes):
+        body = bytearray()
+        async for chunk in chunks:
+            body += chunk
+            if max_bytes and len(body) > max_bytes:
+                return None
+        return bytes(body)
+            
+    async def crawl_page(self, session, url, depth):
+        crawler = self.crawler
+        loop = asyncio.get_running_loop()
+        fetched = False
+        retry = None
+        try:
+            if depth > crawler.max_depth or not await loop.run_in_executor(None, crawler.can_fetch, url):
+                return None
+            crawl_delay = await loop.run_in_executor(None, crawler.get_crawl_delay, url)
+            self.frontier.set_crawl_delay(url, crawl_delay)
+                
+            fetched = True
+            started = self.loop.time()
+            response = await self.fetch(session, url)
+            if response is None:
+                return None
+            retry = crawler.check_response(url, response, self.loop.time() - started)
+            if retry is not None:
+                return None
+            extracted_data = await loop.run_in_executor(None, crawler.process_response, url, response)
+            if extracted_data:
+                for link_url, link_depth in crawler.discover_links(url, depth, extracted_data):
+                    crawler.enqueue(link_url, link_depth)
+            return extracted_data
+        except Exception as e:
+            retry = crawler.check_error(url, e)
+        finally:
+            if retry is not None:
+                self.frontier.retry(url, depth, *retry)
+            else:
+                self.frontier.task_done(url, fetched)
+            self.wakeup.set()
+        return None
@@ -0,0 +1,318 @@
+import argparse
+import importlib
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+CRAWLERS = {
+    'basic': ('nftr_crawler', 'NetrCrawler'),
+    'advanced': ('nftr_advanced', 'NetrAdvancedCrawler')
+}
+ENGINES = ('thread', 'async')
+PARSERS = ('html.parser', 'lxml', 'selectolax')
+STAGES = ('queue_wait', 'ttfb', 'download', 'parse', 'extract')
+WORDS = ('crawler', 'network', 'page', 'index', 'archive', 'signal', 'vector', 'market', 'river', 'engine',
+         'harbor', 'lantern', 'orbit', 'meadow', 'copper', 'summit', 'canvas', 'thread', 'beacon', 'quartz')
+
+
+class SyntheticSite:
+    def __init__(self, pages=1000, fanout=5, page_size=8192, latency=0.0, error_rate=0.0, hosts=1, port=0, seed=0):
+        self.pages = pages
+        self.fanout = fanout
+        self.page_size = page_size
+        self.latency = latency
+        self.error_rate = error_rate
+        self.hosts = hosts
+        self.port = port
+        self.seed = seed
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.servers = []
+        self.ports = []
+        
+    def config(self):
+        return {'pages': self.pages, 'fanout': self.fanout, 'page_size': self.page_size, 'latency': self.latency,
+                'error_rate': self.error_rate, 'hosts': self.hosts, 'seed': self.seed}
+        
+    def host(self, page):
+        return f"127.0.0.1:{self.ports[page % self.hosts]}"
+        
+    def url(self, page=0):
+        return f"http://{self.host(page)}/page/{page}"
+        
+    def random(self, page):
+        return random.Random(self.seed * 1000003 + page)
+        
+    def links(self, page):
+        rng = self.random(page)
+        links = [child for child in range(page * self.fanout + 1, page * self.fanout + self.fanout + 1) if child < self.pages]
+        links += [rng.randrange(self.pages) for _ in range(max(1, self.fanout // 2))]
+        return links
+        
+    def is_error(self, page):
+        return page != 0 and self.random(page).random() < self.error_rate
+        
+    def render(self, page):
+        rng = self.random(page)
+        parts = [
+            f'<html><head><title>Page {page}</title>',
+            f'<meta name="description" content="Synthetic page {page}"></head><body>',
+            f'<h1>Page {page}</h1><p>Contact: page{page}@example.com</p><ul>'
+        ]
+        parts.extend(f'<li><a href="{self.url(link)}">Page {link}</a></li>' for link in self.links(page))
+        parts.append('</ul>')
+        size = sum(len(part) for part in parts)
+        while size < self.page_size:
+            paragraph = '<p>' + ' '.join(rng.choice(WORDS) for _ in range(60)) + '</p>'
+            parts.append(paragraph)
+            size += len(paragraph)
+        parts.append('</body></html>')
+        return ''.join(parts).encode('utf-8')
+        
+    def start(self):
+        for index in range(self.hosts):
+            server = SiteServer(('127.0.0.1', self.port + index if self.port else 0), SiteHandler, self)
+            self.servers.append(server)
+            self.ports.append(server.server_address[1])
+            threading.Thread(target=server.serve_forever, name=f'netr-bench-site-{index}', daemon=True).start()
+        return self
+        
+    def stop(self):
+        for server in self.servers:
+            server.shutdown()
+            server.server_close()
+        self.servers = []
+        self.ports = []
+
+
+class SiteServer(ThreadingHTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    request_queue_size = 1024
+    
+    def __init__(self, address, handler, site):
+        super().__init__(address, handler)
+        self.site = site
+        
+    def handle_error(self, request, client_address):
+        if not isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            super().handle_error(request, client_address)
+
+
+class SiteHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    
+    def do_GET(self):
+        site = self.server.site
+        with site.lock:
+            site.requests += 1
+        if site.latency:
+            time.sleep(site.latency)
+        if self.path == '/robots.txt':
+            self.reply(200, b'User-agent: *\nDisallow:\n', 'text/plain')
+            return
+        try:
+            page = int(self.path[len('/page/'):]) if self.path.startswith('/page/') else -1
+        except ValueError:
+            page = -1
+        if not 0 <= page < site.pages:
+            self.reply(404, b'Not Found', 'text/plain')
+        elif site.is_error(page):
+            self.reply(500, b'Internal Server Error', 'text/plain')
+        else:
+            self.reply(200, site.render(page), 'text/html; charset=utf-8')
+            
+    def reply(self, status, body, content_type):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        
+    def log_message(self, format, *args):
+        pass
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def run_case(case):
+    module_name, class_name = CRAWLERS[case['crawler']]
+    crawler_class = getattr(importlib.import_module(module_name), class_name)
+    stdout = sys.stdout
+    sys.stdout = open(os.devnull, 'w')
+    try:
+        crawler = crawler_class()
+        crawler.max_pages = case['pages']
+        crawler.max_depth = case['pages']
+        crawler.delay = case['delay']
+        crawler.parser = case['parser']
+        crawler.max_threads = case['threads']
+        crawler.concurrency = case['concurrency']
+        crawler.host_concurrency = case['host_concurrency']
+        cpu_start = time.process_time()
+        start = time.perf_counter()
+        crawler.start_crawling(case['url'], engine=case['engine'])
+        elapsed = time.perf_counter() - start
+        cpu = time.process_time() - cpu_start
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+    metrics = crawler.metrics
+    latency = {}
+    for stage in STAGES:
+        histogram = metrics.histograms[stage]
+        if histogram.count:
+            latency[stage] = {'p50': histogram.quantile(0.5) * 1000, 'p99': histogram.quantile(0.99) * 1000}
+    pages = crawler.frontier.pages
+    return {
+        'pages': pages,
+        'records': len(crawler.results),
+        'seconds': elapsed,
+        'pages_per_second': pages / elapsed if elapsed else 0.0,
+        'cpu_seconds': cpu,
+        'cpu_percent': cpu / elapsed * 100 if elapsed else 0.0,
+        'peak_rss_mb': peak_rss_mb(),
+        'bytes': metrics.bytes,
+        'responses': {str(code): count for code, count in sorted(metrics.responses.items())},
+        'errors': sum(metrics.errors.values()),
+        'latency_ms': latency
+    }
+
+
+def spawn_case(case):
+    here = os.path.dirname(os.path.abspath(__file__))
+    process = subprocess.run([sys.executable, os.path.abspath(__file__), '--run-case', json.dumps(case)],
+                             cwd=here, capture_output=True, text=True)
+    if process.returncode != 0:
+        lines = process.stderr.strip().splitlines()
+        return {'error': lines[-1] if lines else f"exit status {process.returncode}"}
+    return json.loads(process.stdout.strip().splitlines()[-1])
+
+
+def case_key(result):
+    return f"{result['crawler']}/{result['engine']}/{result['parser']}"
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=os.path.dirname(os.path.abspath(__file__)),
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def format_result(result):
+    if 'error' in result:
+        return f"{case_key(result):<32} failed: {result['error']}"
+    ttfb = result['latency_ms'].get('ttfb', {})
+    rss = f"{result['peak_rss_mb']:.0f} MB" if result['peak_rss_mb'] is not None else 'n/a'
+    return (f"{case_key(result):<32} {result['pages']:>6} pages  {result['pages_per_second']:>8.1f} pages/s  "
+            f"ttfb p50 {ttfb.get('p50', 0):.1f}ms p99 {ttfb.get('p99', 0):.1f}ms  "
+            f"cpu {result['cpu_percent']:.0f}%  rss {rss}")
+
+
+def compare(results, baseline_path):
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    previous = {case_key(result): result for result in baseline['results'] if 'error' not in result}
+    print(f"\nCompared with {baseline_path} (commit {baseline.get('commit')}):")
+    for result in results:
+        before = previous.get(case_key(result))
+        if before is None or 'error' in result or not before['pages_per_second']:
+            continue
+        change = (result['pages_per_second'] / before['pages_per_second'] - 1) * 100
+        print(f"{case_key(result):<32} {before['pages_per_second']:>8.1f} -> {result['pages_per_second']:>8.1f} pages/s ({change:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Netr Crawler Benchmark - crawls a local synthetic site')
+    parser.add_argument('--pages', type=int, default=500, help='Pages on the synthetic site (default: 500)')
+    parser.add_argument('--fanout', type=int, default=5, help='Links from each page to new pages (default: 5)')
+    parser.add_argument('--page-size', type=int, default=8192, help='Approximate size of each page in bytes (default: 8192)')
+    parser.add_argument('--latency', type=float, default=0.005, help='Seconds the server waits before each response (default: 0.005)')
+    parser.add_argument('--error-rate', type=float, default=0.01, help='Fraction of pages answered with HTTP 500 (default: 0.01)')
+    parser.add_argument('--hosts', type=int, default=4, help='Virtual hosts the pages are spread across, one 127.0.0.1 port each (default: 4)')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for the generated site (default: 0)')
+    parser.add_argument('--crawlers', default='basic,advanced', help='Crawlers to run (default: basic,advanced)')
+    parser.add_argument('--engines', default='thread,async', help='Fetch engines to run (default: thread,async)')
+    parser.add_argument('--parsers', default='html.parser,lxml,selectolax', help='HTML parsers to run (default: html.parser,lxml,selectolax)')
+    parser.add_argument('--threads', type=int, default=50, help='Threads for the thread engine (default: 50)')
+    parser.add_argument('--concurrency', type=int, default=200, help='Requests in flight for the async engine (default: 200)')
+    parser.add_argument('--host-concurrency', type=int, default=16, help='Maximum concurrent requests per host (default: 16)')
+    parser.add_argument('--delay', type=float, default=0.0, help='Minimum delay between requests to the same host (default: 0)')
+    parser.add_argument('--repeat', type=int, default=1, help='Runs of each combination (default: 1)')
+    parser.add_argument('-o', '--output', default='netr_bench.json', help='Where to write the results (default: netr_bench.json)')
+    parser.add_argument('--compare', help='Earlier results file to compare pages/sec against')
+    parser.add_argument('--run-case', help=argparse.SUPPRESS)
+    
+    args = parser.parse_args()
+    if args.run_case:
+        print(json.dumps(run_case(json.loads(args.run_case))))
+        return
+    crawlers = [name.strip() for name in args.crawlers.split(',') if name.strip()]
+    engines = [name.strip() for name in args.engines.split(',') if name.strip()]
+    parsers = [name.strip() for name in args.parsers.split(',') if name.strip()]
+    for label, names, available in (('crawlers', crawlers, tuple(CRAWLERS)), ('engines', engines, ENGINES),
+                                    ('parsers', parsers, PARSERS)):
+        unknown = [name for name in names if name not in available]
+        if unknown:
+            parser.error(f"unknown {label}: {', '.join(unknown)} (available: {', '.join(available)})")
+        
+    site = SyntheticSite(args.pages, args.fanout, args.page_size, args.latency, args.error_rate, args.hosts, seed=args.seed).start()
+    print(f"Synthetic site: {site.url()} ({args.pages} pages across {args.hosts} hosts)")
+    results = []
+    started = datetime.now().isoformat()
+    try:
+        for crawler in crawlers:
+            for engine in engines:
+                for parser_name in parsers:
+                    for run in range(args.repeat):
+                        case = {'url': site.url(), 'crawler': crawler, 'engine': engine, 'parser': parser_name,
+                                'pages': args.pages, 'threads': args.threads, 'concurrency': args.concurrency,
+                                'host_concurrency': args.host_concurrency, 'delay': args.delay}
+                        requests_before = site.requests
+                        result = spawn_case(case)
+                        result.update(crawler=crawler, engine=engine, parser=parser_name, run=run,
+                                      requests=site.requests - requests_before)
+                        results.append(result)
+                        print(format_result(result))
+    finally:
+        site.stop()
+        
+    report = {
+        'commit': git_commit(),
+        'started': started,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'site': site.config(),
+        'settings': {'threads': args.threads, 'concurrency': args.concurrency,
+                     'host_concurrency': args.host_concurrency, 'delay': args.delay},
+        'results': results
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.output}")
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+class ResponseCache:
+    def __init__(self, cache_dir, variant=''):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.path = os.path.join(cache_dir, 'http_cache.db')
+        self.variant = variant
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.not_modified = 0
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                digest TEXT NOT NULL,
+                variant TEXT NOT NULL,
+                record TEXT NOT NULL,
+                updated REAL
+            )
+        ''')
+        self.conn.commit()
+        
+    def lookup(self, url):
+        with self.lock:
+            return self.conn.execute('SELECT etag, last_modified, digest, record FROM responses WHERE url = ? AND variant = ?',
+                                     (url, self.variant)).fetchone()
+            
+    def conditional_headers(self, url):
+        entry = self.lookup(url)
+        if entry is None:
+            return None
+        etag, last_modified = entry[0], entry[1]
+        headers = {}
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+        return headers or None
+        
+    def digest(self, content):
+        return hashlib.sha256(content).hexdigest()
+        
+    def reuse(self, url, response):
+        entry = self.lookup(url)
+        if entry is None:
+            return None
+        if response.status_code == 304:
+            with self.lock:
+                self.not_modified += 1
+            return json.loads(entry[3])
+        digest = self.digest(response.content) if response.status_code == 200 else None
+        if digest == entry[2]:
+            self.store(url, response, entry[3], digest)
+            with self.lock:
+                self.hits += 1
+            return json.loads(entry[3])
+        return None
+        
+    def store(self, url, response, record, digest=None):
+        if not isinstance(record, str):
+            record = json.dumps(record, ensure_ascii=False)
+        row = (url, response.headers.get('ETag'), response.headers.get('Last-Modified'),
+               digest or self.digest(response.content), self.variant, record, time.time())
+        with self.lock:
+            self.conn.execute('INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)', row)
+            self.conn.commit()
+            
+    def close(self):
+        with self.lock:
+            self.conn.commit()
+            self.conn.close()
@@ -0,0 +1,663 @@
+import functools
+import os
+import queue
+import sys
+import threading
+import time
+import urllib.parse
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from nftr_async import AsyncFetchEngine
+from nftr_frontier import CrawlFrontier
+from nftr_dedupe import DuplicateIndex, simhash
+from nftr_fetch import (should_read, read_body, has_binary_extension, is_transient_error, parse_retry_after,
+                        backoff_delay, RETRY_STATUSES, THROTTLE_STATUSES)
+from nftr_pool import ParsePool, extract_page
+from nftr_metrics import CrawlMetrics, TimedHTTPAdapter, MetricsServer, ProgressReporter
+from nftr_http2 import Http2Adapter, http2_available
+from nftr_extract import ExtractionPipeline
+from nftr_urls import UrlCanonicalizer, TRACKING_PARAMS
+from nftr_priority import PriorityScorer, WEIGHTS
+from nftr_sitemaps import SitemapSeeder, parse_lastmod
+from nftr_state import CrawlState
+from nftr_cache import ResponseCache
+from nftr_visited import VisitedSet, is_spill_file
+from nftr_scope import CrawlScope, SCOPES
+from nftr_distributed import Partition, open_backend, run_coordinator
+from nftr_sinks import JsonSink, JsonLinesSink, CsvSink, SqliteSink
+
+
+class CrawlerCore:
+    def __init__(self):
+        self.session = requests.Session()
+        self.visited_urls = set()
+        self.visited_factory = set
+        self.frontier = None
+        self.results = []
+        self.keep_results = True
+        self.output_name = 'netr_results'
+        self.summary_view = 'crawled_data'
+        self.sink = None
+        self.state = None
+        self.cache = None
+        self.response_fields = ()
+        self.body_fields = ()
+        self.duplicates = DuplicateIndex()
+        self.canonicalizer = UrlCanonicalizer()
+        self.scope = None
+        self.scorer = PriorityScorer()
+        self.sitemaps = False
+        self.sitemap_since = None
+        self.sitemap_seeder = None
+        self.metrics = CrawlMetrics()
+        self.session.mount('http://', TimedHTTPAdapter(self.metrics))
+        self.session.mount('https://', TimedHTTPAdapter(self.metrics))
+        self.stats_lock = threading.Lock()
+        self.max_bytes = 10 * 1024 * 1024
+        self.skip_binary_links = False
+        self.engine = 'thread'
+        self.concurrency = 500
+        self.host_concurrency = 8
+        self.pool_size = None
+        self.adaptive = True
+        self.max_retries = 3
+        self.retry_backoff = 0.5
+        self.max_retry_delay = 120.0
+        self.http2 = False
+        self.parser = 'html.parser'
+        self.parse_workers = 0
+        self.parse_pool = None
+        self.partition = None
+        self.fields = None
+        self.pipeline = None
+        self.on_page = None
+        self.on_error = None
+        self.on_finish = None
+        
+    def configure_transport(self):
+        pool_size = self.pool_size or self.host_concurrency
+        pool_count = max(10, self.max_threads)
+        http_adapter = TimedHTTPAdapter(self.metrics, pool_connections=pool_count, pool_maxsize=pool_size)
+        https_adapter = http_adapter
+        if self.http2:
+            https_adapter = Http2Adapter(self.metrics, max_connections=pool_count * pool_size,
+                                         pool_connections=pool_count, pool_maxsize=pool_size)
+        for adapter in set(self.session.adapters.values()):
+            adapter.close()
+        self.session.mount('http://', http_adapter)
+        self.session.mount('https://', https_adapter)
+        
+    def check_robots_txt(self, base_url):
+        return self.robots.get(base_url)
+        
+    def can_fetch(self, url, user_agent='*'):
+        return self.robots.can_fetch(url, user_agent)
+        
+    def get_crawl_delay(self, url, user_agent='*'):
+        return self.robots.crawl_delay(url, user_agent)
+        
+    def get_pipeline(self):
+        fields = None if self.fields is None else set(self.fields) | {'links'}
+        if self.pipeline is None or self.pipeline.fields != fields:
+            self.pipeline = ExtractionPipeline(self.extraction_stages(), fields)
+        return self.pipeline
+        
+    def extract_data(self, html, url, response=None):
+        extracted = self.new_record(url, response)
+        if self.parse_pool:
+            extracted, parse_seconds, extract_seconds = self.parse_pool.extract(html, extracted)
+        else:
+            extracted, parse_seconds, extract_seconds = extract_page(self.get_pipeline(), self.parser, html, extracted)
+        self.metrics.observe('parse', parse_seconds)
+        self.metrics.observe('extract', extract_seconds)
+        return extracted
+        
+    def request_options(self, url):
+        return {}
+        
+    def crawl_page(self, url, depth=0):
+        fetched = False
+        retry = None
+        try:
+            if depth > self.max_depth or not self.can_fetch(url):
+                return None
+                
+            self.frontier.set_crawl_delay(url, self.get_crawl_delay(url))
+            fetched = True
+            response = self.session.get(url, timeout=self.timeout, headers=self.request_headers(url), stream=True,
+                                        **self.request_options(url))
+            self.metrics.observe('ttfb', response.elapsed.total_seconds())
+            with response:
+                retry = self.check_response(url, response, response.elapsed.total_seconds())
+                if retry is not None or not self.read_response(response):
+                    return None
+            extracted_data = self.process_response(url, response)
+            if extracted_data:
+                for link_url, link_depth in self.discover_links(url, depth, extracted_data):
+                    self.enqueue(link_url, link_depth)
+                return extracted_data
+        except Exception as e:
+            retry = self.check_error(url, e)
+        finally:
+            if retry is not None:
+                self.frontier.retry(url, depth, *retry)
+            else:
+                self.frontier.task_done(url, fetched)
+            
+        return None
+        
+    def check_response(self, url, response, seconds):
+        failed = response.status_code in RETRY_STATUSES
+        throttled = response.status_code in THROTTLE_STATUSES
+        self.frontier.report(url, seconds, failed, throttled)
+        if not failed:
+            return None
+        retry_after = parse_retry_after(response.headers.get('Retry-After'))
+        return self.retry_delay(url, retry_after, throttled or retry_after is not None)
+        
+    def check_error(self, url, error):
+        retry = None
+        if is_transient_error(error):
+            self.frontier.report(url, failed=True)
+            retry = self.retry_delay(url)
+        if retry is None:
+            self.report_error(url, error)
+        return retry
+        
+    def retry_delay(self, url, retry_after=None, pause_host=False):
+        attempts = self.frontier.attempts.get(url, 0)
+        if attempts >= self.max_retries:
+            return None
+        self.metrics.count_retry()
+        if retry_after is None:
+            retry_after = backoff_delay(attempts, self.retry_backoff)
+        return min(retry_after, self.max_retry_delay), pause_host
+        
+    def report_error(self, url, error):
+        self.metrics.count_error(error)
+        print(f"Error crawling {url}: {str(error)}")
+        if self.on_error:
+            self.on_error(url, error)
+            
+    def read_response(self, response):
+        start = time.monotonic()
+        if response.status_code != 200:
+            response._content = read_body(response, self.max_bytes) or b''
+        else:
+            body = read_body(response, self.max_bytes) if should_read(response.headers, self.max_bytes) else None
+            if body is None:
+                self.record_skipped()
+                return False
+            response._content = body
+        self.metrics.observe('download', time.monotonic() - start)
+        self.metrics.add_bytes(len(response._content))
+        return True
+        
+    def record_skipped(self):
+        with self.stats_lock:
+            self.stats['skipped'] += 1
+            
+    def request_headers(self, url):
+        if self.cache:
+            return self.cache.conditional_headers(url)
+        return None
+        
+    def is_duplicate(self, url, response):
+        if self.duplicates is None:
+            return False
+        hasher = self.parse_pool.simhash if self.parse_pool else simhash
+        return self.duplicates.check(url, response, hasher) is not None
+        
+    def process_response(self, url, response):
+        self.metrics.count_response(response.status_code)
+        extracted_data = None
+        if response.status_code != 200 or not self.is_duplicate(url, response):
+            extracted_data = self.cache.reuse(url, response) if self.cache else None
+            if extracted_data is not None:
+                extracted_data = self.refresh_record(extracted_data, url, response)
+            elif response.status_code == 200:
+                extracted_data = self.extract_data(response.text, url, response)
+                if self.cache:
+                    self.cache.store(url, response, extracted_data)
+        if extracted_data is not None:
+            self.record_result(extracted_data)
+        if self.state:
+            self.state.record(url, response.status_code, extracted_data)
+        return extracted_data
+        
+    def refresh_record(self, record, url, response):
+        if self.response_fields:
+            fresh = self.new_record(url, response)
+            for field in self.response_fields:
+                if response.status_code != 304 or field not in self.body_fields:
+                    record[field] = fresh[field]
+        return record
+        
+    def record_result(self, extracted_data):
+        with self.stats_lock:
+            self.update_stats(extracted_data)
+        if self.sink:
+            self.sink.write(extracted_data)
+        elif self.keep_results:
+            self.results.append(extracted_data)
+        if self.on_page:
+            self.on_page(extracted_data)
+            
+    def canonical_url(self, url, base=None):
+        if self.canonicalizer is None:
+            return urllib.parse.urljoin(base, url) if base else url
+        return self.canonicalizer.canonicalize(url, base)
+        
+    def accept_routed(self, url):
+        url = self.canonical_url(url)
+        if url is None or self.scope and not self.scope.allows(url):
+            return None
+        return url
+        
+    def enqueue(self, url, depth):
+        if self.scope and not self.scope.allows(url):
+            return
+        if self.partition and not self.partition.owns(url):
+            self.partition.route(url, depth)
+        else:
+            self.frontier.add(url, depth)
+            
+    def enqueue_many(self, items):
+        local = []
+        for url, depth, hint in items:
+            if self.scope and not self.scope.allows(url):
+                continue
+            if self.partition and not self.partition.owns(url):
+                self.partition.route(url, depth)
+            else:
+                local.append((url, depth, hint))
+        return self.frontier.add_many(local)
+        
+    def discover_links(self, url, depth, extracted_data):
+        links = []
+        if depth < self.max_depth:
+            for link in extracted_data['links']:
+                link_url = self.canonical_url(link['href'], url)
+                if link_url is None or self.skip_binary_links and has_binary_extension(link_url):
+                    continue
+                links.append((link_url, depth + 1))
+        return links
+        
+    def start_crawling(self, start_url, max_threads=None, delay=None, engine=None):
+        if max_threads:
+            self.max_threads = max_threads
+        if delay:
+            self.delay = delay
+        if engine:
+            self.engine = engine
+        seeds = []
+        for seed in [start_url] if isinstance(start_url, str) else start_url:
+            canonical = self.canonical_url(seed)
+            if canonical is None:
+                print(f"Skipping seed {seed}: not a crawlable URL")
+            else:
+                seeds.append(canonical)
+        if self.scope:
+            self.scope.add_seeds(seeds)
+        self.configure_transport()
+        
+        max_in_flight = self.concurrency if self.engine == 'async' else self.max_threads
+        self.frontier = CrawlFrontier(self.max_pages, max_in_flight, self.host_concurrency, self.delay, self.state,
+                                      self.metrics, self.adaptive, self.visited_factory(), self.scorer)
+        self.metrics.frontier = self.frontier
+        self.visited_urls = self.frontier.seen
+        if self.state and self.state.resumed:
+            self.restore_state()
+        else:
+            for seed in seeds:
+                if self.partition is None or self.partition.owns(seed):
+                    self.frontier.add(seed, 0)
+        if self.partition:
+            self.partition.start(self.frontier, self.accept_routed)
+        if self.sitemaps:
+            owned = [seed for seed in seeds if self.partition is None or self.partition.owns(seed)]
+            self.sitemap_seeder = SitemapSeeder(self, owned, self.sitemap_since).start()
+            
+        if self.parse_workers:
+            self.parse_pool = ParsePool(self.parse_workers, self.parser, self.get_pipeline())
+        try:
+            if self.engine == 'async':
+                AsyncFetchEngine(self).run()
+                return
+                
+            with ThreadPoolExecutor(max_workers=self.max_threads) as executor:
+                while True:
+                    item = self.frontier.get()
+                    if item is None:
+                        break
+                    url, depth = item
+                    executor.submit(self.crawl_page, url, depth)
+        finally:
+            if self.sitemap_seeder:
+                self.sitemap_seeder.stop()
+            if self.parse_pool:
+                self.parse_pool.close()
+                self.parse_pool = None
+            if self.partition:
+                self.partition.stop()
+            if self.on_finish:
+                self.on_finish(self.stats)
+                
+    def iter_crawl(self, seeds, on_page=None, on_error=None, on_finish=None, buffer_size=100):
+        pages = queue.Queue(buffer_size)
+        stopping = threading.Event()
+        done = object()
+        errors = []
+        
+        def put(item):
+            while not stopping.is_set():
+                try:
+                    pages.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    pass
+                    
+        def page(extracted_data):
+            if on_page:
+                on_page(extracted_data)
+            put(extracted_data)
+            
+        def run():
+            try:
+                self.start_crawling(seeds)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                put(done)
+                
+        saved = (self.on_page, self.on_error, self.on_finish, self.keep_results)
+        on_page, on_error, on_finish = on_page or self.on_page, on_error or self.on_error, on_finish or self.on_finish
+        self.on_page, self.on_error, self.on_finish, self.keep_results = page, on_error, on_finish, False
+        self.frontier = None
+        thread = threading.Thread(target=run, name='netr-crawl', daemon=True)
+        thread.start()
+        try:
+            while True:
+                extracted_data = pages.get()
+                if extracted_data is done:
+                    break
+                yield extracted_data
+        finally:
+            stopping.set()
+            while thread.is_alive():
+                if self.frontier:
+                    self.frontier.stop()
+                thread.join(0.1)
+            self.on_page, self.on_error, self.on_finish, self.keep_results = saved
+        if errors:
+            raise errors[0]
+            
+    def match_fields(self):
+        return ()
+        
+    def create_sink(self, format_type, filename):
+        if format_type == 'json':
+            return JsonSink(f"{filename}.json")
+        if format_type == 'jsonl':
+            return JsonLinesSink(f"{filename}.jsonl")
+        if format_type == 'csv':
+            return CsvSink(f"{filename}.csv", extra_fields=self.match_fields())
+        if format_type == 'sqlite':
+            skip_existing = self.state is not None and self.state.resumed
+            return SqliteSink(f"{filename}.db", summary_view=self.summary_view, match_fields=self.match_fields(),
+                              skip_existing=skip_existing)
+        raise ValueError(f"Unknown export format: {format_type}")
+        
+    def export_results(self, format_type='json', filename=None):
+        sink = self.create_sink(format_type, filename or self.output_name).start()
+        for result in self.results:
+            sink.write(result)
+        sink.close()
+        
+    def show_duplicates(self):
+        if self.duplicates and self.duplicates.clusters:
+            print("\n=== DUPLICATE CONTENT ===")
+            print(f"Duplicate Pages Skipped: {self.duplicates.count}")
+            print(f"Duplicate Clusters: {len(self.duplicates.clusters)}")
+            for example, count in self.duplicates.top_clusters():
+                print(f"{count} duplicates, first: {example}")
+                
+    def restore_state(self):
+        for record in self.state.records():
+            self.record_result(record)
+        self.frontier.restore(self.state.urls())
+        print(f"Resuming crawl: {self.frontier.pages} pages done, {self.frontier.pending_count} pending")
+
+
+def split_list(value):
+    return [item.strip() for item in (value or '').split(',') if item.strip()]
+
+
+def add_crawl_arguments(parser, crawler):
+    parser.add_argument('url', help='Starting URL to crawl')
+    parser.add_argument('-t', '--threads', type=int, default=crawler.max_threads, help=f'Number of threads (default: {crawler.max_threads})')
+    parser.add_argument('-d', '--delay', type=float, default=crawler.delay, help=f'Minimum delay between requests to the same host (default: {crawler.delay}s)')
+    parser.add_argument('-m', '--max-pages', type=int, default=crawler.max_pages, help=f'Maximum pages to crawl (default: {crawler.max_pages})')
+    parser.add_argument('-e', '--export', choices=['json', 'jsonl', 'csv', 'sqlite'], default='json', help='Export format')
+    parser.add_argument('-o', '--output', default=crawler.output_name, help='Output filename')
+    parser.add_argument('--engine', choices=['thread', 'async'], default='thread', help='Fetch engine (default: thread)')
+    parser.add_argument('--concurrency', type=int, default=500, help='Requests in flight for the async engine (default: 500)')
+    parser.add_argument('--host-concurrency', type=int, default=8, help='Maximum concurrent requests per host (default: 8)')
+    parser.add_argument('--max-retries', type=int, default=3, help='Retries for 429/5xx responses and connection errors, with jittered exponential backoff and Retry-After (default: 3)')
+    parser.add_argument('--no-adaptive', action='store_true', help='Keep --host-concurrency fixed instead of adapting it to each host\'s latency and errors')
+    parser.add_argument('--pool-size', type=int, help='Keep-alive connections pooled per host (default: --host-concurrency)')
+    parser.add_argument('--http2', action='store_true', help='Use HTTP/2 for https:// URLs, multiplexing requests to a host over one connection (needs httpx[http2])')
+    parser.add_argument('--parser', choices=['html.parser', 'lxml', 'selectolax'], default='html.parser', help='HTML parser backend (default: html.parser)')
+    parser.add_argument('--parse-workers', type=int, default=0, help='Processes that parse and extract pages (default: 0, parse in the fetch workers)')
+    parser.add_argument('--fields', help='Comma-separated fields to extract, e.g. links,title (default: all; links are always extracted)')
+    parser.add_argument('--stream', action='store_true', help='Write each page to the export file as soon as it is crawled')
+    parser.add_argument('--state-dir', help='Directory where crawl progress is checkpointed')
+    parser.add_argument('--resume', action='store_true', help='Resume the crawl checkpointed in --state-dir')
+    parser.add_argument('--cache-dir', help='Directory of the HTTP cache used for conditional recrawls')
+    parser.add_argument('--max-bytes', type=int, default=10 * 1024 * 1024, help='Skip responses larger than this many bytes (default: 10485760)')
+    parser.add_argument('--scope', choices=SCOPES, default='any', help='Follow links to any host, only the seed hosts, or the seed domains and their subdomains (default: any)')
+    parser.add_argument('--allow-hosts', help='Comma-separated domains (with their subdomains) links may lead to, in addition to --scope')
+    parser.add_argument('--deny-hosts', help='Comma-separated domains (with their subdomains) never to crawl')
+    parser.add_argument('--include', action='append', default=[], help='Only follow links whose path and query match this glob, or regex with a re: prefix (repeatable)')
+    parser.add_argument('--exclude', action='append', default=[], help='Do not follow links whose path and query match this glob, or regex with a re: prefix (repeatable)')
+    parser.add_argument('--deny-extensions', help='Comma-separated file extensions never to crawl, e.g. pdf,zip')
+    parser.add_argument('--scope-file', help='File of scope rules, one per line: allow HOST, deny HOST, include PATTERN, exclude PATTERN or deny-extension EXT')
+    parser.add_argument('--sitemaps', action='store_true', help='Seed the crawl from the Sitemap: entries in robots.txt and /sitemap.xml')
+    parser.add_argument('--sitemap-since', help='Only seed sitemap URLs whose lastmod is on or after this date, e.g. 2024-01-31')
+    parser.add_argument('--fifo', action='store_true', help='Crawl each host\'s URLs in discovery order instead of best first')
+    parser.add_argument('--priority-weights', default='depth=1,inlinks=1,host=0.5,sitemap=2', help='Best-first scoring weights (default: depth=1,inlinks=1,host=0.5,sitemap=2)')
+    parser.add_argument('--url-weight', action='append', default=[], help='PATTERN=WEIGHT added to the priority of URLs whose path and query match the glob, or regex with a re: prefix (repeatable)')
+    parser.add_argument('--drop-params', default=','.join(TRACKING_PARAMS), help='Comma-separated query parameters removed from discovered URLs; a trailing * matches a prefix (default: utm_* and common click ids)')
+    parser.add_argument('--keep-query-order', action='store_true', help='Do not sort query parameters when canonicalizing URLs')
+    parser.add_argument('--keep-fragments', action='store_true', help='Treat URLs that differ only in their #fragment as different pages')
+    parser.add_argument('--strip-trailing-slash', action='store_true', help='Treat /path/ and /path as the same page')
+    parser.add_argument('--skip-binary-links', action='store_true', help='Do not enqueue links to images, archives, media and documents')
+    parser.add_argument('--compact-visited', action='store_true', help='Track visited URLs as 64-bit fingerprints (about 18 bytes per URL instead of 140)')
+    parser.add_argument('--visited-spill', help='Spill visited fingerprints beyond --visited-memory to this file (implies --compact-visited)')
+    parser.add_argument('--visited-memory', type=int, default=4000000, help='Visited fingerprints kept in memory before spilling to --visited-spill (default: 4000000)')
+    parser.add_argument('--visited-error-rate', type=float, default=0.001, help='False-positive rate of the Bloom filter that skips spill file lookups (default: 0.001, 0 disables it)')
+    parser.add_argument('--expected-urls', type=int, default=10000000, help='Distinct URLs the Bloom filter is sized for (default: 10000000)')
+    parser.add_argument('--workers', type=int, help='Partition hosts across this many crawl workers and coordinate them')
+    parser.add_argument('--worker-id', type=int, help='Run as this worker (0-based) of a --workers crawl')
+    parser.add_argument('--local-workers', type=int, help='Workers the coordinator starts on this machine (default: all)')
+    parser.add_argument('--coordinator', default='sqlite:netr_coordinator.db', help='Coordination backend: sqlite:PATH or tcp://HOST:PORT (default: sqlite:netr_coordinator.db)')
+    parser.add_argument('--dedupe', choices=['none', 'exact', 'near'], default='exact', help='Skip pages whose body duplicates an earlier page exactly or nearly (default: exact)')
+    parser.add_argument('--near-distance', type=int, default=3, help='Maximum SimHash bit distance for near duplicates (default: 3)')
+    parser.add_argument('--metrics-port', type=int, help='Serve Prometheus metrics on this port while crawling')
+    parser.add_argument('--progress', type=float, default=0, help='Print a progress line every this many seconds (default: 0, off)')
+    return parser
+
+
+def parse_crawl_arguments(parser):
+    args = parser.parse_args()
+    if args.resume and not args.state_dir:
+        parser.error("--resume requires --state-dir")
+    if args.http2 and not http2_available():
+        parser.error("--http2 requires httpx with h2 (pip install 'httpx[http2]')")
+    if args.worker_id is not None and not args.workers:
+        parser.error("--worker-id requires --workers")
+    if args.local_workers is not None and not args.workers:
+        parser.error("--local-workers requires --workers")
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.worker_id is not None and not 0 <= args.worker_id < args.workers:
+        parser.error(f"--worker-id must be between 0 and {args.workers - 1}")
+    if args.local_workers is not None and not 0 <= args.local_workers <= args.workers:
+        parser.error(f"--local-workers must be between 0 and {args.workers}")
+    if args.workers and args.resume:
+        parser.error("--resume is not supported with --workers")
+    if args.workers and args.worker_id is None:
+        sys.exit(run_coordinator(args.coordinator, args.workers, args.local_workers))
+    if args.workers:
+        args.output = f"{args.output}-worker{args.worker_id}"
+        if args.state_dir:
+            args.state_dir = os.path.join(args.state_dir, f"worker{args.worker_id}")
+        if args.cache_dir:
+            args.cache_dir = os.path.join(args.cache_dir, f"worker{args.worker_id}")
+        if args.metrics_port:
+            args.metrics_port += args.worker_id
+        if args.visited_spill:
+            root, ext = os.path.splitext(args.visited_spill)
+            args.visited_spill = f"{root}-worker{args.worker_id}{ext}"
+    return args
+
+
+def priority_scorer(args, parser):
+    weights = {}
+    for item in args.priority_weights.split(','):
+        name, _, value = item.partition('=')
+        if name.strip() not in WEIGHTS:
+            parser.error(f"--priority-weights: unknown weight {name.strip()!r} (available: {', '.join(WEIGHTS)})")
+        try:
+            weights[name.strip()] = float(value)
+        except ValueError:
+            parser.error(f"--priority-weights: {item!r} is not NAME=NUMBER")
+    patterns = []
+    for item in args.url_weight:
+        pattern, _, value = item.rpartition('=')
+        try:
+            weight = float(value)
+        except ValueError:
+            weight = None
+        if not pattern or weight is None:
+            parser.error(f"--url-weight: {item!r} is not PATTERN=NUMBER")
+        patterns.append((pattern, weight))
+    return PriorityScorer(patterns=patterns, **weights)
+
+
+def configure_crawler(crawler, args, parser):
+    if args.fields:
+        crawler.fields = split_list(args.fields)
+        available = [stage.name for stage in crawler.extraction_stages()]
+        unknown = [field for field in crawler.fields if field not in available]
+        if unknown:
+            parser.error(f"unknown fields: {', '.join(unknown)} (available: {', '.join(available)})")
+    crawler.scope = CrawlScope(args.scope, split_list(args.allow_hosts), split_list(args.deny_hosts), args.include,
+                               args.exclude, (args.deny_extensions or '').split(','))
+    if args.scope_file:
+        try:
+            crawler.scope.load(args.scope_file)
+        except (OSError, ValueError) as e:
+            parser.error(f"--scope-file: {e}")
+    crawler.sitemaps = args.sitemaps or bool(args.sitemap_since)
+    if args.sitemap_since:
+        crawler.sitemap_since = parse_lastmod(args.sitemap_since)
+        if crawler.sitemap_since is None:
+            parser.error(f"--sitemap-since: {args.sitemap_since!r} is not an ISO 8601 date")
+    crawler.scorer = None if args.fifo else priority_scorer(args, parser)
+    crawler.max_pages = args.max_pages
+    crawler.concurrency = args.concurrency
+    crawler.host_concurrency = args.host_concurrency
+    crawler.pool_size = args.pool_size
+    crawler.max_retries = args.max_retries
+    crawler.adaptive = not args.no_adaptive
+    crawler.http2 = args.http2
+    crawler.parser = args.parser
+    crawler.parse_workers = args.parse_workers
+    crawler.max_bytes = args.max_bytes
+    crawler.skip_binary_links = args.skip_binary_links
+    crawler.canonicalizer = UrlCanonicalizer(strip_fragments=not args.keep_fragments,
+                                             sort_query=not args.keep_query_order,
+                                             drop_params=split_list(args.drop_params),
+                                             strip_trailing_slash=args.strip_trailing_slash)
+    if args.dedupe == 'none':
+        crawler.duplicates = None
+    else:
+        crawler.duplicates = DuplicateIndex(near=args.dedupe == 'near', max_distance=args.near_distance)
+    routed = None
+    if args.visited_spill:
+        root, ext = os.path.splitext(args.visited_spill)
+        routed = f"{root}-routed{ext}" if args.workers else None
+        for path in (args.visited_spill, routed):
+            for existing in ((path, path + '.tmp') if path else ()):
+                if os.path.exists(existing) and not (args.resume and is_spill_file(existing)):
+                    parser.error(f"--visited-spill: {existing} already exists; remove it or choose another path")
+    if args.compact_visited or args.visited_spill:
+        crawler.visited_factory = functools.partial(VisitedSet, args.visited_spill, args.visited_memory,
+                                                    args.expected_urls, args.visited_error_rate, replace=args.resume)
+    if args.workers:
+        sent = VisitedSet(routed, args.visited_memory, args.expected_urls, args.visited_error_rate)
+        crawler.partition = Partition(open_backend(args.coordinator), args.worker_id, args.workers, sent=sent)
+    if args.state_dir:
+        crawler.state = CrawlState(args.state_dir, resume=args.resume)
+    if args.cache_dir:
+        crawler.cache = ResponseCache(args.cache_dir, variant=','.join(sorted(set(crawler.fields or ['*']))))
+    return crawler
+
+
+def print_crawl_settings(args):
+    print(f"Threads: {args.threads}")
+    print(f"Delay: {args.delay}s")
+    print(f"Max Pages: {args.max_pages}")
+    print(f"Export Format: {args.export}")
+    print(f"Engine: {args.engine}")
+    print(f"Parser: {args.parser}")
+    if args.parse_workers:
+        print(f"Parse Workers: {args.parse_workers}")
+    if args.http2:
+        print("HTTP/2: enabled for https:// URLs")
+
+
+def run_crawl(crawler, args, title='Crawling'):
+    start_time = time.time()
+    if args.stream:
+        crawler.sink = crawler.create_sink(args.export, args.output).start()
+    metrics_server = MetricsServer(crawler.metrics, args.metrics_port).start() if args.metrics_port else None
+    if metrics_server:
+        print(f"Metrics: http://127.0.0.1:{args.metrics_port}/metrics")
+    progress = ProgressReporter(crawler.metrics, args.progress).start() if args.progress > 0 else None
+    try:
+        crawler.start_crawling(args.url, args.threads, args.delay, args.engine)
+    finally:
+        if progress:
+            progress.stop()
+        if metrics_server:
+            metrics_server.shutdown()
+        if crawler.sink:
+            crawler.sink.close()
+        if isinstance(crawler.visited_urls, VisitedSet):
+            crawler.visited_urls.close()
+        if crawler.state:
+            crawler.state.close()
+        if crawler.cache:
+            crawler.cache.close()
+            
+    duration = time.time() - start_time
+    print(f"\n{title} completed in {duration:.2f} seconds")
+    crawler.show_statistics()
+    if crawler.cache:
+        print(f"HTTP Cache: {crawler.cache.not_modified} not modified, {crawler.cache.hits} unchanged")
+    reuse = crawler.metrics.reuse_ratio()
+    if reuse is not None:
+        print(f"Connections: {crawler.metrics.connections} opened for {crawler.metrics.requests} requests ({reuse * 100:.0f}% reused)")
+    if crawler.metrics.retries:
+        print(f"Retries: {crawler.metrics.retries}")
+    if crawler.sitemap_seeder:
+        print(f"Sitemaps: {crawler.sitemap_seeder.urls} URLs seeded from {crawler.sitemap_seeder.sitemaps} sitemaps")
+    
+    if args.stream:
+        print(f"\nResults streamed to {args.output}.{args.export}")
+    else:
+        print(f"\nExporting results to {args.output}.{args.export}")
+        crawler.export_results(args.export, args.output)
+        print("Export completed!")
@@ -0,0 +1,81 @@
+import hashlib
+import re
+import threading
+from array import array
+from nftr_visited import FingerprintTable
+
+SCRIPT_STYLE = re.compile(r'<(script|style)\b.*?</\1\s*>', re.IGNORECASE | re.DOTALL)
+TAG = re.compile(r'<[^>]+>')
+WORD = re.compile(r'\w+')
+BIT_TABLES = [bytes((value >> bit) & 1 for value in range(256)) for bit in range(8)]
+
+
+def word_hash(word):
+    return int.from_bytes(hashlib.blake2b(word.encode('utf-8', 'surrogatepass'), digest_size=8).digest(), 'little')
+
+
+def simhash(html, shingle_size=3):
+    words = WORD.findall(TAG.sub(' ', SCRIPT_STYLE.sub(' ', html)).lower())
+    if len(words) < shingle_size:
+        return None
+    ids = {word: word_hash(word) for word in set(words)}
+    values = list(map(ids.__getitem__, words))
+    hashes = set(map(hash, zip(*(values[i:] for i in range(shingle_size)))))
+    data = array('q', hashes).tobytes()
+    half = len(hashes) / 2
+    fingerprint = 0
+    for byte in range(8):
+        column = data[byte::8]
+        for bit, table in enumerate(BIT_TABLES):
+            if column.translate(table).count(b'\x01') > half:
+                fingerprint |= 1 << (byte * 8 + bit)
+    return fingerprint
+
+
+class DuplicateIndex:
+    def __init__(self, near=False, max_distance=3):
+        self.near = near
+        self.max_distance = max_distance
+        self.band_bits = 64 // (max_distance + 1)
+        self.lock = threading.Lock()
+        self.digests = FingerprintTable()
+        self.bands = [{} for _ in range(max_distance + 1)]
+        self.clusters = {}
+        self.count = 0
+        
+    def check(self, url, response, hasher=simhash):
+        digest = int.from_bytes(hashlib.blake2b(response.content, digest_size=8).digest(), 'little') or 1
+        fingerprint = hasher(response.text) if self.near else None
+        with self.lock:
+            exact = not self.digests.add(digest)
+            key = None
+            if fingerprint is not None:
+                key = self._nearest(fingerprint)
+                if key is None and not exact:
+                    for band, band_key in zip(self.bands, self._band_keys(fingerprint)):
+                        band.setdefault(band_key, array('Q')).append(fingerprint)
+            if key is None and exact:
+                key = digest
+            if key is None:
+                return None
+            cluster = self.clusters.get(key)
+            if cluster is None:
+                cluster = self.clusters[key] = [url, 0]
+            cluster[1] += 1
+            self.count += 1
+            return key
+            
+    def top_clusters(self, limit=10):
+        with self.lock:
+            return sorted(self.clusters.values(), key=lambda cluster: cluster[1], reverse=True)[:limit]
+            
+    def _band_keys(self, fingerprint):
+        mask = (1 << self.band_bits) - 1
+        return [(fingerprint >> (i * self.band_bits)) & mask for i in range(len(self.bands))]
+        
+    def _nearest(self, fingerprint):
+        for band, key in zip(self.bands, self._band_keys(fingerprint)):
+            for candidate in band.get(key, ()):
+                if bin(candidate ^ fingerprint).count('1') <= self.max_distance:
+                    return candidate
+        return None
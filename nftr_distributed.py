@@ -0,0 +1,336 @@
+import bisect
+import hashlib
+import json
+import os
+import socket
+import socketserver
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+import urllib.parse
+from collections import deque
+from nftr_visited import VisitedSet
+
+
+def host_of(url):
+    return (urllib.parse.urlsplit(url).hostname or '').lower()
+
+
+class HashRing:
+    def __init__(self, nodes, replicas=64):
+        self.ring = sorted((self.hash(f"{node}#{i}"), node) for node in nodes for i in range(replicas))
+        self.keys = [key for key, _ in self.ring]
+        
+    def hash(self, value):
+        return int.from_bytes(hashlib.md5(value.encode('utf-8')).digest()[:8], 'big')
+        
+    def owner(self, key):
+        index = bisect.bisect(self.keys, self.hash(key)) % len(self.keys)
+        return self.ring[index][1]
+
+
+class SqliteBackend:
+    def __init__(self, path, reset=False):
+        if reset:
+            for suffix in ('', '-wal', '-shm'):
+                if os.path.exists(path + suffix):
+                    os.remove(path + suffix)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, timeout=60, check_same_thread=False, isolation_level=None)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('CREATE TABLE IF NOT EXISTS workers (id INTEGER PRIMARY KEY, idle INTEGER NOT NULL, updated REAL)')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS inbox (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                worker INTEGER NOT NULL,
+                url TEXT NOT NULL,
+                depth INTEGER NOT NULL
+            )
+        ''')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_inbox_worker ON inbox(worker, id)')
+        
+    def register(self, worker_id):
+        with self.lock:
+            self.conn.execute('INSERT OR REPLACE INTO workers VALUES (?, 0, ?)', (worker_id, time.time()))
+            
+    def push(self, items):
+        with self.lock:
+            self.conn.execute('BEGIN IMMEDIATE')
+            self.conn.executemany('INSERT INTO inbox (worker, url, depth) VALUES (?, ?, ?)', items)
+            self.conn.execute('COMMIT')
+            
+    def pull(self, worker_id, limit=1000):
+        with self.lock:
+            self.conn.execute('BEGIN IMMEDIATE')
+            try:
+                rows = self.conn.execute('SELECT id, url, depth FROM inbox WHERE worker = ? ORDER BY id LIMIT ?',
+                                         (worker_id, limit)).fetchall()
+                if rows:
+                    self.conn.execute('DELETE FROM inbox WHERE worker = ? AND id <= ?', (worker_id, rows[-1][0]))
+                    self.conn.execute('UPDATE workers SET idle = 0, updated = ? WHERE id = ?', (time.time(), worker_id))
+            finally:
+                self.conn.execute('COMMIT')
+        return [(url, depth) for _, url, depth in rows]
+        
+    def set_idle(self, worker_id):
+        with self.lock:
+            self.conn.execute('UPDATE workers SET idle = 1, updated = ? WHERE id = ?', (time.time(), worker_id))
+            
+    def finished(self, workers):
+        with self.lock:
+            idle, queued = self.conn.execute(
+                'SELECT (SELECT COUNT(*) FROM workers WHERE idle = 1), (SELECT COUNT(*) FROM inbox)'
+            ).fetchone()
+        return idle >= workers and not queued
+        
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+class MemoryBackend:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.idle = {}
+        self.inbox = {}
+        
+    def register(self, worker_id):
+        with self.lock:
+            self.idle[worker_id] = False
+            
+    def push(self, items):
+        with self.lock:
+            for worker_id, url, depth in items:
+                self.inbox.setdefault(worker_id, deque()).append((url, depth))
+                
+    def pull(self, worker_id, limit=1000):
+        with self.lock:
+            queue = self.inbox.get(worker_id)
+            items = [queue.popleft() for _ in range(min(limit, len(queue)))] if queue else []
+            if items:
+                self.idle[worker_id] = False
+            return items
+            
+    def set_idle(self, worker_id):
+        with self.lock:
+            self.idle[worker_id] = True
+            
+    def finished(self, workers):
+        with self.lock:
+            return sum(self.idle.values()) >= workers and not any(self.inbox.values())
+            
+    def close(self):
+        pass
+
+
+BROKER_OPS = ('register', 'push', 'pull', 'set_idle', 'finished')
+
+
+def is_worker_id(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def check_request(request):
+    if not isinstance(request, dict) or request.get('op') not in BROKER_OPS or not isinstance(request.get('args'), list):
+        raise ValueError("expected {\"op\": one of " + ', '.join(BROKER_OPS) + ", \"args\": [...]}")
+    op, args = request['op'], request['args']
+    if op == 'push':
+        if len(args) != 1 or not isinstance(args[0], list) or not all(
+                isinstance(item, list) and len(item) == 3 and is_worker_id(item[0]) and isinstance(item[1], str)
+                and is_worker_id(item[2]) for item in args[0]):
+            raise ValueError("push expects [[worker, url, depth], ...]")
+    elif not 1 <= len(args) <= (2 if op == 'pull' else 1) or not all(is_worker_id(arg) for arg in args):
+        raise ValueError(f"{op} expects integer arguments")
+    return op, args
+
+
+class BrokerHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        backend = self.server.backend
+        for line in self.rfile:
+            try:
+                op, args = check_request(json.loads(line))
+                reply = {'result': getattr(backend, op)(*args)}
+            except Exception as e:
+                reply = {'error': f"{type(e).__name__}: {str(e)}"}
+            self.wfile.write(json.dumps(reply).encode('utf-8') + b'\n')
+
+
+class BrokerServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    
+    def __init__(self, address, backend=None):
+        super().__init__(address, BrokerHandler)
+        self.backend = backend or MemoryBackend()
+        
+    def start(self):
+        threading.Thread(target=self.serve_forever, name='netr-broker', daemon=True).start()
+        return self
+
+
+class TcpBackend:
+    def __init__(self, host, port, timeout=60):
+        self.lock = threading.Lock()
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.file = self.sock.makefile('rwb')
+        
+    def call(self, op, *args):
+        with self.lock:
+            self.file.write(json.dumps({'op': op, 'args': args}).encode('utf-8') + b'\n')
+            self.file.flush()
+            line = self.file.readline()
+        if not line:
+            raise ConnectionError("coordinator closed the connection")
+        reply = json.loads(line)
+        if 'error' in reply:
+            raise RuntimeError(f"coordinator rejected {op}: {reply['error']}")
+        return reply['result']
+        
+    def register(self, worker_id):
+        self.call('register', worker_id)
+        
+    def push(self, items):
+        self.call('push', items)
+        
+    def pull(self, worker_id, limit=1000):
+        return [tuple(item) for item in self.call('pull', worker_id, limit)]
+        
+    def set_idle(self, worker_id):
+        self.call('set_idle', worker_id)
+        
+    def finished(self, workers):
+        return self.call('finished', workers)
+        
+    def close(self):
+        with self.lock:
+            self.file.close()
+            self.sock.close()
+
+
+def parse_address(url):
+    parsed = urllib.parse.urlsplit(url)
+    return parsed.hostname or '127.0.0.1', parsed.port or 8750
+
+
+def open_backend(url, reset=False):
+    if url.startswith('sqlite:'):
+        return SqliteBackend(url[len('sqlite:'):], reset=reset)
+    if url.startswith('tcp://'):
+        return TcpBackend(*parse_address(url))
+    raise ValueError(f"Unknown coordinator backend: {url}")
+
+
+def serve_backend(url):
+    if url.startswith('tcp://'):
+        return BrokerServer(parse_address(url)).start()
+    open_backend(url, reset=True).close()
+    return None
+
+
+class Partition:
+    def __init__(self, backend, worker_id, workers, poll_interval=0.2, sent=None):
+        self.backend = backend
+        self.worker_id = worker_id
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.ring = HashRing(range(workers))
+        self.lock = threading.Lock()
+        self.owners = {}
+        self.sent = VisitedSet() if sent is None else sent
+        self.outbox = []
+        self.routed = 0
+        self.received = 0
+        self.frontier = None
+        self.accept = None
+        self.thread = None
+        self.stopping = threading.Event()
+        
+    def owner(self, url):
+        host = host_of(url)
+        owner = self.owners.get(host)
+        if owner is None:
+            owner = self.owners[host] = self.ring.owner(host)
+        return owner
+        
+    def owns(self, url):
+        return self.owner(url) == self.worker_id
+        
+    def route(self, url, depth):
+        with self.lock:
+            if not self.sent.add(url):
+                return
+            self.outbox.append((self.owner(url), url, depth))
+            
+    def start(self, frontier, accept=None):
+        self.frontier = frontier
+        self.accept = accept
+        frontier.hold()
+        self.backend.register(self.worker_id)
+        self.thread = threading.Thread(target=self.run, name=f"netr-partition-{self.worker_id}", daemon=True)
+        self.thread.start()
+        
+    def flush(self):
+        with self.lock:
+            items, self.outbox = self.outbox, []
+        if items:
+            self.backend.push(items)
+            self.routed += len(items)
+        return len(items)
+        
+    def run(self):
+        try:
+            while not self.stopping.is_set():
+                self.flush()
+                items = self.backend.pull(self.worker_id)
+                if items:
+                    self.received += len(items)
+                    for url, depth in items:
+                        url = self.accept(url) if self.accept else url
+                        if url is not None:
+                            self.frontier.add(url, depth)
+                    continue
+                if self.frontier.idle and self.frontier.holds == 1 and not self.flush():
+                    self.backend.set_idle(self.worker_id)
+                    if self.backend.finished(self.workers):
+                        break
+                self.stopping.wait(self.poll_interval)
+        except Exception as e:
+            print(f"Error coordinating partition {self.worker_id}: {str(e)}")
+        finally:
+            self.frontier.release()
+            
+    def stop(self):
+        self.stopping.set()
+        if self.thread:
+            self.thread.join()
+        self.backend.close()
+        self.sent.close()
+
+
+def run_coordinator(coordinator, workers, local_workers=None, argv=None, poll_interval=1.0):
+    argv = sys.argv if argv is None else argv
+    broker = serve_backend(coordinator)
+    local_workers = workers if local_workers is None else local_workers
+    print(f"Coordinator: {coordinator}, starting {local_workers} of {workers} workers")
+    processes = [subprocess.Popen([sys.executable] + argv + ['--worker-id', str(worker_id)])
+                 for worker_id in range(local_workers)]
+    try:
+        while True:
+            codes = [process.poll() for process in processes]
+            failed = [(worker_id, code) for worker_id, code in enumerate(codes) if code]
+            if failed:
+                print(f"Worker {failed[0][0]} exited with status {failed[0][1]}, stopping the crawl")
+                return failed[0][1] if failed[0][1] > 0 else 1
+            if None not in codes and (not broker or local_workers >= workers or broker.backend.finished(workers)):
+                return 0
+            time.sleep(poll_interval)
+    finally:
+        for process in processes:
+            if process.poll() is None:
+                process.terminate()
+                process.wait()
+        if broker:
+            broker.shutdown()
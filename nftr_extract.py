@@ -0,0 +1,177 @@
+import json
+import re
+
+
+class ExtractionStage:
+    name = None
+    tags = ()
+    
+    def handle(self, element, extracted, state):
+        pass
+        
+    def finish(self, document, extracted, state):
+        pass
+
+
+class TitleStage(ExtractionStage):
+    name = 'title'
+    tags = ('title',)
+    
+    def handle(self, element, extracted, state):
+        if 'title' not in state:
+            state['title'] = True
+            extracted['title'] = element.string
+
+
+class MetaStage(ExtractionStage):
+    name = 'meta'
+    tags = ('meta',)
+    
+    def __init__(self, names, charset=False):
+        self.names = names
+        self.charset = charset
+        
+    def handle(self, element, extracted, state):
+        name = element.get('name')
+        if name in self.names:
+            extracted[f"meta_{name}"] = element.get('content', '')
+        elif self.charset and element.get('charset'):
+            extracted['meta_charset'] = element.get('charset', '')
+
+
+class LinkStage(ExtractionStage):
+    name = 'links'
+    tags = ('a',)
+    
+    def __init__(self, attributes, list_attributes=()):
+        self.attributes = attributes
+        self.list_attributes = list_attributes
+        
+    def handle(self, element, extracted, state):
+        href = element.get('href')
+        if href is None:
+            return
+        link = {'text': element.get_text(strip=True), 'href': href}
+        for attribute in self.attributes:
+            if attribute in self.list_attributes:
+                link[attribute] = element.get_list(attribute)
+            else:
+                link[attribute] = element.get(attribute, '')
+        extracted['links'].append(link)
+
+
+class ImageStage(ExtractionStage):
+    name = 'images'
+    tags = ('img',)
+    
+    def __init__(self, attributes):
+        self.attributes = attributes
+        
+    def handle(self, element, extracted, state):
+        extracted['images'].append({attribute: element.get(attribute, '') for attribute in self.attributes})
+
+
+class FormStage(ExtractionStage):
+    name = 'forms'
+    tags = ('form',)
+    
+    def __init__(self, attributes, input_attributes):
+        self.attributes = attributes
+        self.input_attributes = input_attributes
+        
+    def handle(self, element, extracted, state):
+        form_data = {attribute: element.get(attribute, '') for attribute in self.attributes}
+        form_data['inputs'] = [
+            {attribute: input_tag.get(attribute, default) for attribute, default in self.input_attributes}
+            for input_tag in element.find_all('input')
+        ]
+        extracted['forms'].append(form_data)
+
+
+class TableStage(ExtractionStage):
+    name = 'tables'
+    tags = ('table',)
+    
+    def handle(self, element, extracted, state):
+        table_data = []
+        for row in element.find_all('tr'):
+            row_data = [cell.get_text(strip=True) for cell in row.find_all('td', 'th')]
+            if row_data:
+                table_data.append(row_data)
+        extracted['tables'].append(table_data)
+
+
+class TextStage(ExtractionStage):
+    name = 'text'
+    
+    def __init__(self, patterns, target=None):
+        self.patterns = {name: re.compile(pattern) for name, pattern in patterns.items()}
+        self.target = target
+        
+    def finish(self, document, extracted, state):
+        text_content = document.get_text()
+        extracted['text_content'] = ' '.join(text_content.split())
+        matches_by_name = extracted[self.target] if self.target else extracted
+        for pattern_name, pattern in self.patterns.items():
+            matches = pattern.findall(text_content)
+            if matches:
+                matches_by_name[pattern_name] = list(set(matches))
+
+
+class StructuredDataStage(ExtractionStage):
+    name = 'structured_data'
+    tags = ('script',)
+    
+    def handle(self, element, extracted, state):
+        if element.get('type') != 'application/ld+json':
+            return
+        try:
+            extracted['structured_data'].append(json.loads(element.string))
+        except Exception:
+            pass
+
+
+class TechnologyStage(ExtractionStage):
+    name = 'technologies'
+    tags = ('script', 'link')
+    script_markers = [('jquery', 'jQuery'), ('react', 'React'), ('angular', 'Angular'), ('vue', 'Vue.js')]
+    stylesheet_markers = [('bootstrap', 'Bootstrap'), ('tailwind', 'Tailwind CSS')]
+    
+    def handle(self, element, extracted, state):
+        if element.tag == 'script':
+            src = element.get('src', '').lower()
+            found = state.setdefault('script_technologies', [])
+            markers = self.script_markers
+        else:
+            if 'stylesheet' not in element.get_list('rel'):
+                return
+            src = element.get('href', '').lower()
+            found = state.setdefault('stylesheet_technologies', [])
+            markers = self.stylesheet_markers
+        for marker, technology in markers:
+            if marker in src:
+                found.append(technology)
+                
+    def finish(self, document, extracted, state):
+        extracted['technologies'].extend(state.get('script_technologies', []))
+        extracted['technologies'].extend(state.get('stylesheet_technologies', []))
+
+
+class ExtractionPipeline:
+    def __init__(self, stages, fields=None):
+        self.fields = fields
+        self.stages = [stage for stage in stages if fields is None or stage.name in fields]
+        self.handlers = {}
+        for stage in self.stages:
+            for tag in stage.tags:
+                self.handlers.setdefault(tag, []).append(stage)
+                
+    def run(self, document, extracted):
+        state = {}
+        if self.handlers:
+            for element in document.find_all(*self.handlers):
+                for stage in self.handlers[element.tag]:
+                    stage.handle(element, extracted, state)
+        for stage in self.stages:
+            stage.finish(document, extracted, state)
+        return extracted
@@ -0,0 +1,94 @@
+import datetime
+import email.utils
+import posixpath
+import random
+import time
+import urllib.parse
+import requests
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+HTML_CONTENT_TYPES = ('text/html', 'application/xhtml+xml')
+BINARY_EXTENSIONS = frozenset([
+    '.7z', '.apk', '.avi', '.bin', '.bmp', '.bz2', '.dmg', '.doc', '.docx', '.eot', '.exe', '.flac', '.flv',
+    '.gif', '.gz', '.ico', '.img', '.iso', '.jar', '.jpeg', '.jpg', '.m4a', '.m4v', '.mkv', '.mov', '.mp3',
+    '.mp4', '.mpeg', '.mpg', '.msi', '.ogg', '.otf', '.pdf', '.png', '.ppt', '.pptx', '.rar', '.svg', '.tar',
+    '.tgz', '.tif', '.tiff', '.ttf', '.wav', '.webm', '.webp', '.wmv', '.woff', '.woff2', '.xls', '.xlsx',
+    '.xz', '.zip'
+])
+CHUNK_SIZE = 64 * 1024
+RETRY_STATUSES = frozenset([429, 500, 502, 503, 504])
+THROTTLE_STATUSES = frozenset([429, 503])
+TRANSIENT_ERRORS = (requests.ConnectionError, requests.Timeout, ConnectionError, TimeoutError)
+if aiohttp is not None:
+    TRANSIENT_ERRORS += (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError)
+if httpx is not None:
+    TRANSIENT_ERRORS += (httpx.TransportError,)
+
+
+def is_html(headers):
+    content_type = headers.get('Content-Type')
+    if not content_type:
+        return True
+    return content_type.split(';', 1)[0].strip().lower() in HTML_CONTENT_TYPES
+
+
+def content_length(headers):
+    try:
+        return int(headers.get('Content-Length'))
+    except (TypeError, ValueError):
+        return None
+
+
+def should_read(headers, max_bytes):
+    if not is_html(headers):
+        return False
+    length = content_length(headers)
+    return not max_bytes or length is None or length <= max_bytes
+
+
+def read_body(response, max_bytes):
+    body = bytearray()
+    for chunk in response.iter_content(CHUNK_SIZE):
+        body += chunk
+        if max_bytes and len(body) > max_bytes:
+            return None
+    return bytes(body)
+
+
+def has_binary_extension(url):
+    path = urllib.parse.urlsplit(url).path
+    return posixpath.splitext(path)[1].lower() in BINARY_EXTENSIONS
+
+
+def is_transient_error(error):
+    return isinstance(error, TRANSIENT_ERRORS)
+
+
+def parse_retry_after(value):
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at is None:
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=datetime.timezone.utc)
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+def backoff_delay(attempt, base=0.5, cap=60.0):
+    return random.uniform(0, min(cap, base * 2 ** attempt))
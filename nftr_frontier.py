@@ -0,0 +1,320 @@
+import heapq
+import itertools
+import threading
+import time
+import urllib.parse
+
+LATENCY_FACTOR = 2.0
+LATENCY_SLACK = 0.1
+ADJUST_INTERVAL = 1.0
+RECOVERY_INTERVAL = 5.0
+ERROR_WEIGHT = 0.05
+ERROR_THRESHOLD = 0.25
+
+
+class HostQueue:
+    def __init__(self, interval, limit):
+        self.pending = []
+        self.size = 0
+        self.fetched = 0
+        self.active = 0
+        self.interval = interval
+        self.next_allowed = 0.0
+        self.last_fetch = None
+        self.scheduled = False
+        self.limit = float(limit)
+        self.latency = None
+        self.baseline = None
+        self.errors = 0.0
+        self.adjusted = 0.0
+
+
+class CrawlFrontier:
+    def __init__(self, max_pages, max_in_flight, host_concurrency=8, host_interval=0.0, state=None, metrics=None,
+                 adaptive=True, seen=None, scorer=None):
+        self.max_pages = max_pages
+        self.max_in_flight = max_in_flight
+        self.host_concurrency = host_concurrency
+        self.host_interval = host_interval
+        self.state = state
+        self.metrics = metrics
+        self.adaptive = adaptive
+        self.scorer = scorer
+        self.attempts = {}
+        self.entries = {}
+        self.condition = threading.Condition()
+        self.hosts = {}
+        self.ready = []
+        self.eligible = []
+        self.delayed = []
+        self.counter = itertools.count()
+        self.seen = set() if seen is None else seen
+        self.pending_count = 0
+        self.in_flight = 0
+        self.pages = 0
+        self.holds = 0
+        self.stopped = False
+        self.listeners = []
+        
+    def host_key(self, url):
+        return urllib.parse.urlsplit(url).netloc.lower()
+        
+    def add(self, url, depth, hint=None):
+        with self.condition:
+            added = self._add(url, depth, hint)
+            if added:
+                self._notify()
+            return added
+            
+    def add_many(self, items):
+        with self.condition:
+            added = sum(self._add(url, depth, hint) for url, depth, hint in items)
+            if added:
+                self._notify()
+            return added
+            
+    def restore(self, urls):
+        with self.condition:
+            for url, depth, status in urls:
+                self.seen.add(url)
+                if status == 'pending':
+                    self._enqueue(url, depth)
+                elif status == 'done':
+                    self.pages += 1
+            self._notify()
+            
+    def get(self, block=True):
+        with self.condition:
+            while True:
+                wait = None
+                if self.pending_count and self._has_capacity():
+                    now = time.monotonic()
+                    self._release_delayed(now)
+                    self._promote(now)
+                    if self.eligible:
+                        item = self._pop(now)
+                        if item:
+                            return item
+                        continue
+                    due = self._next_due()
+                    if due is not None:
+                        wait = due - now
+                if self._finished() or not block:
+                    return None
+                self.condition.wait(wait)
+                
+    def next_ready_delay(self):
+        with self.condition:
+            due = self._next_due()
+            if due is None or not self._has_capacity():
+                return None
+            return max(0.0, due - time.monotonic())
+            
+    def task_done(self, url, fetched):
+        with self.condition:
+            self.in_flight -= 1
+            host = self.hosts[self.host_key(url)]
+            if fetched:
+                self.pages += 1
+                host.fetched += 1
+            self.attempts.pop(url, None)
+            host.active -= 1
+            self._schedule(host)
+            self._notify()
+        if self.state:
+            self.state.finish(url, fetched)
+            
+    def retry(self, url, depth, delay, pause_host=False):
+        with self.condition:
+            now = time.monotonic()
+            self.in_flight -= 1
+            self.attempts[url] = self.attempts.get(url, 0) + 1
+            host = self.hosts[self.host_key(url)]
+            host.active -= 1
+            self.pending_count += 1
+            if pause_host:
+                host.next_allowed = max(host.next_allowed, now + delay)
+                self._push(host, url, depth, now, first=True)
+            else:
+                heapq.heappush(self.delayed, (now + delay, next(self.counter), url, depth))
+            self._schedule(host)
+            self._notify()
+            
+    def report(self, url, seconds=None, failed=False, throttled=False):
+        if not self.adaptive:
+            return
+        with self.condition:
+            host = self.hosts.get(self.host_key(url))
+            if host is None:
+                return
+            congested = throttled
+            if seconds is not None:
+                host.latency = seconds if host.latency is None else host.latency * 0.8 + seconds * 0.2
+                host.baseline = host.latency if host.baseline is None else min(host.baseline, host.latency)
+                congested = congested or (host.latency > host.baseline * LATENCY_FACTOR and
+                                          host.latency - host.baseline > LATENCY_SLACK)
+            host.errors = host.errors * (1 - ERROR_WEIGHT) + (ERROR_WEIGHT if failed or throttled else 0.0)
+            congested = congested or (failed and host.errors > ERROR_THRESHOLD)
+            now = time.monotonic()
+            if congested:
+                if now - host.adjusted >= ADJUST_INTERVAL:
+                    host.limit = max(1.0, host.limit / 2)
+                    host.adjusted = now
+            elif host.limit < self.host_concurrency and now - host.adjusted >= RECOVERY_INTERVAL:
+                host.limit = min(float(self.host_concurrency), host.limit + 1 / host.limit)
+                self._schedule(host)
+                self._notify()
+                
+    def host_limits(self):
+        with self.condition:
+            return {key: host.limit for key, host in self.hosts.items()}
+            
+    def set_crawl_delay(self, url, crawl_delay):
+        if not crawl_delay:
+            return
+        with self.condition:
+            host = self._host(self.host_key(url))
+            interval = max(self.host_interval, float(crawl_delay))
+            if interval == host.interval:
+                return
+            host.interval = interval
+            if host.last_fetch is not None:
+                host.next_allowed = max(host.next_allowed, host.last_fetch + interval)
+            
+    def stop(self):
+        with self.condition:
+            self.stopped = True
+            self._notify()
+            
+    def hold(self):
+        with self.condition:
+            self.holds += 1
+            
+    def release(self):
+        with self.condition:
+            self.holds -= 1
+            self._notify()
+            
+    @property
+    def finished(self):
+        with self.condition:
+            return self._finished()
+            
+    @property
+    def idle(self):
+        with self.condition:
+            return self._idle()
+            
+    def _host(self, key):
+        host = self.hosts.get(key)
+        if host is None:
+            host = self.hosts[key] = HostQueue(self.host_interval, self.host_concurrency)
+        return host
+        
+    def _add(self, url, depth, hint):
+        if url in self.seen:
+            if self.scorer and self.scorer.inlinks and url in self.entries:
+                self._reprioritize(url)
+            return False
+        self.seen.add(url)
+        if self.state:
+            self.state.add(url, depth)
+        self._enqueue(url, depth, hint)
+        return True
+        
+    def _enqueue(self, url, depth, hint=None):
+        host = self._host(self.host_key(url))
+        self._push(host, url, depth, time.monotonic(), hint=hint)
+        self.pending_count += 1
+        self._schedule(host)
+        
+    def _push(self, host, url, depth, queued, inlinks=0, hint=None, first=False):
+        if first:
+            score = float('inf')
+        else:
+            score = self.scorer.score(url, depth, inlinks, hint) if self.scorer else 0.0
+        entry = [-score, next(self.counter), url, depth, queued, inlinks, hint]
+        heapq.heappush(host.pending, entry)
+        self.entries[url] = entry
+        host.size += 1
+        
+    def _reprioritize(self, url):
+        entry = self.entries[url]
+        host = self.hosts[self.host_key(url)]
+        entry[2] = None
+        host.size -= 1
+        self._push(host, url, entry[3], entry[4], entry[5] + 1, entry[6])
+        if len(host.pending) > 2 * host.size + 64:
+            host.pending = [entry for entry in host.pending if entry[2] is not None]
+            heapq.heapify(host.pending)
+            
+    def _top_score(self, host):
+        while host.pending[0][2] is None:
+            heapq.heappop(host.pending)
+        return -host.pending[0][0]
+        
+    def _release_delayed(self, now):
+        while self.delayed and self.delayed[0][0] <= now:
+            due, _, url, depth = heapq.heappop(self.delayed)
+            host = self._host(self.host_key(url))
+            self._push(host, url, depth, due, first=True)
+            self._schedule(host)
+            
+    def _promote(self, now):
+        while self.ready and self.ready[0][0] <= now:
+            _, _, host = heapq.heappop(self.ready)
+            rank = 0.0
+            if self.scorer:
+                rank = self.scorer.host_penalty(host.fetched) - self._top_score(host)
+            heapq.heappush(self.eligible, (rank, next(self.counter), host))
+            
+    def _next_due(self):
+        if self.eligible:
+            return 0.0
+        due = [queue[0][0] for queue in (self.ready, self.delayed) if queue]
+        return min(due) if due else None
+        
+    def _schedule(self, host):
+        if host.size and not host.scheduled and host.active < int(host.limit):
+            host.scheduled = True
+            heapq.heappush(self.ready, (host.next_allowed, next(self.counter), host))
+            
+    def _pop(self, now):
+        _, _, host = heapq.heappop(self.eligible)
+        host.scheduled = False
+        if host.next_allowed > now or host.active >= int(host.limit):
+            self._schedule(host)
+            return None
+        host.active += 1
+        host.last_fetch = now
+        host.next_allowed = now + host.interval
+        self.pending_count -= 1
+        self.in_flight += 1
+        entry = heapq.heappop(host.pending)
+        while entry[2] is None:
+            entry = heapq.heappop(host.pending)
+        _, _, url, depth, queued, _, _ = entry
+        del self.entries[url]
+        host.size -= 1
+        self._schedule(host)
+        if self.metrics:
+            self.metrics.observe('queue_wait', now - queued)
+        return url, depth
+        
+    def _has_capacity(self):
+        if self.stopped:
+            return False
+        return self.in_flight < self.max_in_flight and self.pages + self.in_flight < self.max_pages
+        
+    def _notify(self):
+        self.condition.notify_all()
+        for listener in self.listeners:
+            listener()
+            
+    def _finished(self):
+        return not self.holds and self._idle()
+        
+    def _idle(self):
+        if self.in_flight:
+            return False
+        return self.stopped or not self.pending_count or self.pages >= self.max_pages
@@ -0,0 +1,125 @@
+import importlib.util
+import os
+import ssl
+import threading
+import time
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from nftr_metrics import TimedHTTPAdapter
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+TRACE_STAGES = {'connection.connect_tcp': 'connect', 'connection.start_tls': 'tls'}
+
+
+def http2_available():
+    return httpx is not None and importlib.util.find_spec('h2') is not None
+
+
+def ssl_context(verify):
+    if verify is True or verify is False:
+        return verify
+    if os.path.isdir(verify):
+        return ssl.create_default_context(capath=verify)
+    return ssl.create_default_context(cafile=verify)
+
+
+def httpx_timeout(timeout):
+    if isinstance(timeout, tuple):
+        connect, read = timeout
+        return httpx.Timeout(read, connect=connect)
+    return httpx.Timeout(timeout)
+
+
+class StageTrace:
+    def __init__(self, metrics):
+        self.metrics = metrics
+        self.started = {}
+        
+    def event(self, name, info):
+        stage, _, step = name.rpartition('.')
+        if stage not in TRACE_STAGES:
+            return
+        if step == 'started':
+            self.started[stage] = time.monotonic()
+        elif step == 'complete' and stage in self.started:
+            self.metrics.observe(TRACE_STAGES[stage], time.monotonic() - self.started.pop(stage))
+            if stage == 'connection.connect_tcp':
+                self.metrics.count_connection()
+                
+    def __call__(self, name, info):
+        self.event(name, info)
+        
+    async def atrace(self, name, info):
+        self.event(name, info)
+
+
+class Http2Body:
+    def __init__(self, response):
+        self.response = response
+        
+    def stream(self, chunk_size, decode_content=True):
+        try:
+            yield from self.response.iter_bytes(chunk_size)
+        finally:
+            self.close()
+            
+    def read(self, amt=None, decode_content=True):
+        return b''.join(self.stream(amt))
+        
+    def close(self):
+        self.response.close()
+
+
+class Http2Adapter(TimedHTTPAdapter):
+    def __init__(self, metrics, max_connections=100, **kwargs):
+        if not http2_available():
+            raise RuntimeError("HTTP/2 requires httpx with h2 (pip install 'httpx[http2]')")
+        super().__init__(metrics, **kwargs)
+        self.limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        self.clients = {}
+        self.clients_lock = threading.Lock()
+        
+    def client(self, verify):
+        with self.clients_lock:
+            client = self.clients.get(verify)
+            if client is None:
+                client = self.clients[verify] = httpx.Client(http2=True, verify=ssl_context(verify), limits=self.limits,
+                                                             follow_redirects=False)
+            return client
+            
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        if proxies or cert:
+            return super().send(request, stream=stream, timeout=timeout, verify=verify, cert=cert, proxies=proxies)
+        self.metrics.count_request()
+        client = self.client(verify)
+        try:
+            outgoing = client.build_request(request.method, request.url, headers=dict(request.headers),
+                                                 content=request.body, timeout=httpx_timeout(timeout),
+                                                 extensions={'trace': StageTrace(self.metrics)})
+            incoming = client.send(outgoing, stream=True)
+        except httpx.TimeoutException as e:
+            raise requests.Timeout(e, request=request)
+        except httpx.TransportError as e:
+            raise requests.ConnectionError(e, request=request)
+        response = requests.Response()
+        response.status_code = incoming.status_code
+        response.headers = CaseInsensitiveDict(incoming.headers.items())
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.reason = incoming.reason_phrase
+        response.raw = Http2Body(incoming)
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        return response
+        
+    def close(self):
+        super().close()
+        with self.clients_lock:
+            for client in self.clients.values():
+                client.close()
+            self.clients.clear()
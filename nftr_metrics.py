@@ -0,0 +1,256 @@
+import bisect
+import socket
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError
+from urllib3.util.connection import allowed_gai_family
+
+STAGES = ('queue_wait', 'dns', 'connect', 'tls', 'ttfb', 'download', 'parse', 'extract')
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+    def __init__(self, buckets=BUCKETS, window=2048):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.recent = deque(maxlen=window)
+        
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+        self.recent.append(value)
+        
+    def quantile(self, q):
+        if not self.recent:
+            return None
+        values = sorted(self.recent)
+        return values[min(len(values) - 1, int(q * len(values)))]
+
+
+class CrawlMetrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = time.monotonic()
+        self.histograms = {stage: Histogram() for stage in STAGES}
+        self.responses = {}
+        self.errors = {}
+        self.retries = 0
+        self.bytes = 0
+        self.requests = 0
+        self.connections = 0
+        self.frontier = None
+        
+    def observe(self, stage, seconds):
+        with self.lock:
+            self.histograms[stage].observe(max(0.0, seconds))
+            
+    def count_response(self, status_code):
+        with self.lock:
+            self.responses[status_code] = self.responses.get(status_code, 0) + 1
+            
+    def count_error(self, error):
+        name = type(error).__name__
+        with self.lock:
+            self.errors[name] = self.errors.get(name, 0) + 1
+            
+    def count_request(self):
+        with self.lock:
+            self.requests += 1
+            
+    def count_connection(self):
+        with self.lock:
+            self.connections += 1
+            
+    def reuse_ratio(self):
+        with self.lock:
+            if not self.requests:
+                return None
+            return max(0.0, 1 - self.connections / self.requests)
+            
+    def count_retry(self):
+        with self.lock:
+            self.retries += 1
+            
+    def add_bytes(self, count):
+        with self.lock:
+            self.bytes += count
+            
+    def render(self):
+        lines = []
+        with self.lock:
+            lines.append('# HELP netr_stage_seconds Time spent per request in each crawl stage.')
+            lines.append('# TYPE netr_stage_seconds histogram')
+            for stage, histogram in self.histograms.items():
+                cumulative = 0
+                for bound, count in zip(histogram.buckets + ('+Inf',), histogram.counts):
+                    cumulative += count
+                    lines.append(f'netr_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+                lines.append(f'netr_stage_seconds_sum{{stage="{stage}"}} {histogram.sum}')
+                lines.append(f'netr_stage_seconds_count{{stage="{stage}"}} {histogram.count}')
+            lines.append('# TYPE netr_responses_total counter')
+            for code, count in sorted(self.responses.items()):
+                lines.append(f'netr_responses_total{{code="{code}"}} {count}')
+            lines.append('# TYPE netr_errors_total counter')
+            for name, count in sorted(self.errors.items()):
+                lines.append(f'netr_errors_total{{type="{name}"}} {count}')
+            lines.append('# TYPE netr_retries_total counter')
+            lines.append(f'netr_retries_total {self.retries}')
+            lines.append('# TYPE netr_bytes_total counter')
+            lines.append(f'netr_bytes_total {self.bytes}')
+            lines.append('# TYPE netr_requests_total counter')
+            lines.append(f'netr_requests_total {self.requests}')
+            lines.append('# TYPE netr_connections_total counter')
+            lines.append(f'netr_connections_total {self.connections}')
+        frontier = self.frontier
+        if frontier is not None:
+            lines.append('# TYPE netr_pages_total counter')
+            lines.append(f'netr_pages_total {frontier.pages}')
+            lines.append('# TYPE netr_in_flight gauge')
+            lines.append(f'netr_in_flight {frontier.in_flight}')
+            lines.append('# TYPE netr_pending gauge')
+            lines.append(f'netr_pending {frontier.pending_count}')
+        return '\n'.join(lines) + '\n'
+        
+    def progress_line(self):
+        elapsed = time.monotonic() - self.started
+        frontier = self.frontier
+        pages = frontier.pages if frontier else 0
+        parts = [f"{pages} pages ({pages / elapsed if elapsed else 0:.1f}/s)"]
+        if frontier:
+            parts.append(f"in flight {frontier.in_flight}, pending {frontier.pending_count}")
+        with self.lock:
+            for stage in ('queue_wait', 'ttfb', 'download', 'parse', 'extract'):
+                p50 = self.histograms[stage].quantile(0.5)
+                p99 = self.histograms[stage].quantile(0.99)
+                if p50 is not None:
+                    parts.append(f"{stage} p50 {p50 * 1000:.0f}ms p99 {p99 * 1000:.0f}ms")
+            errors = sum(self.errors.values())
+            megabytes = self.bytes / (1024 * 1024)
+        parts.append(f"{errors} errors, {megabytes:.1f} MB")
+        reuse = self.reuse_ratio()
+        if reuse is not None:
+            parts.append(f"{reuse * 100:.0f}% connection reuse")
+        return ' | '.join(parts)
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] not in ('/', '/metrics'):
+            self.send_error(404)
+            return
+        body = self.server.metrics.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        
+    def log_message(self, format, *args):
+        pass
+
+
+class MetricsServer(ThreadingHTTPServer):
+    daemon_threads = True
+    
+    def __init__(self, metrics, port, host='127.0.0.1'):
+        super().__init__((host, port), MetricsHandler)
+        self.metrics = metrics
+        
+    def start(self):
+        threading.Thread(target=self.serve_forever, name='netr-metrics', daemon=True).start()
+        return self
+
+
+class ProgressReporter:
+    def __init__(self, metrics, interval):
+        self.metrics = metrics
+        self.interval = interval
+        self.stopping = threading.Event()
+        self.thread = None
+        
+    def start(self):
+        self.thread = threading.Thread(target=self.run, name='netr-progress', daemon=True)
+        self.thread.start()
+        return self
+        
+    def run(self):
+        while not self.stopping.wait(self.interval):
+            print(f"[progress] {self.metrics.progress_line()}", flush=True)
+            
+    def stop(self):
+        self.stopping.set()
+        if self.thread:
+            self.thread.join()
+
+
+class TimedConnection:
+    metrics = None
+    socket_seconds = 0.0
+    
+    def _new_conn(self):
+        start = time.monotonic()
+        dns_host = self._dns_host
+        try:
+            addresses = socket.getaddrinfo(dns_host, self.port, allowed_gai_family(), socket.SOCK_STREAM)
+        except (socket.gaierror, UnicodeError):
+            addresses = []
+        resolved = time.monotonic()
+        if addresses:
+            self.metrics.observe('dns', resolved - start)
+        try:
+            sock = self.connect_any([address[4][0] for address in addresses] or [dns_host])
+        finally:
+            self._dns_host = dns_host
+        connected = time.monotonic()
+        self.metrics.observe('connect', connected - resolved)
+        self.metrics.count_connection()
+        self.socket_seconds = connected - start
+        return sock
+        
+    def connect_any(self, hosts):
+        for index, host in enumerate(hosts):
+            self._dns_host = host
+            try:
+                return super()._new_conn()
+            except ConnectTimeoutError:
+                if index == len(hosts) - 1:
+                    raise
+
+
+class TimedHTTPSConnection(TimedConnection, HTTPSConnection):
+    def connect(self):
+        start = time.monotonic()
+        self.socket_seconds = 0.0
+        super().connect()
+        self.metrics.observe('tls', time.monotonic() - start - self.socket_seconds)
+
+
+class TimedHTTPConnection(TimedConnection, HTTPConnection):
+    pass
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    def __init__(self, metrics, **kwargs):
+        self.metrics = metrics
+        super().__init__(**kwargs)
+        
+    def send(self, request, **kwargs):
+        self.metrics.count_request()
+        return super().send(request, **kwargs)
+        
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        http_connection = type('TimedHTTPConnection', (TimedHTTPConnection,), {'metrics': self.metrics})
+        https_connection = type('TimedHTTPSConnection', (TimedHTTPSConnection,), {'metrics': self.metrics})
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': type('TimedHTTPConnectionPool', (HTTPConnectionPool,), {'ConnectionCls': http_connection}),
+            'https': type('TimedHTTPSConnectionPool', (HTTPSConnectionPool,), {'ConnectionCls': https_connection})
+        }
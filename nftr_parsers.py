@@ -0,0 +1,231 @@
+from bs4 import BeautifulSoup, NavigableString
+
+try:
+    import lxml.html
+except ImportError:
+    lxml = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+NON_TEXT_TAGS = ('script', 'style', 'template')
+RAW_TEXT_TAGS = ('title', 'textarea')
+SOUP_TEXT_TYPES = (NavigableString,)
+
+
+def join_text(strings, strip=False):
+    if strip:
+        return ''.join(s.strip() for s in strings if s.strip())
+    return ''.join(strings)
+
+
+class SoupElement:
+    def __init__(self, tag):
+        self.node = tag
+        self.tag = tag.name
+        
+    def get(self, name, default=None):
+        value = self.node.get(name)
+        if value is None:
+            return default
+        if isinstance(value, list):
+            return ' '.join(value)
+        return value
+        
+    def get_list(self, name):
+        value = self.node.get(name)
+        if value is None:
+            return []
+        if isinstance(value, list):
+            return value
+        return value.split()
+        
+    def find_all(self, *tags):
+        return [SoupElement(tag) for tag in self.node.find_all(list(tags))]
+        
+    def get_text(self, strip=False):
+        return self.node.get_text(strip=strip, types=SOUP_TEXT_TYPES)
+        
+    @property
+    def string(self):
+        string = self.node.string
+        return str(string) if string is not None else None
+
+
+class SoupDocument:
+    def __init__(self, html):
+        self.soup = BeautifulSoup(html, 'html.parser', on_duplicate_attribute='ignore')
+        self.normalize()
+        
+    def normalize(self):
+        for tag in self.soup.find_all(('a',) + RAW_TEXT_TAGS):
+            if tag.name != 'a':
+                if tag.find(True) is not None:
+                    tag.string = ''.join(str(child) for child in tag.contents)
+                continue
+            nested = tag.find('a', recursive=False)
+            if nested is not None:
+                for node in reversed([nested] + list(nested.next_siblings)):
+                    tag.insert_after(node.extract())
+                    
+    @property
+    def title(self):
+        if not self.soup.title:
+            return ''
+        string = self.soup.title.string
+        return str(string) if string is not None else None
+        
+    def find_all(self, *tags):
+        return [SoupElement(tag) for tag in self.soup.find_all(list(tags))]
+        
+    def get_text(self):
+        return self.soup.get_text(types=SOUP_TEXT_TYPES)
+
+
+class LxmlElement:
+    def __init__(self, element):
+        self.node = element
+        self.tag = element.tag
+        
+    def get(self, name, default=None):
+        return self.node.get(name, default)
+        
+    def get_list(self, name):
+        return self.node.get(name, '').split()
+        
+    def find_all(self, *tags):
+        return [LxmlElement(el) for el in self.node.iterdescendants(*tags)]
+        
+    def iter_strings(self):
+        node = self.node
+        if node.tag in NON_TEXT_TAGS:
+            return
+        if node.text:
+            yield node.text
+        for child in node:
+            if isinstance(child.tag, str):
+                yield from LxmlElement(child).iter_strings()
+            if child.tail:
+                yield child.tail
+                
+    def get_text(self, strip=False):
+        return join_text(self.iter_strings(), strip)
+        
+    @property
+    def string(self):
+        if len(self.node) or not self.node.text:
+            return None
+        return self.node.text
+
+
+class LxmlDocument:
+    def __init__(self, html):
+        if lxml is None:
+            raise RuntimeError("The lxml parser backend requires lxml (pip install lxml)")
+        self.root = None
+        if html.strip():
+            try:
+                self.root = lxml.html.document_fromstring(html)
+            except ValueError:
+                parser = lxml.html.HTMLParser(encoding='utf-8')
+                self.root = lxml.html.document_fromstring(html.encode('utf-8'), parser=parser)
+                
+    @property
+    def title(self):
+        if self.root is None:
+            return ''
+        for element in self.root.iter('title'):
+            return LxmlElement(element).string
+        return ''
+        
+    def find_all(self, *tags):
+        if self.root is None:
+            return []
+        return [LxmlElement(el) for el in self.root.iter(*tags)]
+        
+    def get_text(self):
+        if self.root is None:
+            return ''
+        return LxmlElement(self.root).get_text()
+
+
+class SelectolaxElement:
+    def __init__(self, node):
+        self.node = node
+        self.tag = node.tag
+        
+    def get(self, name, default=None):
+        attributes = self.node.attributes
+        if name not in attributes:
+            return default
+        value = attributes[name]
+        return value if value is not None else ''
+        
+    def get_list(self, name):
+        return self.get(name, '').split()
+        
+    def find_all(self, *tags):
+        nodes = self.node.traverse()
+        next(nodes, None)
+        return [SelectolaxElement(node) for node in nodes if node.tag in tags]
+        
+    def iter_strings(self, node=None):
+        node = node or self.node
+        if node.tag in NON_TEXT_TAGS:
+            return
+        for child in node.iter(include_text=True):
+            if child.tag == '-text':
+                yield child.text_content
+            elif not child.tag.startswith(('-', '_')):
+                yield from self.iter_strings(child)
+                
+    def get_text(self, strip=False):
+        return join_text(self.iter_strings(), strip)
+        
+    @property
+    def string(self):
+        children = list(self.node.iter(include_text=True))
+        if len(children) == 1 and children[0].tag == '-text':
+            return children[0].text_content
+        return None
+
+
+class SelectolaxDocument:
+    def __init__(self, html):
+        if LexborHTMLParser is None:
+            raise RuntimeError("The selectolax parser backend requires selectolax (pip install selectolax)")
+        self.tree = LexborHTMLParser(html)
+        
+    @property
+    def title(self):
+        node = self.tree.css_first('title')
+        if node is None:
+            return ''
+        return SelectolaxElement(node).string
+        
+    def find_all(self, *tags):
+        root = self.tree.root
+        if root is None:
+            return []
+        if len(tags) == 1:
+            return [SelectolaxElement(node) for node in self.tree.css(tags[0])]
+        return [SelectolaxElement(node) for node in root.traverse() if node.tag in tags]
+        
+    def get_text(self):
+        root = self.tree.root
+        if root is None:
+            return ''
+        return SelectolaxElement(root).get_text()
+
+
+PARSER_BACKENDS = {
+    'html.parser': SoupDocument,
+    'lxml': LxmlDocument,
+    'selectolax': SelectolaxDocument
+}
+
+
+def parse_html(html, backend='html.parser'):
+    return PARSER_BACKENDS[backend](html)
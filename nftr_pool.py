@@ -0,0 +1,49 @@
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from nftr_parsers import parse_html
+from nftr_dedupe import simhash
+
+worker_parser = None
+worker_pipeline = None
+
+
+def init_worker(parser, pipeline):
+    global worker_parser, worker_pipeline
+    worker_parser = parser
+    worker_pipeline = pipeline
+
+
+def extract_page(pipeline, parser, html, extracted):
+    start = time.perf_counter()
+    document = parse_html(html, parser)
+    parsed = time.perf_counter()
+    extracted = pipeline.run(document, extracted)
+    return extracted, parsed - start, time.perf_counter() - parsed
+
+
+def extract_in_worker(html, extracted):
+    return extract_page(worker_pipeline, worker_parser, html, extracted)
+
+
+class ParsePool:
+    def __init__(self, workers, parser, pipeline, max_pending=None):
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=init_worker,
+            initargs=(parser, pipeline)
+        )
+        self.slots = threading.BoundedSemaphore(max_pending or workers * 2)
+        
+    def extract(self, html, extracted):
+        with self.slots:
+            return self.executor.submit(extract_in_worker, html, extracted).result()
+            
+    def simhash(self, html):
+        with self.slots:
+            return self.executor.submit(simhash, html).result()
+            
+    def close(self):
+        self.executor.shutdown()
@@ -0,0 +1,29 @@
+import math
+import urllib.parse
+from nftr_scope import compile_patterns
+
+WEIGHTS = ('depth', 'inlinks', 'host', 'sitemap')
+
+
+class PriorityScorer:
+    def __init__(self, depth=1.0, inlinks=1.0, host=0.5, sitemap=2.0, patterns=()):
+        self.depth = depth
+        self.inlinks = inlinks
+        self.host = host
+        self.sitemap = sitemap
+        self.patterns = [(compile_patterns([pattern]), weight) for pattern, weight in patterns]
+        
+    def score(self, url, depth, inlinks=0, hint=None):
+        score = self.inlinks * math.log2(1 + inlinks) - self.depth * depth
+        if hint is not None:
+            score += self.sitemap * hint
+        if self.patterns:
+            parts = urllib.parse.urlsplit(url)
+            target = parts.path + ('?' + parts.query if parts.query else '')
+            for regex, weight in self.patterns:
+                if regex.match(target):
+                    score += weight
+        return score
+        
+    def host_penalty(self, fetched):
+        return self.host * math.log2(1 + fetched)
@@ -0,0 +1,85 @@
+import threading
+import time
+import urllib.parse
+from urllib.robotparser import RobotFileParser
+
+
+class RobotsEntry:
+    def __init__(self):
+        self.ready = threading.Event()
+        self.parser = None
+        self.expires = 0.0
+
+
+class RobotsCache:
+    def __init__(self, session, timeout=10, ttl=3600, error_ttl=300, get_proxy=None):
+        self.session = session
+        self.timeout = timeout
+        self.ttl = ttl
+        self.error_ttl = error_ttl
+        self.get_proxy = get_proxy
+        self.lock = threading.Lock()
+        self.entries = {}
+        
+    def key_for(self, url):
+        parsed = urllib.parse.urlsplit(url)
+        scheme = parsed.scheme.lower() or 'http'
+        port = parsed.port or (443 if scheme == 'https' else 80)
+        return scheme, (parsed.hostname or '').lower(), port
+        
+    def get(self, url):
+        key = self.key_for(url)
+        with self.lock:
+            entry = self.entries.get(key)
+            owner = entry is None or (entry.ready.is_set() and entry.expires <= time.monotonic())
+            if owner:
+                entry = self.entries[key] = RobotsEntry()
+        if owner:
+            try:
+                entry.parser, ttl = self.fetch(key)
+                entry.expires = time.monotonic() + ttl
+            finally:
+                entry.ready.set()
+        else:
+            entry.ready.wait()
+        return entry.parser
+        
+    def fetch(self, key):
+        scheme, host, port = key
+        default_port = 443 if scheme == 'https' else 80
+        netloc = f"[{host}]" if ':' in host else host
+        if port != default_port:
+            netloc = f"{netloc}:{port}"
+        robots_url = f"{scheme}://{netloc}/robots.txt"
+        rp = RobotFileParser()
+        rp.set_url(robots_url)
+        try:
+            proxy = self.get_proxy() if self.get_proxy else None
+            proxies = {'http': proxy, 'https': proxy} if proxy else None
+            response = self.session.get(robots_url, timeout=self.timeout, proxies=proxies)
+        except Exception:
+            return None, self.error_ttl
+        if response.status_code in (401, 403):
+            rp.disallow_all = True
+            rp.modified()
+            return rp, self.ttl
+        if 400 <= response.status_code < 500:
+            rp.allow_all = True
+            rp.modified()
+            return rp, self.ttl
+        if response.status_code >= 500:
+            return None, self.error_ttl
+        rp.parse(response.text.splitlines())
+        return rp, self.ttl
+        
+    def can_fetch(self, url, user_agent='*'):
+        rp = self.get(url)
+        if rp:
+            return rp.can_fetch(user_agent, url)
+        return True
+        
+    def crawl_delay(self, url, user_agent='*'):
+        rp = self.get(url)
+        if rp:
+            return rp.crawl_delay(user_agent)
+        return None
@@ -0,0 +1,151 @@
+import fnmatch
+import posixpath
+import re
+import urllib.parse
+
+SCOPES = ('any', 'host', 'domain')
+SUBTREE = '*'
+EXACT = '='
+
+
+class HostTrie:
+    def __init__(self):
+        self.root = {}
+        self.size = 0
+        
+    def __len__(self):
+        return self.size
+        
+    def add(self, host, subdomains=True):
+        node = self.root
+        for label in reversed(host.lower().strip('.').split('.')):
+            node = node.setdefault(label, {})
+        flag = SUBTREE if subdomains else EXACT
+        if flag not in node:
+            node[flag] = True
+            self.size += 1
+            
+    def match(self, host):
+        node = self.root
+        for label in reversed(host.split('.')):
+            node = node.get(label)
+            if node is None:
+                return False
+            if SUBTREE in node:
+                return True
+        return EXACT in node
+
+
+def compile_patterns(patterns):
+    parts = []
+    for pattern in patterns:
+        if pattern.startswith('re:'):
+            parts.append(f'.*?(?:{pattern[3:]})')
+        else:
+            parts.append(fnmatch.translate(pattern))
+    return re.compile('|'.join(f'(?:{part})' for part in parts)) if parts else None
+
+
+def first_segment(pattern):
+    if pattern.startswith('re:') or not pattern.startswith('/'):
+        return None
+    segment, slash, _ = pattern[1:].partition('/')
+    if not slash or any(char in segment for char in '*?['):
+        return None
+    return segment
+
+
+class PatternSet:
+    def __init__(self, patterns):
+        grouped = {}
+        for pattern in patterns:
+            grouped.setdefault(first_segment(pattern), []).append(pattern)
+        self.general = compile_patterns(grouped.pop(None, []))
+        self.segments = {segment: compile_patterns(group) for segment, group in grouped.items()}
+        
+    def match(self, target):
+        if self.general is not None and self.general.match(target):
+            return True
+        regex = self.segments.get(target[1:].partition('/')[0])
+        return regex is not None and regex.match(target) is not None
+
+
+class CrawlScope:
+    def __init__(self, scope='any', allow_hosts=(), deny_hosts=(), include=(), exclude=(), deny_extensions=()):
+        if scope not in SCOPES:
+            raise ValueError(f"unknown scope {scope!r} (expected one of {', '.join(SCOPES)})")
+        self.scope = scope
+        self.allowed = HostTrie()
+        self.denied = HostTrie()
+        self.include_patterns = list(include)
+        self.exclude_patterns = list(exclude)
+        self.deny_extensions = set()
+        for host in allow_hosts:
+            self.allowed.add(host)
+        for host in deny_hosts:
+            self.denied.add(host)
+        self.add_extensions(deny_extensions)
+        self.compile()
+        
+    def add_seeds(self, urls):
+        if self.scope == 'any':
+            return
+        for url in urls:
+            host = urllib.parse.urlsplit(url).hostname
+            if not host:
+                continue
+            if self.scope == 'domain':
+                self.allowed.add(host[4:] if host.startswith('www.') else host)
+            else:
+                self.allowed.add(host, subdomains=False)
+                
+    def add_extensions(self, extensions):
+        for extension in extensions:
+            extension = extension.strip().lower()
+            if extension:
+                self.deny_extensions.add(extension if extension.startswith('.') else '.' + extension)
+                
+    def compile(self):
+        self.include = PatternSet(self.include_patterns) if self.include_patterns else None
+        self.exclude = PatternSet(self.exclude_patterns) if self.exclude_patterns else None
+        self.restricted = bool(self.scope != 'any' or len(self.allowed) or len(self.denied) or self.deny_extensions or
+                               self.include or self.exclude)
+        
+    def load(self, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+                rule, _, value = line.partition(' ')
+                value = value.strip()
+                if rule == 'allow':
+                    self.allowed.add(value)
+                elif rule == 'deny':
+                    self.denied.add(value)
+                elif rule == 'include':
+                    self.include_patterns.append(value)
+                elif rule == 'exclude':
+                    self.exclude_patterns.append(value)
+                elif rule == 'deny-extension':
+                    self.add_extensions([value])
+                else:
+                    raise ValueError(f"{path}: unknown scope rule {rule!r}")
+        self.compile()
+        return self
+        
+    def allows(self, url):
+        if not self.restricted:
+            return True
+        parts = urllib.parse.urlsplit(url)
+        host = (parts.hostname or '').rstrip('.')
+        if len(self.denied) and self.denied.match(host):
+            return False
+        if (self.scope != 'any' or len(self.allowed)) and not self.allowed.match(host):
+            return False
+        if self.deny_extensions and posixpath.splitext(parts.path)[1].lower() in self.deny_extensions:
+            return False
+        target = parts.path + ('?' + parts.query if parts.query else '')
+        if self.include is not None and not self.include.match(target):
+            return False
+        return self.exclude is None or not self.exclude.match(target)
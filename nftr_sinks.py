@@ -0,0 +1,317 @@
+import csv
+import json
+import queue
+import sqlite3
+import threading
+import time
+import urllib.parse
+
+
+class ResultSink:
+    def __init__(self, batch_size=100, flush_interval=1.0):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue(maxsize=batch_size * 10)
+        self.thread = None
+        self.count = 0
+        
+    def start(self):
+        self.thread = threading.Thread(target=self.run, name=f"{type(self).__name__}-writer", daemon=True)
+        self.thread.start()
+        return self
+        
+    def write(self, record):
+        self.queue.put(record)
+        
+    def close(self):
+        self.queue.put(None)
+        self.thread.join()
+        
+    def run(self):
+        try:
+            self.open()
+        except Exception as e:
+            print(f"Error opening result sink: {str(e)}")
+            while self.queue.get() is not None:
+                pass
+            return
+        try:
+            running = True
+            while running:
+                batch = []
+                deadline = time.monotonic() + self.flush_interval
+                while len(batch) < self.batch_size:
+                    try:
+                        record = self.queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                    except queue.Empty:
+                        break
+                    if record is None:
+                        running = False
+                        break
+                    batch.append(record)
+                if batch:
+                    try:
+                        self.write_batch(batch)
+                        self.flush()
+                        self.count += len(batch)
+                    except Exception as e:
+                        print(f"Error writing results: {str(e)}")
+        finally:
+            self.finalize()
+            
+    def open(self):
+        pass
+        
+    def write_batch(self, records):
+        raise NotImplementedError
+        
+    def flush(self):
+        pass
+        
+    def finalize(self):
+        pass
+
+
+class JsonLinesSink(ResultSink):
+    def __init__(self, path, **options):
+        super().__init__(**options)
+        self.path = path
+        self.file = None
+        
+    def open(self):
+        self.file = open(self.path, 'w', encoding='utf-8')
+        
+    def write_batch(self, records):
+        self.file.write(''.join(json.dumps(record, ensure_ascii=False) + '\n' for record in records))
+        
+    def flush(self):
+        self.file.flush()
+        
+    def finalize(self):
+        self.file.close()
+
+
+class JsonSink(JsonLinesSink):
+    def __init__(self, path, **options):
+        super().__init__(path, **options)
+        self.empty = True
+        
+    def open(self):
+        super().open()
+        self.file.write('[')
+        
+    def write_batch(self, records):
+        for record in records:
+            lines = json.dumps(record, indent=2, ensure_ascii=False).split('\n')
+            self.file.write(('\n' if self.empty else ',\n') + '\n'.join('  ' + line for line in lines))
+            self.empty = False
+            
+    def finalize(self):
+        self.file.write(']' if self.empty else '\n]')
+        super().finalize()
+
+
+class CsvSink(ResultSink):
+    def __init__(self, path, extra_fields=(), **options):
+        super().__init__(**options)
+        self.path = path
+        self.extra_fields = extra_fields
+        self.file = None
+        self.writer = None
+        
+    def open(self):
+        self.file = open(self.path, 'w', newline='', encoding='utf-8')
+        
+    def write_batch(self, records):
+        if self.writer is None:
+            fieldnames = list(records[0].keys())
+            fieldnames += [field for field in self.extra_fields if field not in fieldnames]
+            self.writer = csv.DictWriter(self.file, fieldnames=fieldnames, extrasaction='ignore')
+            self.writer.writeheader()
+        self.writer.writerows(records)
+        
+    def flush(self):
+        self.file.flush()
+        
+    def finalize(self):
+        self.file.close()
+
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL,
+    host TEXT,
+    crawled_at TEXT,
+    status_code INTEGER,
+    content_type TEXT,
+    content_length INTEGER,
+    server TEXT,
+    x_powered_by TEXT,
+    title TEXT,
+    meta_description TEXT,
+    meta_keywords TEXT,
+    meta_viewport TEXT,
+    meta_charset TEXT,
+    text_content TEXT,
+    text_length INTEGER,
+    security_score INTEGER,
+    structured_data TEXT,
+    tables TEXT,
+    ssl_certificate TEXT
+);
+CREATE TABLE IF NOT EXISTS links (
+    page_id INTEGER NOT NULL REFERENCES pages(id),
+    href TEXT,
+    target_url TEXT,
+    target_host TEXT,
+    text TEXT,
+    title TEXT,
+    rel TEXT,
+    target TEXT
+);
+CREATE TABLE IF NOT EXISTS images (
+    page_id INTEGER NOT NULL REFERENCES pages(id),
+    src TEXT,
+    alt TEXT,
+    title TEXT,
+    width TEXT,
+    height TEXT
+);
+CREATE TABLE IF NOT EXISTS forms (
+    id INTEGER PRIMARY KEY,
+    page_id INTEGER NOT NULL REFERENCES pages(id),
+    action TEXT,
+    method TEXT,
+    enctype TEXT
+);
+CREATE TABLE IF NOT EXISTS form_inputs (
+    form_id INTEGER NOT NULL REFERENCES forms(id),
+    type TEXT,
+    name TEXT,
+    value TEXT,
+    placeholder TEXT,
+    required INTEGER
+);
+CREATE TABLE IF NOT EXISTS technologies (
+    page_id INTEGER NOT NULL REFERENCES pages(id),
+    name TEXT
+);
+CREATE TABLE IF NOT EXISTS headers (
+    page_id INTEGER NOT NULL REFERENCES pages(id),
+    name TEXT,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS matches (
+    page_id INTEGER NOT NULL REFERENCES pages(id),
+    type TEXT,
+    value TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_pages_url ON pages(url);
+CREATE INDEX IF NOT EXISTS idx_pages_host ON pages(host);
+CREATE INDEX IF NOT EXISTS idx_links_page ON links(page_id);
+CREATE INDEX IF NOT EXISTS idx_links_target_url ON links(target_url);
+CREATE INDEX IF NOT EXISTS idx_links_target_host ON links(target_host);
+CREATE INDEX IF NOT EXISTS idx_images_page ON images(page_id);
+CREATE INDEX IF NOT EXISTS idx_forms_page ON forms(page_id);
+CREATE INDEX IF NOT EXISTS idx_form_inputs_form ON form_inputs(form_id);
+CREATE INDEX IF NOT EXISTS idx_technologies_name ON technologies(name, page_id);
+CREATE INDEX IF NOT EXISTS idx_headers_name ON headers(name, page_id);
+CREATE INDEX IF NOT EXISTS idx_matches_type ON matches(type, value);
+"""
+
+SQLITE_SUMMARY_VIEW = """
+CREATE VIEW IF NOT EXISTS {name} AS
+SELECT url, title, meta_description,
+       (SELECT COUNT(*) FROM links WHERE links.page_id = pages.id) AS links_count,
+       (SELECT COUNT(*) FROM images WHERE images.page_id = pages.id) AS images_count,
+       (SELECT COUNT(*) FROM forms WHERE forms.page_id = pages.id) AS forms_count,
+       text_length,
+       (SELECT GROUP_CONCAT(name, ', ') FROM technologies WHERE technologies.page_id = pages.id) AS technologies,
+       security_score,
+       (SELECT COUNT(DISTINCT type) FROM matches WHERE matches.page_id = pages.id) AS matches_count
+FROM pages
+"""
+
+
+class SqliteSink(ResultSink):
+    def __init__(self, path, summary_view=None, match_fields=(), skip_existing=False, **options):
+        options.setdefault('batch_size', 1000)
+        super().__init__(**options)
+        self.path = path
+        self.summary_view = summary_view
+        self.match_fields = match_fields
+        self.skip_existing = skip_existing
+        self.conn = None
+        self.next_page_id = 1
+        self.next_form_id = 1
+        
+    def open(self):
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SQLITE_SCHEMA)
+        if self.summary_view:
+            try:
+                self.conn.execute(SQLITE_SUMMARY_VIEW.format(name=self.summary_view))
+            except sqlite3.OperationalError:
+                pass
+        self.next_page_id = self.conn.execute('SELECT COALESCE(MAX(id), 0) + 1 FROM pages').fetchone()[0]
+        self.next_form_id = self.conn.execute('SELECT COALESCE(MAX(id), 0) + 1 FROM forms').fetchone()[0]
+        
+    def write_batch(self, records):
+        pages, links, images, forms, inputs, technologies, headers, matches = [], [], [], [], [], [], [], []
+        for record in records:
+            if self.skip_existing and self.conn.execute('SELECT 1 FROM pages WHERE url = ?', (record['url'],)).fetchone():
+                continue
+            page_id = self.next_page_id
+            self.next_page_id += 1
+            url = record['url']
+            text_content = record.get('text_content', '')
+            pages.append((
+                page_id, url, urllib.parse.urlsplit(url).hostname, record.get('timestamp'),
+                record.get('status_code'), record.get('content_type'), record.get('content_length'),
+                record.get('server'), record.get('x_powered_by'), record.get('title'),
+                record.get('meta_description'), record.get('meta_keywords'), record.get('meta_viewport'),
+                record.get('meta_charset'), text_content, len(text_content),
+                len(record.get('security_headers') or {}),
+                json.dumps(record.get('structured_data', []), ensure_ascii=False),
+                json.dumps(record.get('tables', []), ensure_ascii=False),
+                json.dumps(record['ssl_certificate'], ensure_ascii=False) if record.get('ssl_certificate') else None
+            ))
+            for link in record.get('links', []):
+                target_url = urllib.parse.urljoin(url, link['href'])
+                links.append((
+                    page_id, link['href'], target_url, urllib.parse.urlsplit(target_url).hostname,
+                    link.get('text'), link.get('title'), ' '.join(link.get('rel', [])), link.get('target')
+                ))
+            for image in record.get('images', []):
+                images.append((page_id, image.get('src'), image.get('alt'), image.get('title'),
+                               image.get('width'), image.get('height')))
+            for form in record.get('forms', []):
+                form_id = self.next_form_id
+                self.next_form_id += 1
+                forms.append((form_id, page_id, form.get('action'), form.get('method'), form.get('enctype')))
+                for input_tag in form.get('inputs', []):
+                    inputs.append((form_id, input_tag.get('type'), input_tag.get('name'), input_tag.get('value'),
+                                   input_tag.get('placeholder'), int(input_tag.get('required', False) is not False)))
+            for technology in record.get('technologies', []):
+                technologies.append((page_id, technology))
+            for name, value in (record.get('response_headers') or {}).items():
+                headers.append((page_id, name, value))
+            found = dict(record.get('secrets') or {})
+            found.update((field, record[field]) for field in self.match_fields if field in record)
+            for match_type, values in found.items():
+                matches.extend((page_id, match_type, str(value)) for value in values)
+        with self.conn:
+            self.conn.executemany(f"INSERT INTO pages VALUES ({', '.join('?' * 20)})", pages)
+            self.conn.executemany('INSERT INTO links VALUES (?, ?, ?, ?, ?, ?, ?, ?)', links)
+            self.conn.executemany('INSERT INTO images VALUES (?, ?, ?, ?, ?, ?)', images)
+            self.conn.executemany('INSERT INTO forms VALUES (?, ?, ?, ?, ?)', forms)
+            self.conn.executemany('INSERT INTO form_inputs VALUES (?, ?, ?, ?, ?, ?)', inputs)
+            self.conn.executemany('INSERT INTO technologies VALUES (?, ?)', technologies)
+            self.conn.executemany('INSERT INTO headers VALUES (?, ?, ?)', headers)
+            self.conn.executemany('INSERT INTO matches VALUES (?, ?, ?)', matches)
+        
+    def finalize(self):
+        self.conn.close()
@@ -0,0 +1,176 @@
+import datetime
+import gzip
+import threading
+import urllib.parse
+import xml.etree.ElementTree as ET
+from collections import deque
+from nftr_fetch import CHUNK_SIZE
+
+GZIP_MAGIC = b'\x1f\x8b'
+UTF8_BOM = b'\xef\xbb\xbf'
+BATCH_SIZE = 1000
+MAX_SITEMAPS = 1000
+DEFAULT_PRIORITY = 0.5
+
+
+class ChunkReader:
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.buffer = b''
+        
+    def peek(self, size):
+        while len(self.buffer) < size:
+            chunk = next(self.chunks, None)
+            if chunk is None:
+                break
+            self.buffer += chunk
+        return self.buffer[:size]
+        
+    def read(self, size=-1):
+        if size is None or size < 0:
+            data, self.buffer = self.buffer + b''.join(self.chunks), b''
+            return data
+        self.peek(size)
+        data, self.buffer = self.buffer[:size], self.buffer[size:]
+        return data
+        
+    def readline(self):
+        while b'\n' not in self.buffer:
+            chunk = next(self.chunks, None)
+            if chunk is None:
+                break
+            self.buffer += chunk
+        line, newline, self.buffer = self.buffer.partition(b'\n')
+        return line + newline
+
+
+def parse_lastmod(value):
+    if not value:
+        return None
+    try:
+        lastmod = datetime.datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if lastmod.tzinfo is None:
+        lastmod = lastmod.replace(tzinfo=datetime.timezone.utc)
+    return lastmod
+
+
+def parse_priority(value):
+    try:
+        return min(1.0, max(0.0, float(value)))
+    except (TypeError, ValueError):
+        return None
+
+
+def iter_sitemap(stream):
+    if stream.peek(2)[:2] == GZIP_MAGIC:
+        gzip_file = gzip.GzipFile(fileobj=stream)
+        stream = ChunkReader(iter(lambda: gzip_file.read(CHUNK_SIZE), b''))
+    head = stream.peek(512)
+    if head.startswith(UTF8_BOM):
+        head = head[len(UTF8_BOM):]
+    if not head.lstrip().startswith(b'<'):
+        for line in iter(stream.readline, b''):
+            line = line.decode('utf-8-sig', 'replace').strip()
+            if line:
+                yield 'url', line, None, None
+        return
+    root = None
+    fields = {}
+    for event, element in ET.iterparse(stream, events=('start', 'end')):
+        if root is None:
+            root = element
+        if event == 'start':
+            continue
+        name = element.tag.rpartition('}')[2]
+        if name in ('loc', 'lastmod', 'priority'):
+            fields[name] = (element.text or '').strip()
+        elif name in ('url', 'sitemap'):
+            if fields.get('loc'):
+                yield name, fields['loc'], parse_lastmod(fields.get('lastmod')), parse_priority(fields.get('priority'))
+            fields = {}
+            root.clear()
+
+
+class SitemapSeeder:
+    def __init__(self, crawler, seeds, since=None, max_sitemaps=MAX_SITEMAPS):
+        self.crawler = crawler
+        self.frontier = crawler.frontier
+        self.seeds = list(seeds)
+        self.since = since
+        self.max_sitemaps = max_sitemaps
+        self.sitemaps = 0
+        self.urls = 0
+        self.stopping = threading.Event()
+        self.thread = None
+        
+    def start(self):
+        self.frontier.hold()
+        self.thread = threading.Thread(target=self.run, name='netr-sitemaps', daemon=True)
+        self.thread.start()
+        return self
+        
+    def done(self):
+        return self.stopping.is_set() or self.frontier.stopped or self.frontier.pages >= self.frontier.max_pages
+        
+    def sitemap_urls(self):
+        for seed in self.seeds:
+            parts = urllib.parse.urlsplit(seed)
+            robots = self.crawler.check_robots_txt(seed)
+            for url in (robots.site_maps() if robots else None) or []:
+                yield url
+            yield f"{parts.scheme}://{parts.netloc}/sitemap.xml"
+            
+    def run(self):
+        try:
+            pending = deque()
+            queued = set()
+            for url in self.sitemap_urls():
+                url = self.crawler.canonical_url(url)
+                if url and url not in queued:
+                    queued.add(url)
+                    pending.append(url)
+            batch = []
+            while pending and self.sitemaps < self.max_sitemaps and not self.done():
+                for kind, loc, lastmod, priority in self.read(pending.popleft()):
+                    url = self.crawler.canonical_url(loc)
+                    if url is None:
+                        continue
+                    if kind == 'sitemap':
+                        if url not in queued:
+                            queued.add(url)
+                            pending.append(url)
+                    elif self.since is None or lastmod is None or lastmod >= self.since:
+                        batch.append((url, 0, DEFAULT_PRIORITY if priority is None else priority))
+                        if len(batch) >= BATCH_SIZE:
+                            self.seed(batch)
+                            batch = []
+                            if self.done():
+                                return
+            self.seed(batch)
+        except Exception as e:
+            print(f"Error seeding from sitemaps: {str(e)}")
+        finally:
+            self.frontier.release()
+            
+    def read(self, url):
+        try:
+            response = self.crawler.session.get(url, timeout=self.crawler.timeout, stream=True,
+                                                **self.crawler.request_options(url))
+            with response:
+                if response.status_code != 200:
+                    return
+                self.sitemaps += 1
+                yield from iter_sitemap(ChunkReader(response.iter_content(CHUNK_SIZE)))
+        except Exception as e:
+            print(f"Error reading sitemap {url}: {str(e)}")
+            
+    def seed(self, batch):
+        if batch:
+            self.urls += self.crawler.enqueue_many(batch)
+            
+    def stop(self):
+        self.stopping.set()
+        if self.thread:
+            self.thread.join()
@@ -0,0 +1,69 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+PENDING = 'pending'
+DONE = 'done'
+SKIPPED = 'skipped'
+
+
+class CrawlState:
+    def __init__(self, state_dir, resume=False):
+        os.makedirs(state_dir, exist_ok=True)
+        self.path = os.path.join(state_dir, 'crawl_state.db')
+        if not resume:
+            for suffix in ('', '-wal', '-shm'):
+                if os.path.exists(self.path + suffix):
+                    os.remove(self.path + suffix)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS urls (
+                url TEXT PRIMARY KEY,
+                depth INTEGER NOT NULL,
+                status TEXT NOT NULL,
+                status_code INTEGER,
+                record TEXT,
+                updated REAL
+            )
+        ''')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_urls_status ON urls(status)')
+        self.conn.commit()
+        self.resumed = resume and self.conn.execute('SELECT 1 FROM urls LIMIT 1').fetchone() is not None
+        
+    def add(self, url, depth):
+        with self.lock:
+            self.conn.execute('INSERT OR IGNORE INTO urls (url, depth, status, updated) VALUES (?, ?, ?, ?)',
+                              (url, depth, PENDING, time.time()))
+            
+    def record(self, url, status_code, record=None):
+        data = json.dumps(record, ensure_ascii=False) if record is not None else None
+        with self.lock:
+            self.conn.execute('UPDATE urls SET status_code = ?, record = ?, updated = ? WHERE url = ?',
+                              (status_code, data, time.time(), url))
+            
+    def finish(self, url, fetched):
+        with self.lock:
+            self.conn.execute('UPDATE urls SET status = ?, updated = ? WHERE url = ?',
+                              (DONE if fetched else SKIPPED, time.time(), url))
+            self.conn.commit()
+            
+    def urls(self):
+        with self.lock:
+            return self.conn.execute('SELECT url, depth, status FROM urls ORDER BY rowid').fetchall()
+            
+    def records(self):
+        with self.lock:
+            rows = self.conn.execute('SELECT record FROM urls WHERE status = ? AND record IS NOT NULL ORDER BY rowid',
+                                     (DONE,)).fetchall()
+        for (data,) in rows:
+            yield json.loads(data)
+            
+    def close(self):
+        with self.lock:
+            self.conn.commit()
+            self.conn.close()
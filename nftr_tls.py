@@ -0,0 +1,59 @@
+import socket
+import ssl
+import threading
+import time
+import urllib.parse
+
+
+class CertificateEntry:
+    def __init__(self):
+        self.ready = threading.Event()
+        self.certificate = None
+        self.expires = 0.0
+
+
+class CertificateCache:
+    def __init__(self, timeout=10, ttl=3600, error_ttl=300):
+        self.timeout = timeout
+        self.ttl = ttl
+        self.error_ttl = error_ttl
+        self.context = ssl.create_default_context()
+        self.lock = threading.Lock()
+        self.entries = {}
+        
+    def get(self, url):
+        parsed = urllib.parse.urlsplit(url)
+        if parsed.scheme != 'https' or not parsed.hostname:
+            return None
+        key = (parsed.hostname.lower(), parsed.port or 443)
+        with self.lock:
+            entry = self.entries.get(key)
+            owner = entry is None or (entry.ready.is_set() and entry.expires <= time.monotonic())
+            if owner:
+                entry = self.entries[key] = CertificateEntry()
+        if owner:
+            try:
+                entry.certificate = self.fetch(*key)
+                ttl = self.ttl if entry.certificate else self.error_ttl
+                entry.expires = time.monotonic() + ttl
+            finally:
+                entry.ready.set()
+        else:
+            entry.ready.wait()
+        return entry.certificate
+        
+    def fetch(self, host, port):
+        try:
+            with socket.create_connection((host, port), timeout=self.timeout) as sock:
+                with self.context.wrap_socket(sock, server_hostname=host) as ssock:
+                    cert = ssock.getpeercert()
+                    return {
+                        'issuer': dict(x[0] for x in cert['issuer']),
+                        'subject': dict(x[0] for x in cert['subject']),
+                        'version': cert['version'],
+                        'serial_number': cert['serialNumber'],
+                        'not_before': cert['notBefore'],
+                        'not_after': cert['notAfter']
+                    }
+        except Exception:
+            return None
@@ -0,0 +1,95 @@
+import re
+import string
+import urllib.parse
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+TRACKING_PARAMS = (
+    'utm_*', 'gclid', 'gclsrc', 'dclid', 'fbclid', 'msclkid', 'yclid', 'twclid', 'igshid', 'mc_cid', 'mc_eid',
+    '_ga', '_gl', '_hsenc', '_hsmi', 'mkt_tok', 'oly_anon_id', 'oly_enc_id', 'vero_id', 'wickedid'
+)
+UNRESERVED = frozenset(string.ascii_letters + string.digits + '-._~')
+PERCENT_ESCAPE = re.compile(r'%([0-9A-Fa-f]{2})')
+PATH_SAFE = "%/:@!$&'()*+,;=-._~"
+QUERY_SAFE = "%/:@!$&'()*+,;=?-._~"
+
+
+def normalize_escapes(value, safe):
+    value = urllib.parse.quote(value, safe=safe)
+    
+    def replace(match):
+        char = chr(int(match.group(1), 16))
+        return char if char in UNRESERVED else '%' + match.group(1).upper()
+    return PERCENT_ESCAPE.sub(replace, value)
+
+
+def remove_dot_segments(path):
+    output = []
+    for segment in path.split('/'):
+        if segment == '..':
+            if len(output) > 1:
+                output.pop()
+        elif segment != '.':
+            output.append(segment)
+    if path.endswith(('/.', '/..')):
+        output.append('')
+    return '/'.join(output)
+
+
+class UrlCanonicalizer:
+    def __init__(self, strip_fragments=True, sort_query=True, drop_params=TRACKING_PARAMS, normalize_encoding=True,
+                 schemes=('http', 'https'), strip_trailing_slash=False):
+        self.strip_fragments = strip_fragments
+        self.sort_query = sort_query
+        self.normalize_encoding = normalize_encoding
+        self.schemes = frozenset(scheme.lower() for scheme in schemes)
+        self.strip_trailing_slash = strip_trailing_slash
+        drop_params = [param.lower() for param in drop_params or ()]
+        self.drop_names = frozenset(param for param in drop_params if not param.endswith('*'))
+        self.drop_prefixes = tuple(param[:-1] for param in drop_params if param.endswith('*'))
+        
+    def canonicalize(self, url, base=None):
+        if base:
+            url = urllib.parse.urljoin(base, url.strip())
+        try:
+            parts = urllib.parse.urlsplit(url.strip())
+            port = parts.port
+        except ValueError:
+            return None
+        scheme = parts.scheme.lower()
+        if scheme not in self.schemes or not parts.hostname:
+            return None
+        netloc = self.netloc(scheme, parts, port)
+        path = normalize_escapes(parts.path, PATH_SAFE) if self.normalize_encoding else parts.path
+        path = remove_dot_segments(path) or '/'
+        if self.strip_trailing_slash and len(path) > 1:
+            path = path.rstrip('/') or '/'
+        query = self.query(parts.query)
+        fragment = '' if self.strip_fragments else parts.fragment
+        if self.normalize_encoding:
+            fragment = normalize_escapes(fragment, QUERY_SAFE)
+        return urllib.parse.urlunsplit((scheme, netloc, path, query, fragment))
+        
+    def netloc(self, scheme, parts, port):
+        host = parts.hostname.rstrip('.')
+        try:
+            host = host.encode('idna').decode('ascii')
+        except UnicodeError:
+            pass
+        if ':' in host:
+            host = f'[{host}]'
+        if port is not None and port != DEFAULT_PORTS.get(scheme):
+            host = f'{host}:{port}'
+        userinfo = parts.netloc.rpartition('@')[0]
+        return f'{userinfo}@{host}' if userinfo else host
+        
+    def query(self, query):
+        params = [param for param in query.split('&') if param and not self.dropped(param)]
+        if self.normalize_encoding:
+            params = [normalize_escapes(param, QUERY_SAFE) for param in params]
+        if self.sort_query:
+            params.sort(key=lambda param: param.partition('=')[0])
+        return '&'.join(params)
+        
+    def dropped(self, param):
+        name = urllib.parse.unquote_plus(param.partition('=')[0]).lower()
+        return name in self.drop_names or name.startswith(self.drop_prefixes)
@@ -0,0 +1,186 @@
+import bisect
+import hashlib
+import heapq
+import math
+import mmap
+import os
+from array import array
+
+MERGE_CHUNK = 65536
+MAX_LOAD = 0.7
+SORT_BUCKET_BITS = 8
+SPILL_MAGIC = b'NFTRVIS1'
+
+
+def is_spill_file(path):
+    try:
+        with open(path, 'rb') as f:
+            return f.read(len(SPILL_MAGIC)) == SPILL_MAGIC
+    except OSError:
+        return False
+
+
+def fingerprint(url):
+    value = int.from_bytes(hashlib.blake2b(url.encode('utf-8', 'surrogatepass'), digest_size=8).digest(), 'little')
+    return value or 1
+
+
+class BloomFilter:
+    def __init__(self, capacity, error_rate):
+        self.size = max(64, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        
+    def add(self, value):
+        bits, size, position, step = self.bits, self.size, value & 0xFFFFFFFF, (value >> 32) | 1
+        for _ in range(self.hashes):
+            position = (position + step) % size
+            bits[position >> 3] |= 1 << (position & 7)
+            
+    def __contains__(self, value):
+        bits, size, position, step = self.bits, self.size, value & 0xFFFFFFFF, (value >> 32) | 1
+        for _ in range(self.hashes):
+            position = (position + step) % size
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+
+class FingerprintTable:
+    def __init__(self, capacity=1024):
+        self.slots = array('Q', bytes(8 * capacity))
+        self.mask = capacity - 1
+        self.count = 0
+        
+    def __len__(self):
+        return self.count
+        
+    def __contains__(self, value):
+        slots, mask = self.slots, self.mask
+        index = value & mask
+        while slots[index]:
+            if slots[index] == value:
+                return True
+            index = (index + 1) & mask
+        return False
+        
+    def add(self, value):
+        slots, mask = self.slots, self.mask
+        index = value & mask
+        while slots[index]:
+            if slots[index] == value:
+                return False
+            index = (index + 1) & mask
+        slots[index] = value
+        self.count += 1
+        if self.count > len(slots) * MAX_LOAD:
+            self.resize(len(slots) * 2)
+        return True
+        
+    def resize(self, capacity):
+        old = self.slots
+        self.slots = array('Q', bytes(8 * capacity))
+        self.mask = capacity - 1
+        self.count = 0
+        for value in old:
+            if value:
+                self.add(value)
+                
+    def sorted_values(self):
+        shift = 64 - SORT_BUCKET_BITS
+        buckets = [array('Q') for _ in range(1 << SORT_BUCKET_BITS)]
+        for value in filter(None, self.slots):
+            buckets[value >> shift].append(value)
+        for index in range(len(buckets)):
+            bucket, buckets[index] = buckets[index], None
+            yield from sorted(bucket)
+
+
+class VisitedSet:
+    def __init__(self, path=None, memory_items=4000000, expected_items=10000000, error_rate=0.001, replace=False):
+        self.path = path
+        self.memory_items = memory_items
+        self.bloom = BloomFilter(expected_items, error_rate) if path and error_rate else None
+        self.table = FingerprintTable()
+        self.disk = None
+        self.disk_file = None
+        self.disk_items = None
+        self.count = 0
+        if path:
+            for stale in (path, path + '.tmp'):
+                if replace and is_spill_file(stale):
+                    os.remove(stale)
+            if os.path.exists(path + '.tmp'):
+                raise FileExistsError(f"visited spill file {path + '.tmp'} already exists")
+            try:
+                with open(path, 'xb') as f:
+                    f.write(SPILL_MAGIC)
+            except FileExistsError:
+                raise FileExistsError(f"visited spill file {path} already exists") from None
+            
+    def __len__(self):
+        return self.count
+        
+    def __contains__(self, url):
+        return self.contains(fingerprint(url))
+        
+    def add(self, url):
+        value = fingerprint(url)
+        if self.on_disk(value) or not self.table.add(value):
+            return False
+        if self.bloom is not None:
+            self.bloom.add(value)
+        self.count += 1
+        if self.path and len(self.table) >= self.memory_items:
+            self.spill()
+        return True
+        
+    def contains(self, value):
+        return value in self.table or self.on_disk(value)
+        
+    def on_disk(self, value):
+        if self.disk_items is None or (self.bloom is not None and value not in self.bloom):
+            return False
+        index = bisect.bisect_left(self.disk_items, value)
+        return index < len(self.disk_items) and self.disk_items[index] == value
+        
+    def spill(self):
+        sources = [self.table.sorted_values()]
+        if self.disk_items is not None:
+            sources.append(self.iter_disk())
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'xb') as f:
+            f.write(SPILL_MAGIC)
+            chunk = array('Q')
+            for value in heapq.merge(*sources):
+                chunk.append(value)
+                if len(chunk) >= MERGE_CHUNK:
+                    chunk.tofile(f)
+                    chunk = array('Q')
+            chunk.tofile(f)
+        self.close_disk()
+        os.replace(temp_path, self.path)
+        self.disk_file = open(self.path, 'rb')
+        self.disk = mmap.mmap(self.disk_file.fileno(), 0, access=mmap.ACCESS_READ)
+        with memoryview(self.disk) as view:
+            self.disk_items = view[len(SPILL_MAGIC):].cast('Q')
+        self.table = FingerprintTable()
+        
+    def iter_disk(self):
+        for start in range(0, len(self.disk_items), MERGE_CHUNK):
+            yield from self.disk_items[start:start + MERGE_CHUNK].tolist()
+            
+    def close_disk(self):
+        if self.disk_items is not None:
+            self.disk_items.release()
+            self.disk.close()
+            self.disk_file.close()
+            self.disk_items = self.disk = self.disk_file = None
+            
+    def close(self):
+        self.close_disk()
+        if self.path:
+            for path in (self.path, self.path + '.tmp'):
+                if os.path.exists(path):
+                    os.remove(path)
+            self.path = None
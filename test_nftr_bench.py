@@ -0,0 +1,106 @@
+import json
+import pytest
+import requests
+import nftr_bench
+from nftr_bench import SyntheticSite, case_key, compare, format_result, spawn_case
+
+
+@pytest.fixture(scope='module')
+def site():
+    site = SyntheticSite(pages=30, fanout=3, page_size=2048, error_rate=0.2, hosts=3, seed=4).start()
+    yield site
+    site.stop()
+
+
+def reachable(site):
+    seen, pending = {0}, [0]
+    while pending:
+        page = pending.pop()
+        for link in () if site.is_error(page) else site.links(page):
+            if link not in seen:
+                seen.add(link)
+                pending.append(link)
+    return seen
+
+
+def test_generated_site_is_deterministic():
+    first, second, other = SyntheticSite(pages=50, seed=1), SyntheticSite(pages=50, seed=1), SyntheticSite(pages=50, seed=2)
+    assert [first.links(page) for page in range(50)] == [second.links(page) for page in range(50)]
+    assert [first.links(page) for page in range(50)] != [other.links(page) for page in range(50)]
+    assert [first.is_error(page) for page in range(50)] == [second.is_error(page) for page in range(50)]
+    assert all(link < 50 for page in range(50) for link in first.links(page))
+
+
+@pytest.mark.parametrize('pages, fanout', [(1, 5), (30, 1), (200, 5)])
+def test_every_page_reachable(pages, fanout):
+    assert reachable(SyntheticSite(pages=pages, fanout=fanout)) == set(range(pages))
+
+
+@pytest.mark.parametrize('error_rate, errors', [(0.0, 0), (1.0, 99)])
+def test_error_rate(error_rate, errors):
+    site = SyntheticSite(pages=100, error_rate=error_rate)
+    assert sum(site.is_error(page) for page in range(site.pages)) == errors
+    assert not site.is_error(0)
+
+
+def test_pages_spread_across_hosts(site):
+    assert len(set(site.ports)) == site.hosts
+    assert [site.host(page) for page in range(4)] == [f"127.0.0.1:{site.ports[page % 3]}" for page in range(4)]
+    assert site.url(7) == f"http://127.0.0.1:{site.ports[1]}/page/7"
+
+
+def test_server_responses(site):
+    page = next(page for page in range(1, site.pages) if not site.is_error(page))
+    error = next(page for page in range(1, site.pages) if site.is_error(page))
+    response = requests.get(site.url(page), timeout=5)
+    assert response.status_code == 200 and response.content == site.render(page)
+    assert len(response.content) >= site.page_size
+    assert all(f'href="{site.url(link)}"' in response.text for link in site.links(page))
+    assert requests.get(site.url(error), timeout=5).status_code == 500
+    base = site.url(0).rsplit('/page/', 1)[0]
+    for path, status in (('/robots.txt', 200), ('/page/999', 404), ('/page/x', 404), ('/', 404)):
+        assert requests.get(base + path, timeout=5).status_code == status
+
+
+def test_spawn_case(site):
+    case = {'url': site.url(), 'crawler': 'basic', 'engine': 'thread', 'parser': 'html.parser', 'pages': site.pages,
+            'threads': 8, 'concurrency': 8, 'host_concurrency': 4, 'delay': 0}
+    result = spawn_case(case)
+    ok = sum(not site.is_error(page) for page in reachable(site))
+    assert result['records'] == result['responses']['200'] == ok
+    assert result['pages'] >= ok and result['bytes'] > 0
+    assert result['latency_ms']['ttfb']['p50'] > 0
+    assert spawn_case(dict(case, crawler='missing'))['error'].startswith('KeyError')
+
+
+def test_report(tmp_path, capsys):
+    result = {'crawler': 'basic', 'engine': 'thread', 'parser': 'lxml', 'pages': 100, 'pages_per_second': 50.0,
+              'cpu_percent': 80.0, 'peak_rss_mb': None, 'latency_ms': {'ttfb': {'p50': 1.0, 'p99': 4.0}}}
+    assert case_key(result) == 'basic/thread/lxml'
+    assert 'rss n/a' in format_result(result) and '50.0 pages/s' in format_result(result)
+    assert format_result({'crawler': 'basic', 'engine': 'async', 'parser': 'lxml', 'error': 'boom'}).endswith('failed: boom')
+    baseline = tmp_path / 'baseline.json'
+    baseline.write_text(json.dumps({'commit': 'abc123', 'results': [dict(result, pages_per_second=40.0)]}))
+    compare([result, dict(result, parser='selectolax')], str(baseline))
+    output = capsys.readouterr().out
+    assert '(commit abc123)' in output and '40.0 ->     50.0 pages/s (+25.0%)' in output
+    assert 'selectolax' not in output
+
+
+def test_main(tmp_path, monkeypatch, capsys):
+    output = tmp_path / 'bench.json'
+    monkeypatch.setattr('sys.argv', ['nftr_bench', '--pages', '15', '--hosts', '2', '--latency', '0', '--error-rate', '0',
+                                     '--crawlers', 'basic', '--engines', 'thread', '--parsers', 'html.parser',
+                                     '--threads', '4', '-o', str(output)])
+    nftr_bench.main()
+    report = json.loads(output.read_text())
+    assert report['site']['pages'] == 15 and report['site']['hosts'] == 2
+    [result] = report['results']
+    assert (result['pages'], result['records'], result['requests']) == (15, 15, 17)
+    assert 'Results written to' in capsys.readouterr().out
+
+
+def test_unknown_names(monkeypatch):
+    monkeypatch.setattr('sys.argv', ['nftr_bench', '--parsers', 'html.parser,bogus'])
+    with pytest.raises(SystemExit):
+        nftr_bench.main()
@@ -0,0 +1,95 @@
+import pytest
+import requests
+from nftr_advanced import NetrAdvancedCrawler
+from nftr_cache import ResponseCache
+from nftr_crawler import NetrCrawler
+
+URL = 'http://example.com/page'
+PAGE = b'<html><head><title>Cached</title></head><body><a href="/next">Next</a></body></html>'
+
+
+def response(status=200, content=PAGE, **headers):
+    response = requests.Response()
+    response.status_code = status
+    response._content = content if status == 200 else b''
+    response.encoding = 'utf-8'
+    response.url = URL
+    response.headers.update({'Content-Type': 'text/html'}, **headers)
+    return response
+
+
+def cached_crawler(cls, cache_dir):
+    crawler = cls()
+    crawler.cache = ResponseCache(str(cache_dir))
+    crawler.duplicates = None
+    crawler.analyze_ssl_certificate = lambda url: None
+    return crawler
+
+
+@pytest.mark.parametrize('headers, expected', [
+    ({}, None),
+    ({'ETag': '"v1"'}, {'If-None-Match': '"v1"'}),
+    ({'Last-Modified': 'Wed, 21 Oct 2015 07:28:00 GMT'}, {'If-Modified-Since': 'Wed, 21 Oct 2015 07:28:00 GMT'}),
+    ({'ETag': '"v1"', 'Last-Modified': 'Wed, 21 Oct 2015 07:28:00 GMT'},
+     {'If-None-Match': '"v1"', 'If-Modified-Since': 'Wed, 21 Oct 2015 07:28:00 GMT'})
+])
+def test_conditional_headers(tmp_path, headers, expected):
+    cache = ResponseCache(str(tmp_path))
+    assert cache.conditional_headers(URL) is None
+    cache.store(URL, response(**headers), {'url': URL})
+    assert cache.conditional_headers(URL) == expected
+
+
+def test_reuse(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    record = {'url': URL, 'title': 'Cached'}
+    assert cache.reuse(URL, response()) is None
+    cache.store(URL, response(ETag='"v1"'), record)
+    assert cache.reuse(URL, response(304)) == record
+    assert cache.reuse(URL, response(ETag='"v2"')) == record
+    assert cache.conditional_headers(URL) == {'If-None-Match': '"v2"'}
+    assert cache.reuse(URL, response(content=PAGE + b' ')) is None
+    assert cache.reuse(URL, response(500)) is None
+    assert (cache.not_modified, cache.hits) == (1, 1)
+
+
+def test_variants_and_persistence(tmp_path):
+    cache = ResponseCache(str(tmp_path), variant='title')
+    cache.store(URL, response(), {'url': URL})
+    cache.close()
+    assert ResponseCache(str(tmp_path), variant='*').lookup(URL) is None
+    assert ResponseCache(str(tmp_path), variant='title').reuse(URL, response(304)) == {'url': URL}
+
+
+@pytest.mark.parametrize('crawler_class', [NetrCrawler, NetrAdvancedCrawler], ids=lambda cls: cls.__name__)
+def test_recrawl_reuses_record(tmp_path, crawler_class):
+    crawler = cached_crawler(crawler_class, tmp_path)
+    first = crawler.process_response(URL, response(ETag='"v1"'))
+    assert crawler.request_headers(URL) == {'If-None-Match': '"v1"'}
+    crawler.extract_data = None
+    second = crawler.process_response(URL, response(304))
+    assert second['title'] == first['title'] == 'Cached'
+    assert second['links'] == first['links']
+    assert len(crawler.results) == 2
+
+
+def test_not_modified_refreshes_response_fields(tmp_path):
+    crawler = cached_crawler(NetrAdvancedCrawler, tmp_path)
+    first = crawler.process_response(URL, response(ETag='"v1"', Server='nginx/1'))
+    second = crawler.process_response(URL, response(304, ETag='"v1"', Server='nginx/2'))
+    assert second['status_code'] == 304
+    assert second['server'] == 'nginx/2'
+    assert second['response_headers']['Server'] == 'nginx/2'
+    assert second['content_length'] == first['content_length'] == len(PAGE)
+    assert second['content_type'] == first['content_type']
+    unchanged = crawler.process_response(URL, response(Server='nginx/3'))
+    assert (unchanged['status_code'], unchanged['server'], unchanged['content_length']) == (200, 'nginx/3', len(PAGE))
+    assert crawler.cache.hits == 1 and crawler.cache.not_modified == 1
+
+
+def test_changed_page_is_extracted_again(tmp_path):
+    crawler = cached_crawler(NetrCrawler, tmp_path)
+    crawler.process_response(URL, response())
+    changed = crawler.process_response(URL, response(content=PAGE.replace(b'Cached', b'Changed')))
+    assert changed['title'] == 'Changed'
+    assert crawler.cache.reuse(URL, response(304))['title'] == 'Changed'
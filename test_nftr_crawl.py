@@ -0,0 +1,104 @@
+import pytest
+from nftr_bench import SyntheticSite
+from nftr_crawler import NetrCrawler
+from nftr_advanced import NetrAdvancedCrawler
+
+CRAWLERS = [NetrCrawler, NetrAdvancedCrawler]
+
+
+@pytest.fixture(scope='module')
+def site():
+    site = SyntheticSite(pages=40, fanout=3, page_size=2048, hosts=3).start()
+    yield site
+    site.stop()
+
+
+def make_crawler(crawler_class, engine='thread', max_pages=1000):
+    crawler = crawler_class()
+    crawler.engine = engine
+    crawler.delay = 0
+    crawler.max_pages = max_pages
+    crawler.max_threads = 8
+    crawler.concurrency = 8
+    crawler.retry_backoff = 0.01
+    return crawler
+
+
+def comparable(crawler, records):
+    ignored = set(crawler.response_fields) | {'timestamp'}
+    return {record['url']: {key: value for key, value in record.items() if key not in ignored} for record in records}
+
+
+@pytest.mark.parametrize('crawler_class', CRAWLERS, ids=lambda cls: cls.__name__)
+def test_engines_crawl_the_same_pages(site, crawler_class):
+    crawled = {}
+    for engine in ('thread', 'async'):
+        crawler = make_crawler(crawler_class, engine)
+        crawler.start_crawling(site.url())
+        crawled[engine] = comparable(crawler, crawler.results)
+    assert len(crawled['thread']) == site.pages
+    assert crawled['async'] == crawled['thread']
+
+
+@pytest.mark.parametrize('engine', ['thread', 'async'])
+def test_max_pages(site, engine):
+    crawler = make_crawler(NetrCrawler, engine, max_pages=7)
+    crawler.start_crawling(site.url())
+    assert len(crawler.results) == 7
+    assert crawler.frontier.pages == 7
+
+
+@pytest.mark.parametrize('engine', ['thread', 'async'])
+def test_server_errors_are_retried(engine):
+    site = SyntheticSite(pages=30, fanout=3, page_size=512, error_rate=0.3, seed=1).start()
+    try:
+        failing = {site.url(page) for page in range(site.pages) if site.is_error(page)}
+        seed = site.url()
+        crawler = make_crawler(NetrCrawler, engine)
+        crawler.max_retries = 2
+        crawler.start_crawling(seed)
+    finally:
+        site.stop()
+    crawled = {record['url'] for record in crawler.results}
+    linked = {link['href'] for record in crawler.results for link in record['links']}
+    failed = linked & failing
+    assert failed and not crawled & failed
+    assert crawled | failed == linked | {seed}
+    assert crawler.metrics.retries == crawler.max_retries * len(failed)
+    assert crawler.frontier.attempts == {}
+
+
+@pytest.mark.parametrize('engine', ['thread', 'async'])
+def test_iter_crawl_yields_every_page(site, engine):
+    crawler = make_crawler(NetrCrawler, engine)
+    seen, finished = [], []
+    pages = list(crawler.iter_crawl(site.url(), on_page=seen.append, on_finish=finished.append))
+    assert len({page['url'] for page in pages}) == len(pages) == site.pages
+    assert seen == pages
+    assert finished == [crawler.stats] and crawler.stats['pages'] == site.pages
+    assert crawler.results == []
+    assert (crawler.on_page, crawler.on_finish, crawler.keep_results) == (None, None, True)
+
+
+def test_iter_crawl_stops_when_the_caller_stops(site):
+    crawler = make_crawler(NetrCrawler)
+    pages = []
+    for page in crawler.iter_crawl(site.url(), buffer_size=1):
+        pages.append(page)
+        if len(pages) == 5:
+            break
+    assert crawler.frontier.stopped
+    assert crawler.stats['pages'] < site.pages
+    assert crawler.keep_results
+
+
+def test_iter_crawl_seed_list_and_errors(site):
+    crawler = make_crawler(NetrCrawler)
+    crawler.max_retries = 0
+    crawler.max_pages = 3
+    errors = []
+    seeds = ['http://127.0.0.1:1/missing', site.url(0)]
+    pages = list(crawler.iter_crawl(seeds, on_error=lambda url, error: errors.append(url)))
+    assert errors == ['http://127.0.0.1:1/missing']
+    assert len(pages) == crawler.max_pages - len(errors)
+    assert crawler.on_error is None
@@ -0,0 +1,115 @@
+import os
+import random
+import subprocess
+import sys
+import types
+import pytest
+from nftr_dedupe import DuplicateIndex, simhash
+
+ARTICLE = ' '.join(f"word{i % 37} term{i % 11} item{i}" for i in range(200))
+
+
+def page(text):
+    return types.SimpleNamespace(content=text.encode('utf-8'), text=text)
+
+
+def flip(value, bits):
+    for bit in bits:
+        value ^= 1 << bit
+    return value
+
+
+def near_index(max_distance, fingerprints):
+    index = DuplicateIndex(near=True, max_distance=max_distance)
+    return index, lambda url, text: index.check(url, page(text), hasher=fingerprints.__getitem__)
+
+
+def test_exact_duplicates():
+    index = DuplicateIndex()
+    assert index.check('http://a/1', page('<p>one</p>')) is None
+    assert index.check('http://a/2', page('<p>two</p>')) is None
+    assert index.clusters == {}
+    assert index.check('http://a/3', page('<p>one</p>')) is not None
+    assert index.check('http://a/4', page('<p>one</p>')) is not None
+    assert index.check('http://a/5', page('<p>two</p>')) is not None
+    assert index.check('http://a/6', page('<p>one </p>')) is None
+    assert index.count == 3
+    assert index.top_clusters() == [['http://a/3', 2], ['http://a/5', 1]]
+    assert len(index.digests) == 3
+
+
+def test_exact_mode_ignores_near_duplicates():
+    index = DuplicateIndex()
+    index.check('http://a/1', page(ARTICLE))
+    assert index.check('http://a/2', page(ARTICLE.replace('item7 ', 'item7x '))) is None
+
+
+@pytest.mark.parametrize('max_distance', [0, 1, 2, 3, 5, 7])
+def test_within_distance_always_shares_a_band(max_distance):
+    rng = random.Random(max_distance)
+    for trial in range(200):
+        base = rng.getrandbits(64)
+        copy = flip(base, rng.sample(range(64), rng.randint(1, max_distance) if max_distance else 0))
+        index, check = near_index(max_distance, {'base': base, 'copy': copy})
+        assert check('http://a/base', 'base') is None
+        assert check('http://a/copy', 'copy') == base
+
+
+@pytest.mark.parametrize('max_distance', [1, 2, 3, 5])
+def test_beyond_distance_in_shared_band(max_distance):
+    index = DuplicateIndex(near=True, max_distance=max_distance)
+    base = random.Random(max_distance).getrandbits(64)
+    far = flip(base, range(max_distance + 1))
+    assert (max_distance + 1) <= index.band_bits
+    assert index._band_keys(far)[1:] == index._band_keys(base)[1:]
+    index, check = near_index(max_distance, {'base': base, 'far': far})
+    check('http://a/base', 'base')
+    assert check('http://a/far', 'far') is None
+
+
+def test_exact_copy_of_near_duplicate_joins_cluster():
+    base = 0x0123456789ABCDEF
+    index, check = near_index(3, {'a': base, 'b': flip(base, [0, 20]), 'c': 0xFEDCBA9876543210})
+    check('http://a/1', 'a')
+    check('http://a/2', 'b')
+    check('http://a/3', 'b')
+    check('http://a/4', 'c')
+    check('http://a/5', 'c')
+    assert index.count == 3
+    assert sorted(index.top_clusters()) == [['http://a/2', 2], ['http://a/5', 1]]
+
+
+def test_short_pages_fall_back_to_exact():
+    index = DuplicateIndex(near=True)
+    assert index.check('http://a/1', page('<p>hi</p>')) is None
+    assert index.check('http://a/2', page('<p>hi</p>')) is not None
+    assert index.check('http://a/3', page('<p>ho</p>')) is None
+
+
+def test_simhash_near_duplicates():
+    fingerprint = simhash(ARTICLE)
+    edited = simhash(ARTICLE.replace('item50 ', 'item50x '))
+    unrelated = simhash(' '.join(f"other{i} text{i % 13}" for i in range(200)))
+    assert bin(fingerprint ^ edited).count('1') <= 3
+    assert bin(fingerprint ^ unrelated).count('1') > 10
+    index = DuplicateIndex(near=True)
+    index.check('http://a/1', page(ARTICLE))
+    assert index.check('http://a/2', page(ARTICLE.replace('item50 ', 'item50x '))) is not None
+
+
+def test_simhash_ignores_markup():
+    assert simhash('<p>Alpha beta <b>gamma</b> delta</p><script>var x = 1;</script><style>p {}</style>') == \
+        simhash('alpha BETA gamma delta')
+    assert simhash('<p>too short</p>') is None
+
+
+def test_simhash_stable_across_processes():
+    code = 'import sys; from nftr_dedupe import simhash; print(simhash(sys.argv[1]))'
+    cwd = os.path.dirname(os.path.abspath(__file__))
+    values = set()
+    for seed in ('1', '2'):
+        env = dict(os.environ, PYTHONHASHSEED=seed)
+        output = subprocess.run([sys.executable, '-c', code, ARTICLE], cwd=cwd, env=env, capture_output=True,
+                                text=True, check=True).stdout
+        values.add(int(output))
+    assert values == {simhash(ARTICLE)}
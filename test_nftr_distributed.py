@@ -0,0 +1,74 @@
+import socket
+import pytest
+from nftr_distributed import HashRing, MemoryBackend, check_request, run_coordinator
+
+BAD_REQUESTS = [
+    None,
+    [],
+    {'op': 'close', 'args': []},
+    {'op': '__init__', 'args': []},
+    {'op': 'register'},
+    {'op': 'register', 'args': []},
+    {'op': 'register', 'args': ['0']},
+    {'op': 'register', 'args': [True]},
+    {'op': 'pull', 'args': [0, 10, 1]},
+    {'op': 'push', 'args': [[[0, 'http://a/']]]},
+    {'op': 'push', 'args': [[[0, 1, 0]]]},
+    {'op': 'push', 'args': [[0, 'http://a/', 0]]}
+]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def worker_argv(code):
+    return ['-c', code]
+
+
+@pytest.mark.parametrize('request_', BAD_REQUESTS, ids=repr)
+def test_check_request_rejects(request_):
+    with pytest.raises(ValueError):
+        check_request(request_)
+
+
+def test_check_request_accepts():
+    assert check_request({'op': 'push', 'args': [[[1, 'http://a/', 2]]]}) == ('push', [[[1, 'http://a/', 2]]])
+    assert check_request({'op': 'pull', 'args': [1, 50]}) == ('pull', [1, 50])
+
+
+def test_hash_ring_is_stable():
+    ring = HashRing(range(4))
+    owners = {host: ring.owner(host) for host in (f"host{i}.example" for i in range(200))}
+    assert set(owners.values()) == {0, 1, 2, 3}
+    assert owners == {host: HashRing(range(4)).owner(host) for host in owners}
+
+
+def test_memory_backend_finished():
+    backend = MemoryBackend()
+    backend.register(0)
+    backend.register(1)
+    backend.push([(1, 'http://a/', 0)])
+    backend.set_idle(0)
+    backend.set_idle(1)
+    assert not backend.finished(2)
+    assert backend.pull(1) == [('http://a/', 0)]
+    assert not backend.finished(2)
+    backend.set_idle(1)
+    assert backend.finished(2)
+
+
+@pytest.mark.parametrize('scheme', ['tcp', 'sqlite'])
+def test_coordinator_returns_when_local_workers_exit(scheme, tmp_path):
+    coordinator = f"tcp://127.0.0.1:{free_port()}" if scheme == 'tcp' else f"sqlite:{tmp_path / 'c.db'}"
+    assert run_coordinator(coordinator, 2, argv=worker_argv('pass'), poll_interval=0.05) == 0
+
+
+@pytest.mark.parametrize('scheme', ['tcp', 'sqlite'])
+def test_coordinator_stops_on_worker_failure(scheme, tmp_path):
+    coordinator = f"tcp://127.0.0.1:{free_port()}" if scheme == 'tcp' else f"sqlite:{tmp_path / 'c.db'}"
+    code = ('import sys, time\n'
+            'sys.exit(3) if sys.argv[-1] == "1" else time.sleep(60)')
+    assert run_coordinator(coordinator, 2, argv=worker_argv(code), poll_interval=0.05) == 3
@@ -0,0 +1,130 @@
+import argparse
+import pytest
+from nftr_advanced import NetrAdvancedCrawler
+from nftr_core import add_crawl_arguments, configure_crawler
+from nftr_crawler import NetrCrawler
+from nftr_extract import ExtractionPipeline, ExtractionStage, TechnologyStage, StructuredDataStage, TextStage
+from nftr_parsers import parse_html
+
+PAGE = ('<html><head><title>Shop</title><meta name="description" content="Deals">'
+        '<link rel="stylesheet" href="/css/bootstrap.min.css"><script src="/js/jquery.js"></script>'
+        '<script type="application/ld+json">{"@type": "Store"}</script></head>'
+        '<body><h1>Hello</h1><a href="/a">A</a><img src="/i.png" alt="I">'
+        '<form action="/f"><input name="q"></form><table><tr><td>1</td></tr></table>'
+        '<p>Mail sales@example.com</p></body></html>')
+
+
+class CountingDocument:
+    def __init__(self, document):
+        self.document = document
+        self.calls = []
+        
+    def find_all(self, *tags):
+        self.calls.append(tags)
+        return self.document.find_all(*tags)
+        
+    def get_text(self):
+        return self.document.get_text()
+
+
+class HeadingStage(ExtractionStage):
+    name = 'headings'
+    tags = ('h1', 'h2')
+    
+    def handle(self, element, extracted, state):
+        extracted.setdefault('headings', []).append(element.get_text(strip=True))
+
+
+class HeadingCrawler(NetrCrawler):
+    def extraction_stages(self):
+        return super().extraction_stages() + [HeadingStage()]
+
+
+def run(crawler, html=PAGE):
+    pipeline = crawler.get_pipeline()
+    return pipeline.run(parse_html(html), crawler.new_record('http://example.com/', None))
+
+
+def test_single_traversal():
+    crawler = NetrCrawler()
+    document = CountingDocument(parse_html(PAGE))
+    crawler.get_pipeline().run(document, crawler.new_record('http://example.com/', None))
+    assert len(document.calls) == 1
+    assert set(document.calls[0]) == {'title', 'meta', 'a', 'img', 'form', 'table', 'script'}
+
+
+def test_all_stages():
+    record = run(NetrCrawler())
+    assert record['title'] == 'Shop'
+    assert record['meta_description'] == 'Deals'
+    assert [link['href'] for link in record['links']] == ['/a']
+    assert record['images'] == [{'src': '/i.png', 'alt': 'I', 'title': ''}]
+    assert record['forms'][0]['action'] == '/f'
+    assert record['tables'] == [[['1']]]
+    assert record['structured_data'] == [{'@type': 'Store'}]
+    assert record['emails'] == ['sales@example.com']
+
+
+@pytest.mark.parametrize('fields, present, absent', [
+    (['title'], {'title': 'Shop'}, ('text_content', 'images', 'meta_description')),
+    (['images', 'text'], {'text_content': 'ShopHelloA1Mail sales@example.com'}, ('title',)),
+    ([], {}, ('title', 'images', 'structured_data'))
+])
+def test_fields_select_stages(fields, present, absent):
+    crawler = NetrCrawler()
+    crawler.fields = fields
+    record = run(crawler)
+    defaults = crawler.new_record('http://example.com/', None)
+    assert [link['href'] for link in record['links']] == ['/a']
+    for key, value in present.items():
+        assert record[key] == value
+    for key in absent:
+        assert record[key] == defaults[key]
+
+
+def test_pipeline_rebuilt_when_fields_change():
+    crawler = NetrCrawler()
+    pipeline = crawler.get_pipeline()
+    assert crawler.get_pipeline() is pipeline
+    crawler.fields = ['title']
+    assert crawler.get_pipeline() is not pipeline
+    assert [stage.name for stage in crawler.get_pipeline().stages] == ['title', 'links']
+
+
+def test_shared_tag_reaches_every_stage():
+    pipeline = ExtractionPipeline([StructuredDataStage(), TechnologyStage()])
+    record = pipeline.run(parse_html(PAGE), {'structured_data': [], 'technologies': []})
+    assert record == {'structured_data': [{'@type': 'Store'}], 'technologies': ['jQuery', 'Bootstrap']}
+
+
+def test_text_stage_target():
+    stage = TextStage({'emails': r'\S+@\S+'}, target='secrets')
+    record = ExtractionPipeline([stage]).run(parse_html(PAGE), {'secrets': {}})
+    assert record['secrets'] == {'emails': ['sales@example.com']}
+
+
+def test_custom_stage():
+    record = run(HeadingCrawler(), PAGE + '<h2>More</h2>')
+    assert record['headings'] == ['Hello', 'More']
+
+
+def test_advanced_crawler_stages():
+    crawler = NetrAdvancedCrawler()
+    crawler.fields = ['technologies', 'text']
+    pipeline = crawler.get_pipeline()
+    record = pipeline.run(parse_html(PAGE), {'links': [], 'technologies': [], 'secrets': {}, 'text_content': ''})
+    assert record['technologies'] == ['jQuery', 'Bootstrap']
+    assert record['secrets']['emails'] == ['sales@example.com']
+
+
+@pytest.mark.parametrize('fields, valid', [('title,links', True), ('title, images', True), ('title,bogus', False)])
+def test_fields_option(fields, valid):
+    parser = add_crawl_arguments(argparse.ArgumentParser(), NetrCrawler())
+    args = parser.parse_args(['http://example.com/', '--fields', fields])
+    crawler = NetrCrawler()
+    if not valid:
+        with pytest.raises(SystemExit):
+            configure_crawler(crawler, args, parser)
+        return
+    configure_crawler(crawler, args, parser)
+    assert crawler.fields == [field.strip() for field in fields.split(',')]
@@ -0,0 +1,104 @@
+import types
+import pytest
+import requests
+import nftr_fetch
+from nftr_fetch import (parse_retry_after, should_read, read_body, backoff_delay, has_binary_extension,
+                        is_transient_error, is_html)
+
+NOW = 1445412480.0
+
+
+class ChunkedResponse:
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.read = 0
+        
+    def iter_content(self, chunk_size):
+        for chunk in self.chunks:
+            self.read += 1
+            yield chunk
+
+
+@pytest.fixture
+def now(monkeypatch):
+    monkeypatch.setattr(nftr_fetch, 'time', types.SimpleNamespace(time=lambda: NOW))
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('120', 120.0),
+    (' 5 ', 5.0),
+    ('0', 0.0),
+    ('Wed, 21 Oct 2015 07:28:30 GMT', 30.0),
+    ('Wednesday, 21-Oct-15 07:29:00 GMT', 60.0),
+    ('Wed Oct 21 07:28:10 2015', 10.0),
+    ('Wed, 21 Oct 2015 09:28:30 +0200', 30.0),
+    ('Wed, 21 Oct 2015 07:28:30', 30.0),
+    ('Wed, 21 Oct 2015 07:00:00 GMT', 0.0),
+    (None, None),
+    ('', None),
+    ('soon', None),
+    ('5.5', None),
+    ('-1', None),
+    ('32 Foo 2015', None),
+    ('Wed, 21 Oct 2015 25:61:00 GMT', None)
+])
+def test_parse_retry_after(now, value, expected):
+    assert parse_retry_after(value) == expected
+
+
+@pytest.mark.parametrize('headers, max_bytes, expected', [
+    ({}, 100, True),
+    ({'Content-Type': 'text/html; charset=utf-8'}, 100, True),
+    ({'Content-Type': 'Application/XHTML+XML'}, 100, True),
+    ({'Content-Type': 'application/pdf'}, 100, False),
+    ({'Content-Type': 'image/png', 'Content-Length': '10'}, 0, False),
+    ({'Content-Length': '100'}, 100, True),
+    ({'Content-Length': '101'}, 100, False),
+    ({'Content-Length': '101'}, 0, True),
+    ({'Content-Length': 'bogus'}, 100, True)
+])
+def test_should_read(headers, max_bytes, expected):
+    headers = requests.structures.CaseInsensitiveDict(headers)
+    assert should_read(headers, max_bytes) is expected
+
+
+@pytest.mark.parametrize('chunks, max_bytes, expected, read', [
+    ([b'abc', b'def'], 6, b'abcdef', 2),
+    ([b'abc', b'def'], 0, b'abcdef', 2),
+    ([b'abc', b'def', b'ghi'], 5, None, 2),
+    ([b'abcdefgh', b'ijk'], 4, None, 1),
+    ([], 4, b'', 0)
+])
+def test_read_body_cap(chunks, max_bytes, expected, read):
+    response = ChunkedResponse(chunks)
+    assert read_body(response, max_bytes) == expected
+    assert response.read == read
+
+
+def test_backoff_delay():
+    for attempt in range(10):
+        delay = backoff_delay(attempt, base=0.5, cap=60.0)
+        assert 0 <= delay <= min(60.0, 0.5 * 2 ** attempt)
+
+
+@pytest.mark.parametrize('url, expected', [
+    ('http://a/file.PDF', True),
+    ('http://a/archive.tar.gz', True),
+    ('http://a/page.html', False),
+    ('http://a/dir.zip/', False),
+    ('http://a/view?file=x.pdf', False)
+])
+def test_has_binary_extension(url, expected):
+    assert has_binary_extension(url) is expected
+
+
+def test_transient_errors():
+    assert is_transient_error(requests.ConnectionError())
+    assert is_transient_error(requests.ReadTimeout())
+    assert is_transient_error(TimeoutError())
+    assert not is_transient_error(requests.TooManyRedirects())
+    assert not is_transient_error(ValueError())
+
+
+def test_is_html_without_content_type():
+    assert is_html({})
@@ -0,0 +1,375 @@
+import threading
+import types
+import pytest
+import requests
+import nftr_frontier
+from nftr_crawler import NetrCrawler
+from nftr_frontier import CrawlFrontier
+from nftr_priority import PriorityScorer
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+        
+    def monotonic(self):
+        return self.now
+        
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(nftr_frontier, 'time', types.SimpleNamespace(monotonic=clock.monotonic))
+    return clock
+
+
+def frontier(urls=(), max_pages=100, max_in_flight=100, **kwargs):
+    frontier = CrawlFrontier(max_pages, max_in_flight, **kwargs)
+    for url in urls:
+        frontier.add(url, 0)
+    return frontier
+
+
+def drain(frontier):
+    urls = []
+    while True:
+        item = frontier.get(block=False)
+        if item is None:
+            return urls
+        urls.append(item[0])
+        frontier.task_done(item[0], True)
+
+
+def test_add_skips_seen_urls(clock):
+    crawl = frontier(['http://a/1'])
+    assert not crawl.add('http://a/1', 0)
+    assert crawl.add_many([('http://a/1', 0, None), ('http://a/2', 1, None), ('http://a/2', 1, None)]) == 1
+    assert crawl.pending_count == 2
+
+
+def test_fifo_without_scorer(clock):
+    urls = [f"http://a/{i}" for i in range(5)] + [f"http://b/{i}" for i in range(5)]
+    crawl = frontier(urls)
+    popped = drain(crawl)
+    assert sorted(popped) == sorted(urls)
+    assert [url for url in popped if url.startswith('http://a/')] == urls[:5]
+    assert crawl.finished and crawl.pages == len(urls)
+
+
+def test_max_pages(clock):
+    crawl = frontier([f"http://a/{i}" for i in range(10)], max_pages=3)
+    assert len(drain(crawl)) == 3
+    assert crawl.finished and crawl.pending_count == 7
+
+
+def test_max_in_flight(clock):
+    crawl = frontier([f"http://h{i}/" for i in range(5)], max_in_flight=2)
+    first, second = crawl.get(block=False), crawl.get(block=False)
+    assert crawl.get(block=False) is None
+    crawl.task_done(first[0], True)
+    assert crawl.get(block=False) is not None
+    assert not crawl.finished
+    crawl.task_done(second[0], False)
+    assert crawl.pages == 1
+
+
+def test_stop_drains_in_flight(clock):
+    crawl = frontier(['http://a/1', 'http://b/1'])
+    url, _ = crawl.get(block=False)
+    crawl.stop()
+    assert crawl.get(block=False) is None
+    assert not crawl.finished
+    crawl.task_done(url, True)
+    assert crawl.finished and crawl.pending_count == 1
+
+
+def test_blocked_get_returns_after_stop_and_release():
+    crawl = frontier(['http://a/1'])
+    crawl.hold()
+    url, _ = crawl.get()
+    crawl.task_done(url, True)
+    results = []
+    thread = threading.Thread(target=lambda: results.append(crawl.get()), daemon=True)
+    thread.start()
+    crawl.stop()
+    thread.join(0.2)
+    assert thread.is_alive()
+    crawl.release()
+    thread.join(5)
+    assert results == [None]
+
+
+def test_hold_keeps_frontier_open(clock):
+    crawl = frontier()
+    crawl.hold()
+    assert crawl.idle and not crawl.finished
+    crawl.add('http://a/1', 0)
+    crawl.release()
+    assert drain(crawl) == ['http://a/1']
+    assert crawl.finished
+
+
+def test_restore(clock):
+    crawl = frontier()
+    crawl.restore([('http://a/1', 0, 'done'), ('http://a/2', 1, 'pending'), ('http://a/3', 1, 'failed')])
+    assert crawl.pages == 1 and crawl.pending_count == 1
+    assert not crawl.add('http://a/3', 0)
+    assert drain(crawl) == ['http://a/2']
+
+
+def test_listeners_notified(clock):
+    crawl = frontier()
+    calls = []
+    crawl.listeners.append(lambda: calls.append(True))
+    crawl.add('http://a/1', 0)
+    assert calls
+
+
+def test_host_interval(clock):
+    crawl = frontier(['http://a/1', 'http://a/2', 'http://b/1'], host_interval=2.0)
+    assert [crawl.get(block=False)[0] for _ in range(2)] == ['http://a/1', 'http://b/1']
+    crawl.task_done('http://a/1', True)
+    assert crawl.get(block=False) is None
+    assert crawl.next_ready_delay() == pytest.approx(2.0)
+    clock.advance(1.9)
+    assert crawl.get(block=False) is None
+    clock.advance(0.1)
+    assert crawl.get(block=False) == ('http://a/2', 0)
+
+
+def test_host_key_includes_port(clock):
+    crawl = frontier(['http://a/1', 'http://a:8080/1', 'http://A/2'], host_interval=5.0)
+    assert len(drain(crawl)) == 2
+    assert set(crawl.hosts) == {'a', 'a:8080'}
+
+
+def test_crawl_delay(clock):
+    crawl = frontier(['http://a/1', 'http://a/2', 'http://a/3'], host_interval=1.0)
+    url, _ = crawl.get(block=False)
+    crawl.set_crawl_delay(url, 10)
+    crawl.task_done(url, True)
+    clock.advance(1.0)
+    assert crawl.get(block=False) is None
+    assert crawl.next_ready_delay() == pytest.approx(9.0)
+    clock.advance(9.0)
+    url, _ = crawl.get(block=False)
+    crawl.task_done(url, True)
+    clock.advance(9.9)
+    assert crawl.get(block=False) is None
+    clock.advance(0.1)
+    assert crawl.get(block=False) == ('http://a/3', 0)
+
+
+def test_crawl_delay_never_shortens_interval(clock):
+    crawl = frontier(['http://a/1', 'http://a/2'], host_interval=5.0)
+    url, _ = crawl.get(block=False)
+    crawl.set_crawl_delay(url, 1)
+    crawl.set_crawl_delay(url, None)
+    crawl.task_done(url, True)
+    clock.advance(4.9)
+    assert crawl.get(block=False) is None
+    assert crawl.hosts['a'].interval == 5.0
+
+
+def test_crawl_delay_before_first_fetch(clock):
+    crawl = frontier(['http://a/1', 'http://a/2'])
+    crawl.set_crawl_delay('http://a/1', 3)
+    assert crawl.get(block=False) == ('http://a/1', 0)
+    crawl.task_done('http://a/1', True)
+    assert crawl.get(block=False) is None
+    clock.advance(3.0)
+    assert crawl.get(block=False) == ('http://a/2', 0)
+
+
+def test_retry_delays_only_that_url(clock):
+    crawl = frontier(['http://a/1', 'http://a/2'])
+    url, depth = crawl.get(block=False)
+    crawl.retry(url, depth, 5.0)
+    assert crawl.attempts == {'http://a/1': 1}
+    assert crawl.get(block=False) == ('http://a/2', 0)
+    crawl.task_done('http://a/2', True)
+    assert crawl.get(block=False) is None and not crawl.finished
+    assert crawl.next_ready_delay() == pytest.approx(5.0)
+    clock.advance(5.0)
+    assert crawl.get(block=False) == ('http://a/1', 0)
+    crawl.task_done('http://a/1', True)
+    assert crawl.attempts == {} and crawl.finished and crawl.pages == 2
+
+
+def test_retry_after_pauses_host(clock):
+    crawl = frontier(['http://a/1', 'http://a/2', 'http://b/1'], scorer=PriorityScorer())
+    url, depth = crawl.get(block=False)
+    assert url == 'http://a/1'
+    crawl.retry(url, depth, 30.0, pause_host=True)
+    assert crawl.get(block=False) == ('http://b/1', 0)
+    crawl.task_done('http://b/1', True)
+    clock.advance(29.0)
+    assert crawl.get(block=False) is None
+    clock.advance(1.0)
+    assert crawl.get(block=False) == ('http://a/1', 0)
+
+
+def test_host_concurrency(clock):
+    crawl = frontier([f"http://a/{i}" for i in range(5)], host_concurrency=2)
+    assert crawl.get(block=False) and crawl.get(block=False)
+    assert crawl.get(block=False) is None
+    crawl.task_done('http://a/0', True)
+    assert crawl.get(block=False) == ('http://a/2', 0)
+
+
+def test_throttling_halves_limit(clock):
+    crawl = frontier(['http://a/1'], host_concurrency=8)
+    crawl.report('http://a/1', 0.1, failed=True, throttled=True)
+    assert crawl.host_limits() == {'a': 4.0}
+    crawl.report('http://a/1', 0.1, failed=True, throttled=True)
+    assert crawl.host_limits() == {'a': 4.0}
+    clock.advance(nftr_frontier.ADJUST_INTERVAL)
+    for _ in range(5):
+        crawl.report('http://a/1', 0.1, failed=True, throttled=True)
+        clock.advance(nftr_frontier.ADJUST_INTERVAL)
+    assert crawl.host_limits() == {'a': 1.0}
+
+
+def test_limit_recovers_additively(clock):
+    crawl = frontier(['http://a/1'], host_concurrency=4)
+    crawl.report('http://a/1', throttled=True)
+    assert crawl.host_limits() == {'a': 2.0}
+    crawl.report('http://a/1', 0.1)
+    assert crawl.host_limits() == {'a': 2.0}
+    clock.advance(nftr_frontier.RECOVERY_INTERVAL)
+    crawl.report('http://a/1', 0.1)
+    assert crawl.host_limits() == {'a': 2.5}
+    for _ in range(10):
+        crawl.report('http://a/1', 0.1)
+    assert crawl.host_limits() == {'a': 4.0}
+
+
+def test_latency_congestion(clock):
+    crawl = frontier(['http://a/1'], host_concurrency=8)
+    for _ in range(3):
+        crawl.report('http://a/1', 0.05)
+    assert crawl.host_limits() == {'a': 8.0}
+    for _ in range(10):
+        crawl.report('http://a/1', 2.0)
+    assert crawl.host_limits() == {'a': 4.0}
+
+
+def test_error_rate_congestion(clock):
+    crawl = frontier(['http://a/1'], host_concurrency=8)
+    for _ in range(5):
+        crawl.report('http://a/1', failed=True)
+    assert crawl.host_limits() == {'a': 8.0}
+    for _ in range(5):
+        crawl.report('http://a/1', failed=True)
+    assert crawl.host_limits() == {'a': 4.0}
+
+
+def test_fixed_limit_without_adaptive(clock):
+    crawl = frontier(['http://a/1'], host_concurrency=8, adaptive=False)
+    crawl.report('http://a/1', 0.1, failed=True, throttled=True)
+    assert crawl.host_limits() == {'a': 8.0}
+
+
+@pytest.mark.parametrize('status, retry_after, expected', [
+    (503, '7', (7.0, True)),
+    (429, '600', (120.0, True)),
+    (500, '3', (3.0, True)),
+    (502, None, False),
+    (429, None, True),
+    (404, '7', None),
+    (200, None, None)
+])
+def test_check_response_retry(clock, status, retry_after, expected):
+    crawler = NetrCrawler()
+    crawler.frontier = frontier(['http://a/1'])
+    response = requests.Response()
+    response.status_code = status
+    if retry_after:
+        response.headers['Retry-After'] = retry_after
+    retry = crawler.check_response('http://a/1', response, 0.1)
+    if isinstance(expected, bool):
+        delay, pause_host = retry
+        assert 0 <= delay <= crawler.retry_backoff and pause_host is expected
+    else:
+        assert retry == expected
+
+
+def test_retries_are_limited(clock):
+    crawler = NetrCrawler()
+    crawler.max_retries = 2
+    crawler.frontier = frontier(['http://a/1'])
+    delays = []
+    for _ in range(3):
+        url, depth = crawler.frontier.get(block=False)
+        retry = crawler.retry_delay(url)
+        if retry is None:
+            break
+        delays.append(retry[0])
+        crawler.frontier.retry(url, depth, *retry)
+        clock.advance(retry[0])
+    assert len(delays) == 2
+    assert delays[1] <= crawler.retry_backoff * 2
+
+
+def test_best_first_by_depth(clock):
+    crawl = frontier(scorer=PriorityScorer())
+    crawl.add_many([('http://a/deep', 3, None), ('http://a/mid', 1, None), ('http://a/top', 0, None),
+                    ('http://a/mid2', 1, None)])
+    assert drain(crawl) == ['http://a/top', 'http://a/mid', 'http://a/mid2', 'http://a/deep']
+
+
+def test_inlinks_raise_priority(clock):
+    crawl = frontier(scorer=PriorityScorer())
+    crawl.add_many([('http://a/deep1', 2, None), ('http://a/deep2', 2, None), ('http://a/shallow', 1, None)])
+    for _ in range(5):
+        assert not crawl.add('http://a/deep2', 3)
+    assert crawl.pending_count == 3
+    assert drain(crawl) == ['http://a/deep2', 'http://a/shallow', 'http://a/deep1']
+
+
+def test_stale_entries_compacted(clock):
+    crawl = frontier(['http://a/1', 'http://a/2'], scorer=PriorityScorer())
+    for _ in range(500):
+        crawl.add('http://a/2', 0)
+    assert len(crawl.hosts['a'].pending) <= 2 * 2 + 64 + 1
+    assert drain(crawl) == ['http://a/2', 'http://a/1']
+
+
+def test_sitemap_hint_and_url_weights(clock):
+    crawl = frontier(scorer=PriorityScorer(patterns=[('/products/*', 1.5)]))
+    crawl.add_many([('http://a/plain', 0, None), ('http://a/products/1', 1, None), ('http://a/listed', 1, 0.9)])
+    assert drain(crawl) == ['http://a/listed', 'http://a/products/1', 'http://a/plain']
+
+
+def test_fetched_hosts_yield_to_fresh_hosts(clock):
+    crawl = frontier([f"http://a/{i}" for i in range(10)], scorer=PriorityScorer())
+    drain(crawl)
+    crawl.add_many([('http://a/next', 0, None), ('http://b/next', 0, None)])
+    assert drain(crawl) == ['http://b/next', 'http://a/next']
+
+
+def test_best_host_first(clock):
+    crawl = frontier(scorer=PriorityScorer())
+    crawl.add_many([('http://a/deep', 2, None), ('http://b/top', 0, None), ('http://c/mid', 1, None)])
+    assert drain(crawl) == ['http://b/top', 'http://c/mid', 'http://a/deep']
+
+
+@pytest.mark.parametrize('options, args, expected', [
+    ({}, ('http://a/', 0), 0.0),
+    ({}, ('http://a/', 2), -2.0),
+    ({}, ('http://a/', 1, 3), 1.0),
+    ({}, ('http://a/', 0, 0, 0.5), 1.0),
+    ({'depth': 0, 'inlinks': 0}, ('http://a/', 5, 100), 0.0),
+    ({'patterns': [('re:^/blog/\\d+$', -3)]}, ('http://a/blog/12', 0), -3.0),
+    ({'patterns': [('*?page=*', -1)]}, ('http://a/list?page=2', 0), -1.0)
+])
+def test_priority_score(options, args, expected):
+    assert PriorityScorer(**options).score(*args) == pytest.approx(expected)
+
+
+def test_host_penalty():
+    assert PriorityScorer().host_penalty(0) == 0.0
+    assert PriorityScorer(host=2).host_penalty(3) == pytest.approx(4.0)
@@ -0,0 +1,120 @@
+import argparse
+import pytest
+import requests
+import nftr_http2
+from nftr_advanced import NetrAdvancedCrawler
+from nftr_bench import SyntheticSite
+from nftr_core import add_crawl_arguments, parse_crawl_arguments
+from nftr_crawler import NetrCrawler
+from nftr_http2 import Http2Adapter, http2_available
+from nftr_metrics import CrawlMetrics, TimedHTTPAdapter
+
+needs_h2 = pytest.mark.skipif(not http2_available(), reason='needs httpx[http2]')
+
+
+@pytest.fixture(scope='module')
+def site():
+    site = SyntheticSite(pages=10, fanout=2, page_size=4096).start()
+    yield site
+    site.stop()
+
+
+@pytest.fixture
+def no_h2(monkeypatch):
+    monkeypatch.setattr(nftr_http2.importlib.util, 'find_spec', lambda name: None)
+
+
+def http2_session(metrics):
+    session = requests.Session()
+    session.mount('http://', Http2Adapter(metrics, max_connections=4))
+    return session
+
+
+@pytest.mark.parametrize('pool_size, host_concurrency, threads, maxsize, connections', [
+    (None, 8, 4, 8, 10), (2, 8, 4, 2, 10), (None, 4, 32, 4, 32)
+])
+def test_pool_sizing(pool_size, host_concurrency, threads, maxsize, connections):
+    crawler = NetrCrawler()
+    crawler.pool_size = pool_size
+    crawler.host_concurrency = host_concurrency
+    crawler.max_threads = threads
+    crawler.configure_transport()
+    for scheme in ('http://', 'https://'):
+        adapter = crawler.session.get_adapter(scheme + 'example.com/')
+        assert isinstance(adapter, TimedHTTPAdapter) and not isinstance(adapter, Http2Adapter)
+        assert (adapter._pool_maxsize, adapter._pool_connections) == (maxsize, connections)
+
+
+@needs_h2
+def test_http2_mounted_for_https_only():
+    crawler = NetrAdvancedCrawler()
+    crawler.http2 = True
+    crawler.pool_size = 3
+    crawler.configure_transport()
+    adapter = crawler.session.get_adapter('https://example.com/')
+    assert isinstance(adapter, Http2Adapter)
+    assert adapter.limits.max_connections == max(10, crawler.max_threads) * 3
+    assert not isinstance(crawler.session.get_adapter('http://example.com/'), Http2Adapter)
+    crawler.configure_transport()
+    assert adapter.clients == {}
+
+
+def test_http2_unavailable(no_h2, monkeypatch, capsys):
+    assert not http2_available()
+    with pytest.raises(RuntimeError):
+        Http2Adapter(CrawlMetrics())
+    parser = add_crawl_arguments(argparse.ArgumentParser(), NetrCrawler())
+    monkeypatch.setattr('sys.argv', ['nftr', 'http://example.com/', '--http2'])
+    with pytest.raises(SystemExit):
+        parse_crawl_arguments(parser)
+    assert '--http2 requires httpx with h2' in capsys.readouterr().err
+
+
+@needs_h2
+@pytest.mark.parametrize('stream', [False, True])
+def test_adapter_response(site, stream):
+    metrics = CrawlMetrics()
+    session = http2_session(metrics)
+    try:
+        response = session.get(site.url(3), stream=stream, timeout=5)
+        assert response.status_code == 200 and response.reason == 'OK'
+        assert response.headers['content-type'].startswith('text/html')
+        assert response.url == site.url(3)
+        assert '<title>Page 3</title>' in response.text
+        assert session.get(site.url(3) + 'x', timeout=5).status_code == 404
+    finally:
+        session.close()
+    assert metrics.requests == 2 and metrics.connections == 1
+    assert metrics.histograms['connect'].count == 1
+
+
+@needs_h2
+def test_adapter_iter_content(site):
+    session = http2_session(CrawlMetrics())
+    try:
+        response = session.get(site.url(1), stream=True, timeout=5)
+        chunks = list(response.iter_content(1024))
+    finally:
+        session.close()
+    assert len(chunks) > 1 and b''.join(chunks).startswith(b'<html>')
+
+
+@needs_h2
+def test_adapter_errors():
+    session = http2_session(CrawlMetrics())
+    try:
+        with pytest.raises(requests.ConnectionError):
+            session.get('http://127.0.0.1:1/', timeout=5)
+    finally:
+        session.close()
+
+
+@needs_h2
+def test_crawl_over_adapter(site):
+    crawler = NetrCrawler()
+    crawler.delay = 0
+    crawler.configure_transport()
+    crawler.session.mount('http://', Http2Adapter(crawler.metrics))
+    crawler.configure_transport = lambda: None
+    crawler.start_crawling(site.url())
+    assert len(crawler.results) == site.pages
@@ -0,0 +1,122 @@
+import types
+import pytest
+import requests
+from urllib3.exceptions import ConnectTimeoutError
+from nftr_bench import SyntheticSite
+from nftr_metrics import CrawlMetrics, Histogram, MetricsServer, TimedConnection, TimedHTTPAdapter
+
+
+class FakeConnection:
+    def __init__(self, reachable):
+        self.reachable = reachable
+        self.attempts = []
+        
+    def _new_conn(self):
+        self.attempts.append(self._dns_host)
+        if self._dns_host not in self.reachable:
+            raise ConnectTimeoutError(self, f"timed out connecting to {self._dns_host}")
+        return f"socket:{self._dns_host}"
+
+
+class FallbackConnection(TimedConnection, FakeConnection):
+    pass
+
+
+def test_histogram():
+    histogram = Histogram(buckets=(0.1, 1.0), window=3)
+    for value in (0.05, 0.1, 0.5, 2.0):
+        histogram.observe(value)
+    assert histogram.counts == [2, 1, 1]
+    assert histogram.count == 4 and histogram.sum == pytest.approx(2.65)
+    assert list(histogram.recent) == [0.1, 0.5, 2.0]
+    assert (histogram.quantile(0.0), histogram.quantile(0.5), histogram.quantile(0.99)) == (0.1, 0.5, 2.0)
+    assert Histogram().quantile(0.5) is None
+
+
+def test_render():
+    metrics = CrawlMetrics()
+    metrics.observe('ttfb', 0.02)
+    metrics.observe('ttfb', -1)
+    metrics.count_response(200)
+    metrics.count_response(200)
+    metrics.count_response(404)
+    metrics.count_error(requests.Timeout())
+    metrics.count_retry()
+    metrics.add_bytes(512)
+    metrics.frontier = types.SimpleNamespace(pages=3, in_flight=1, pending_count=7)
+    lines = metrics.render().splitlines()
+    for line in ('netr_stage_seconds_bucket{stage="ttfb",le="0.001"} 1',
+                 'netr_stage_seconds_bucket{stage="ttfb",le="0.025"} 2',
+                 'netr_stage_seconds_bucket{stage="ttfb",le="+Inf"} 2',
+                 'netr_stage_seconds_count{stage="ttfb"} 2', 'netr_stage_seconds_count{stage="dns"} 0',
+                 'netr_responses_total{code="200"} 2', 'netr_responses_total{code="404"} 1',
+                 'netr_errors_total{type="Timeout"} 1', 'netr_retries_total 1', 'netr_bytes_total 512',
+                 'netr_pages_total 3', 'netr_in_flight 1', 'netr_pending 7'):
+        assert line in lines
+    assert '3 pages' in metrics.progress_line() and 'pending 7' in metrics.progress_line()
+
+
+@pytest.mark.parametrize('requests_count, connections, ratio', [(0, 0, None), (4, 1, 0.75), (2, 3, 0.0)])
+def test_reuse_ratio(requests_count, connections, ratio):
+    metrics = CrawlMetrics()
+    for _ in range(requests_count):
+        metrics.count_request()
+    for _ in range(connections):
+        metrics.count_connection()
+    assert metrics.reuse_ratio() == ratio
+
+
+def test_connect_falls_back_to_next_address():
+    connection = FallbackConnection(reachable={'127.0.0.1'})
+    assert connection.connect_any(['127.0.0.2', '127.0.0.1']) == 'socket:127.0.0.1'
+    assert connection.attempts == ['127.0.0.2', '127.0.0.1']
+
+
+def test_connect_raises_when_every_address_fails():
+    connection = FallbackConnection(reachable=set())
+    with pytest.raises(ConnectTimeoutError):
+        connection.connect_any(['127.0.0.2', '127.0.0.3'])
+    assert connection.attempts == ['127.0.0.2', '127.0.0.3']
+
+
+def test_new_conn_restores_host():
+    connection = FallbackConnection(reachable={'127.0.0.1'})
+    connection.metrics = CrawlMetrics()
+    connection._dns_host = 'localhost'
+    connection.port = 80
+    connection._new_conn()
+    assert connection._dns_host == 'localhost'
+    assert connection.metrics.connections == 1
+    assert connection.metrics.histograms['connect'].count == 1
+
+
+def test_timed_adapter_counts_connections():
+    site = SyntheticSite(pages=5, fanout=1, page_size=256).start()
+    metrics = CrawlMetrics()
+    session = requests.Session()
+    session.mount('http://', TimedHTTPAdapter(metrics))
+    try:
+        for page in range(5):
+            assert session.get(site.url(page), timeout=5).status_code == 200
+    finally:
+        session.close()
+        site.stop()
+    assert metrics.requests == 5 and metrics.connections == 1
+    assert metrics.reuse_ratio() == 0.8
+    assert metrics.histograms['dns'].count == metrics.histograms['connect'].count == 1
+
+
+def test_metrics_server():
+    metrics = CrawlMetrics()
+    metrics.count_response(200)
+    server = MetricsServer(metrics, 0).start()
+    try:
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+        for path in ('/', '/metrics', '/metrics?x=1'):
+            response = requests.get(base + path, timeout=5)
+            assert response.status_code == 200
+            assert 'netr_responses_total{code="200"} 1' in response.text
+        assert requests.get(base + '/other', timeout=5).status_code == 404
+    finally:
+        server.shutdown()
+        server.server_close()
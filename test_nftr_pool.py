@@ -0,0 +1,70 @@
+import threading
+import pytest
+from nftr_bench import SyntheticSite
+from nftr_crawler import NetrCrawler
+from nftr_dedupe import simhash
+from nftr_pool import ParsePool, extract_page
+
+PAGES = [
+    '<html><head><title>One</title></head><body><a href="/a">A</a><p>sales@example.com</p></body></html>',
+    '<html><body><img src="/i.png" alt="I"><form action="/f"><input name="q"></form></body></html>',
+    '<html><body><table><tr><td>1</td></tr></table>' + ' '.join(f"word{i}" for i in range(100)) + '</body></html>'
+]
+
+
+@pytest.fixture(scope='module')
+def pool():
+    crawler = NetrCrawler()
+    pool = ParsePool(2, crawler.parser, crawler.get_pipeline(), max_pending=3)
+    yield pool
+    pool.close()
+
+
+def record():
+    return NetrCrawler().new_record('http://example.com/')
+
+
+def expected(html):
+    crawler = NetrCrawler()
+    return extract_page(crawler.get_pipeline(), crawler.parser, html, record())[0]
+
+
+@pytest.mark.parametrize('html', PAGES, ids=['links', 'forms', 'text'])
+def test_pool_matches_inline_extraction(pool, html):
+    extracted, parse_seconds, extract_seconds = pool.extract(html, record())
+    assert extracted == expected(html)
+    assert parse_seconds >= 0 and extract_seconds >= 0
+
+
+def test_pool_simhash(pool):
+    assert [pool.simhash(html) for html in PAGES] == [simhash(html) for html in PAGES]
+
+
+def test_concurrent_extracts(pool):
+    results = {}
+
+    def run(index):
+        results[index] = pool.extract(PAGES[index % len(PAGES)], record())[0]
+    threads = [threading.Thread(target=run, args=(index,)) for index in range(12)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(30)
+    assert results == {index: expected(PAGES[index % len(PAGES)]) for index in range(12)}
+
+
+def test_crawl_with_parse_workers():
+    site = SyntheticSite(pages=20, fanout=3, page_size=1024).start()
+    try:
+        crawled = []
+        for parse_workers in (0, 2):
+            crawler = NetrCrawler()
+            crawler.delay = 0
+            crawler.parse_workers = parse_workers
+            crawler.start_crawling(site.url())
+            assert crawler.parse_pool is None
+            crawled.append({record['url']: record for record in crawler.results})
+    finally:
+        site.stop()
+    assert len(crawled[0]) == site.pages
+    assert crawled[1] == crawled[0]
@@ -0,0 +1,128 @@
+import threading
+import time
+import types
+import pytest
+import requests
+import nftr_robots
+from nftr_robots import RobotsCache
+
+ROBOTS = 'User-agent: *\nDisallow: /private/\nCrawl-delay: 2\n'
+
+
+class FakeSession:
+    def __init__(self, status=200, text=ROBOTS, error=None, delay=0.0):
+        self.status = status
+        self.text = text
+        self.error = error
+        self.delay = delay
+        self.calls = []
+        self.lock = threading.Lock()
+        
+    def get(self, url, **kwargs):
+        with self.lock:
+            self.calls.append((url, kwargs.get('proxies')))
+        time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        response = requests.Response()
+        response.status_code = self.status
+        response._content = self.text.encode('utf-8')
+        response.encoding = 'utf-8'
+        return response
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(nftr_robots, 'time', types.SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+
+def concurrent_gets(cache, urls):
+    results = [None] * len(urls)
+    barrier = threading.Barrier(len(urls))
+
+    def run(index):
+        barrier.wait()
+        results[index] = cache.get(urls[index])
+    threads = [threading.Thread(target=run, args=(index,)) for index in range(len(urls))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+    return results
+
+
+def test_concurrent_lookups_fetch_once():
+    session = FakeSession(delay=0.2)
+    cache = RobotsCache(session)
+    results = concurrent_gets(cache, [f"http://example.com/page/{i}" for i in range(16)])
+    assert session.calls == [('http://example.com/robots.txt', None)]
+    assert results[0] is not None and all(result is results[0] for result in results)
+
+
+def test_cache_key_is_scheme_host_and_port():
+    session = FakeSession()
+    cache = RobotsCache(session)
+    for url in ('http://Example.com/a', 'http://example.com:80/b', 'https://example.com/c',
+                'https://example.com:8443/d', 'http://[::1]:8080/e', 'http://[::1]:8080/f'):
+        cache.get(url)
+    assert [url for url, _ in session.calls] == ['http://example.com/robots.txt', 'https://example.com/robots.txt',
+                                                 'https://example.com:8443/robots.txt',
+                                                 'http://[::1]:8080/robots.txt']
+
+
+def test_rules_and_crawl_delay():
+    cache = RobotsCache(FakeSession())
+    assert cache.can_fetch('http://example.com/public')
+    assert not cache.can_fetch('http://example.com/private/x')
+    assert cache.crawl_delay('http://example.com/') == 2
+
+
+@pytest.mark.parametrize('status, allowed', [(401, False), (403, False), (404, True), (410, True)])
+def test_client_errors(status, allowed):
+    cache = RobotsCache(FakeSession(status=status))
+    assert cache.can_fetch('http://example.com/private/x') is allowed
+    assert cache.can_fetch('http://example.com/') is allowed
+
+
+@pytest.mark.parametrize('session', [FakeSession(status=503), FakeSession(error=requests.Timeout('timed out')),
+                                     FakeSession(error=requests.ConnectionError('refused'))],
+                         ids=['server_error', 'timeout', 'connection_error'])
+def test_errors_cached_for_error_ttl(clock, session):
+    cache = RobotsCache(session, ttl=3600, error_ttl=300)
+    assert cache.get('http://example.com/') is None
+    assert cache.can_fetch('http://example.com/private/x')
+    assert cache.crawl_delay('http://example.com/') is None
+    clock[0] += 299
+    cache.get('http://example.com/')
+    assert len(session.calls) == 1
+    clock[0] += 1
+    cache.get('http://example.com/')
+    assert len(session.calls) == 2
+
+
+def test_success_cached_for_ttl(clock):
+    session = FakeSession()
+    cache = RobotsCache(session, ttl=3600, error_ttl=300)
+    cache.get('http://example.com/')
+    clock[0] += 3599
+    cache.get('http://example.com/')
+    assert len(session.calls) == 1
+    clock[0] += 1
+    cache.get('http://example.com/')
+    assert len(session.calls) == 2
+
+
+def test_concurrent_lookups_share_errors():
+    session = FakeSession(error=requests.Timeout('timed out'), delay=0.2)
+    cache = RobotsCache(session)
+    assert concurrent_gets(cache, ['http://example.com/'] * 8) == [None] * 8
+    assert len(session.calls) == 1
+
+
+def test_proxy():
+    session = FakeSession()
+    RobotsCache(session, get_proxy=lambda: 'http://proxy:3128').get('http://example.com/')
+    assert session.calls == [('http://example.com/robots.txt',
+                              {'http': 'http://proxy:3128', 'https': 'http://proxy:3128'})]
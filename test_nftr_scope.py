@@ -0,0 +1,105 @@
+import pytest
+from nftr_scope import CrawlScope, HostTrie, PatternSet
+
+DOMAIN = {'scope': 'domain'}
+HOST = {'scope': 'host'}
+PATTERNS = {'include': ['/blog/*', 're:^/news/\\d+$'], 'exclude': ['*?page=*', '/blog/drafts/*'],
+            'deny_extensions': ['PDF', '.zip', ' ']}
+HOSTS = {'allow_hosts': ['Example.COM.'], 'deny_hosts': ['ads.example.com']}
+CASES = {
+    'any_scope': ({}, (), 'http://anything.example/x', True),
+    'domain_seed_host': (DOMAIN, ['https://www.Example.com/'], 'http://www.example.com/', True),
+    'domain_bare_host': (DOMAIN, ['https://www.example.com/'], 'http://example.com/', True),
+    'domain_subdomain': (DOMAIN, ['https://www.example.com/'], 'http://a.b.example.com/', True),
+    'domain_host_case': (DOMAIN, ['https://www.example.com/'], 'http://EXAMPLE.COM/', True),
+    'domain_trailing_dot': (DOMAIN, ['https://www.example.com/'], 'http://example.com./x', True),
+    'domain_other_port': (DOMAIN, ['https://www.example.com/'], 'http://example.com:8080/', True),
+    'domain_suffix_attack': (DOMAIN, ['https://www.example.com/'], 'http://example.com.evil.org/', False),
+    'domain_prefix_lookalike': (DOMAIN, ['https://www.example.com/'], 'http://evilexample.com/', False),
+    'domain_parent': (DOMAIN, ['https://www.example.com/'], 'http://com/', False),
+    'domain_other_tld': (DOMAIN, ['https://www.example.com/'], 'http://example.co/', False),
+    'domain_no_host': (DOMAIN, ['https://www.example.com/'], 'http:///x', False),
+    'domain_ip': (DOMAIN, ['https://www.example.com/'], 'http://[::1]/', False),
+    'host_seed': (HOST, ['https://www.example.com./'], 'http://www.example.com/', True),
+    'host_trailing_dot': (HOST, ['https://www.example.com/'], 'http://WWW.example.com./', True),
+    'host_parent': (HOST, ['https://www.example.com/'], 'http://example.com/', False),
+    'host_subdomain': (HOST, ['https://www.example.com/'], 'http://a.www.example.com/', False),
+    'host_multiple_seeds': (HOST, ['http://a.example/', 'http://b.example/'], 'http://b.example/', True),
+    'allow_host': (HOSTS, (), 'http://example.com/', True),
+    'allow_subdomain': (HOSTS, (), 'http://www.example.com/', True),
+    'allow_other': (HOSTS, (), 'http://other.org/', False),
+    'deny_host': (HOSTS, (), 'http://ads.example.com/', False),
+    'deny_subdomain': (HOSTS, (), 'http://x.ads.example.com/', False),
+    'deny_lookalike': (HOSTS, (), 'http://adsx.example.com/', True),
+    'deny_beats_any': ({'deny_hosts': ['evil.org']}, (), 'http://cdn.EVIL.org./', False),
+    'allow_with_host_scope': ({'scope': 'host', 'allow_hosts': ['cdn.example']}, ['http://a.example/'],
+                              'http://img.cdn.example/', True),
+    'include_glob': (PATTERNS, (), 'http://a/blog/x', True),
+    'include_glob_segment_only': (PATTERNS, (), 'http://a/blogx/', False),
+    'include_regex': (PATTERNS, (), 'http://a/news/12', True),
+    'include_regex_anchored': (PATTERNS, (), 'http://a/news/12/x', False),
+    'include_miss': (PATTERNS, (), 'http://a/other', False),
+    'exclude_query': (PATTERNS, (), 'http://a/blog/x?page=2', False),
+    'exclude_glob': (PATTERNS, (), 'http://a/blog/drafts/1', False),
+    'deny_extension_case': (PATTERNS, (), 'http://a/blog/x.PDF', False),
+    'deny_extension_dot': (PATTERNS, (), 'http://a/blog/a.Zip', False),
+    'deny_extension_query_only': ({'deny_extensions': ['pdf']}, (), 'http://a/view?file=x.pdf', True),
+    'regex_unanchored': ({'include': ['re:/\\d{4}/']}, (), 'http://a/archive/2024/01', True)
+}
+
+
+@pytest.mark.parametrize('name', sorted(CASES))
+def test_allows(name):
+    options, seeds, url, expected = CASES[name]
+    scope = CrawlScope(**options)
+    scope.add_seeds(seeds)
+    scope.compile()
+    assert scope.allows(url) is expected
+
+
+def test_unrestricted():
+    assert not CrawlScope().restricted
+    assert CrawlScope(deny_extensions=['pdf']).restricted
+
+
+def test_unknown_scope():
+    with pytest.raises(ValueError):
+        CrawlScope('subdomain')
+
+
+def test_host_trie():
+    trie = HostTrie()
+    trie.add('example.com')
+    trie.add('Example.com.')
+    trie.add('exact.org', subdomains=False)
+    assert len(trie) == 2
+    assert trie.match('example.com') and trie.match('a.example.com')
+    assert trie.match('exact.org') and not trie.match('a.exact.org')
+    assert not trie.match('org') and not trie.match('')
+
+
+def test_pattern_set_groups_by_segment():
+    patterns = PatternSet(['/a/*', '/b/*.html', '*.php', 're:^/c'])
+    assert set(patterns.segments) == {'a', 'b'}
+    assert [patterns.match(target) for target in ('/a/x', '/b/x.html', '/b/x', '/d/x.php', '/c/d', '/d')] == [
+        True, True, False, True, True, False]
+
+
+def test_load(tmp_path):
+    path = tmp_path / 'scope.txt'
+    path.write_text('# rules\n\nallow example.com\ndeny ads.example.com\ninclude /docs/*\nexclude *.bak\n'
+                    'deny-extension .PDF\n', encoding='utf-8')
+    scope = CrawlScope().load(str(path))
+    assert scope.allows('http://www.example.com/docs/a')
+    assert not scope.allows('http://ads.example.com/docs/a')
+    assert not scope.allows('http://other.org/docs/a')
+    assert not scope.allows('http://example.com/docs/a.bak')
+    assert not scope.allows('http://example.com/docs/a.pdf')
+    assert not scope.allows('http://example.com/blog/')
+
+
+def test_load_unknown_rule(tmp_path):
+    path = tmp_path / 'scope.txt'
+    path.write_text('block example.com\n', encoding='utf-8')
+    with pytest.raises(ValueError):
+        CrawlScope().load(str(path))
@@ -0,0 +1,177 @@
+import csv
+import json
+import sqlite3
+import time
+import pytest
+from nftr_crawler import NetrCrawler
+from nftr_sinks import ResultSink, JsonSink, JsonLinesSink, CsvSink, SqliteSink
+
+RECORDS = [{'url': f"http://example.com/{i}", 'title': f"Page {i}", 'links': [{'href': f"/{i + 1}"}]}
+           for i in range(25)]
+
+PAGE = {
+    'url': 'http://example.com/docs/', 'timestamp': '2024-01-01T00:00:00', 'status_code': 200,
+    'title': 'Docs', 'text_content': 'hello world', 'security_headers': {'HSTS': 'max-age=1', 'CSP': 'x'},
+    'links': [{'href': 'a', 'text': 'A', 'rel': ['nofollow', 'noopener']},
+              {'href': 'https://other.org/b', 'text': 'B'}],
+    'images': [{'src': '/i.png', 'alt': 'I'}],
+    'forms': [{'action': '/login', 'method': 'post',
+               'inputs': [{'type': 'text', 'name': 'user', 'required': True}, {'type': 'password', 'name': 'pw'}]},
+              {'action': '/search', 'method': 'get', 'inputs': [{'type': 'text', 'name': 'q'}]}],
+    'technologies': ['jQuery', 'Bootstrap'], 'response_headers': {'Server': 'nginx'},
+    'secrets': {'aws_keys': ['AKIA1']}, 'emails': ['a@example.com', 'b@example.com'],
+    'structured_data': [{'@type': 'Article'}], 'ssl_certificate': {'issuer': {'commonName': 'CA'}}
+}
+
+
+class ListSink(ResultSink):
+    def __init__(self, **options):
+        super().__init__(**options)
+        self.batches = []
+        self.events = []
+        
+    def open(self):
+        self.events.append('open')
+        
+    def write_batch(self, records):
+        self.batches.append(list(records))
+        
+    def flush(self):
+        self.events.append('flush')
+        
+    def finalize(self):
+        self.events.append('finalize')
+
+
+class BrokenSink(ListSink):
+    def open(self):
+        raise OSError('disk full')
+
+
+def write_all(sink, records=RECORDS):
+    sink.start()
+    for record in records:
+        sink.write(record)
+    sink.close()
+    return sink
+
+
+def test_batches():
+    sink = write_all(ListSink(batch_size=10, flush_interval=60))
+    assert [len(batch) for batch in sink.batches] == [10, 10, 5]
+    assert [record for batch in sink.batches for record in batch] == RECORDS
+    assert sink.events == ['open', 'flush', 'flush', 'flush', 'finalize']
+    assert sink.count == len(RECORDS)
+
+
+def test_flush_interval():
+    sink = ListSink(batch_size=100, flush_interval=0.05).start()
+    sink.write(RECORDS[0])
+    for _ in range(100):
+        if sink.batches:
+            break
+        time.sleep(0.01)
+    assert sink.batches == [[RECORDS[0]]]
+    sink.close()
+
+
+def test_open_error_drains_queue(capsys):
+    sink = write_all(BrokenSink(batch_size=2))
+    assert sink.batches == [] and sink.count == 0
+    assert 'Error opening result sink: disk full' in capsys.readouterr().out
+
+
+@pytest.mark.parametrize('records', [RECORDS, RECORDS[:1], []], ids=['many', 'one', 'empty'])
+def test_json(tmp_path, records):
+    path = tmp_path / 'out.json'
+    write_all(JsonSink(str(path), batch_size=7), records)
+    assert json.loads(path.read_text(encoding='utf-8')) == records
+
+
+def test_json_lines(tmp_path):
+    path = tmp_path / 'out.jsonl'
+    records = RECORDS + [{'url': 'http://example.com/ü', 'title': 'Grüße\nzwei'}]
+    write_all(JsonLinesSink(str(path), batch_size=7), records)
+    lines = path.read_text(encoding='utf-8').splitlines()
+    assert [json.loads(line) for line in lines] == records
+
+
+def test_csv(tmp_path):
+    path = tmp_path / 'out.csv'
+    records = [{'url': 'http://a/', 'title': 'A'}, {'url': 'http://b/', 'title': 'B, "quoted"', 'emails': ['x@b']}]
+    write_all(CsvSink(str(path), extra_fields=('emails',)), records)
+    with open(path, newline='', encoding='utf-8') as file:
+        rows = list(csv.DictReader(file))
+    assert rows == [{'url': 'http://a/', 'title': 'A', 'emails': ''},
+                    {'url': 'http://b/', 'title': 'B, "quoted"', 'emails': "['x@b']"}]
+
+
+@pytest.mark.parametrize('format_type, sink_class', [('json', JsonSink), ('jsonl', JsonLinesSink), ('csv', CsvSink)])
+def test_export_results(tmp_path, format_type, sink_class):
+    crawler = NetrCrawler()
+    crawler.results = RECORDS[:3]
+    filename = str(tmp_path / 'results')
+    assert isinstance(crawler.create_sink(format_type, filename), sink_class)
+    crawler.export_results(format_type, filename)
+    assert (tmp_path / f"results.{format_type}").stat().st_size > 0
+
+
+def test_unknown_format():
+    with pytest.raises(ValueError):
+        NetrCrawler().create_sink('xml', 'results')
+
+
+def test_record_result_streams_to_sink():
+    crawler = NetrCrawler()
+    crawler.sink = ListSink(batch_size=2).start()
+    records = [crawler.new_record(record['url'], None) for record in RECORDS[:3]]
+    for record in records:
+        crawler.record_result(record)
+    crawler.sink.close()
+    assert crawler.results == []
+    assert crawler.sink.batches == [records[:2], records[2:]]
+    assert crawler.stats['pages'] == 3
+
+
+def query(path, sql):
+    with sqlite3.connect(path) as conn:
+        return conn.execute(sql).fetchall()
+
+
+def test_sqlite_tables(tmp_path):
+    path = str(tmp_path / 'out.db')
+    write_all(SqliteSink(path, match_fields=('emails',)), [PAGE, {'url': 'http://example.com/empty'}])
+    assert query(path, 'SELECT id, url, host, title, text_length, security_score FROM pages') == [
+        (1, 'http://example.com/docs/', 'example.com', 'Docs', 11, 2),
+        (2, 'http://example.com/empty', 'example.com', None, 0, 0)]
+    assert query(path, 'SELECT structured_data, ssl_certificate FROM pages WHERE id = 1') == [
+        ('[{"@type": "Article"}]', '{"issuer": {"commonName": "CA"}}')]
+    assert query(path, 'SELECT page_id, href, target_url, target_host, rel FROM links') == [
+        (1, 'a', 'http://example.com/docs/a', 'example.com', 'nofollow noopener'),
+        (1, 'https://other.org/b', 'https://other.org/b', 'other.org', '')]
+    assert query(path, 'SELECT page_id, src, alt FROM images') == [(1, '/i.png', 'I')]
+    assert query(path, 'SELECT id, page_id, action, method FROM forms') == [(1, 1, '/login', 'post'),
+                                                                           (2, 1, '/search', 'get')]
+    assert query(path, 'SELECT form_id, name, required FROM form_inputs') == [(1, 'user', 1), (1, 'pw', 0),
+                                                                             (2, 'q', 0)]
+    assert query(path, 'SELECT page_id, name FROM technologies') == [(1, 'jQuery'), (1, 'Bootstrap')]
+    assert query(path, 'SELECT page_id, name, value FROM headers') == [(1, 'Server', 'nginx')]
+    assert sorted(query(path, 'SELECT page_id, type, value FROM matches')) == [
+        (1, 'aws_keys', 'AKIA1'), (1, 'emails', 'a@example.com'), (1, 'emails', 'b@example.com')]
+
+
+def test_sqlite_summary_view(tmp_path):
+    path = str(tmp_path / 'out.db')
+    write_all(SqliteSink(path, summary_view='summary', match_fields=('emails',)), [PAGE])
+    assert query(path, 'SELECT * FROM summary') == [
+        ('http://example.com/docs/', 'Docs', None, 2, 1, 2, 11, 'jQuery, Bootstrap', 2, 2)]
+
+
+@pytest.mark.parametrize('skip_existing, pages, forms', [(False, 4, 4), (True, 3, 2)])
+def test_sqlite_reopen(tmp_path, skip_existing, pages, forms):
+    path = str(tmp_path / 'out.db')
+    write_all(SqliteSink(path), [PAGE, {'url': 'http://example.com/1'}])
+    write_all(SqliteSink(path, skip_existing=skip_existing), [PAGE, {'url': 'http://example.com/2'}])
+    assert query(path, 'SELECT COUNT(*), COUNT(DISTINCT id), MAX(id) FROM pages') == [(pages, pages, pages)]
+    assert query(path, 'SELECT COUNT(*), COUNT(DISTINCT id), MAX(id) FROM forms') == [(forms, forms, forms)]
+    assert query(path, 'SELECT url FROM pages ORDER BY id')[-1] == ('http://example.com/2',)
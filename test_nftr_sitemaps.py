@@ -0,0 +1,153 @@
+import datetime
+import gzip
+import io
+import xml.etree.ElementTree as ET
+import pytest
+import requests
+from nftr_frontier import CrawlFrontier
+from nftr_sitemaps import ChunkReader, SitemapSeeder, iter_sitemap, parse_lastmod, parse_priority
+from nftr_urls import UrlCanonicalizer
+
+BOM = b'\xef\xbb\xbf'
+URLSET = (b'<?xml version="1.0" encoding="UTF-8"?>\n'
+          b'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+          b'<url><loc> http://example.com/a </loc><lastmod>2024-01-31</lastmod><priority>0.8</priority></url>'
+          b'<url><loc>http://example.com/b</loc><priority>7</priority></url>'
+          b'<url><lastmod>2024-01-01</lastmod></url>'
+          b'<url><loc>http://example.com/c</loc><lastmod>yesterday</lastmod></url>'
+          b'</urlset>')
+URLSET_ENTRIES = [
+    ('url', 'http://example.com/a', datetime.datetime(2024, 1, 31, tzinfo=datetime.timezone.utc), 0.8),
+    ('url', 'http://example.com/b', None, 1.0),
+    ('url', 'http://example.com/c', None, None)
+]
+INDEX = (b'<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+         b'<sitemap><loc>http://example.com/one.xml</loc><lastmod>2024-02-01T10:00:00Z</lastmod></sitemap>'
+         b'<sitemap><loc>http://example.com/two.xml.gz</loc></sitemap>'
+         b'</sitemapindex>')
+TEXT = b'http://example.com/a\r\n\r\n  http://example.com/b  \nhttp://example.com/c'
+TEXT_ENTRIES = [('url', f"http://example.com/{name}", None, None) for name in 'abc']
+PAYLOADS = {
+    'urlset': (URLSET, URLSET_ENTRIES),
+    'urlset_bom': (BOM + URLSET, URLSET_ENTRIES),
+    'urlset_gzip': (gzip.compress(URLSET), URLSET_ENTRIES),
+    'urlset_gzip_bom': (gzip.compress(BOM + URLSET), URLSET_ENTRIES),
+    'urlset_leading_whitespace': (b'\n\t ' + URLSET[URLSET.index(b'<urlset'):], URLSET_ENTRIES),
+    'index': (INDEX, [('sitemap', 'http://example.com/one.xml',
+                       datetime.datetime(2024, 2, 1, 10, tzinfo=datetime.timezone.utc), None),
+                      ('sitemap', 'http://example.com/two.xml.gz', None, None)]),
+    'text': (TEXT, TEXT_ENTRIES),
+    'text_bom': (BOM + TEXT, TEXT_ENTRIES),
+    'text_gzip': (gzip.compress(TEXT), TEXT_ENTRIES),
+    'empty': (b'', [])
+}
+
+
+def chunked(data, size=7):
+    return ChunkReader(data[i:i + size] for i in range(0, len(data), size))
+
+
+class FakeCrawler:
+    timeout = 5
+    
+    def __init__(self, pages):
+        self.pages = pages
+        self.requested = []
+        self.seeded = []
+        self.session = self
+        self.frontier = CrawlFrontier(1000, 10)
+        self.canonicalizer = UrlCanonicalizer()
+        
+    def get(self, url, **kwargs):
+        self.requested.append(url)
+        response = requests.Response()
+        response.status_code = 200 if url in self.pages else 404
+        response.raw = io.BytesIO(self.pages.get(url, b''))
+        return response
+        
+    def canonical_url(self, url):
+        return self.canonicalizer.canonicalize(url)
+        
+    def check_robots_txt(self, url):
+        return None
+        
+    def request_options(self, url):
+        return {}
+        
+    def enqueue_many(self, batch):
+        self.seeded.extend(batch)
+        return len(batch)
+
+
+def seed(pages, since=None):
+    crawler = FakeCrawler(pages)
+    seeder = SitemapSeeder(crawler, ['http://example.com/'], since=since).start()
+    seeder.thread.join()
+    assert crawler.frontier.holds == 0
+    return crawler, seeder
+
+
+@pytest.mark.parametrize('name', sorted(PAYLOADS))
+def test_iter_sitemap(name):
+    data, expected = PAYLOADS[name]
+    assert list(iter_sitemap(chunked(data))) == expected
+
+
+def test_malformed_xml():
+    entries = iter_sitemap(chunked(URLSET[:URLSET.index(b'<url><lastmod>')] + b'<url><loc>http://x/</url>'))
+    assert next(entries)[1] == 'http://example.com/a'
+    assert next(entries)[1] == 'http://example.com/b'
+    with pytest.raises(ET.ParseError):
+        next(entries)
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('2024-01-31', datetime.datetime(2024, 1, 31, tzinfo=datetime.timezone.utc)),
+    ('2024-01-31T12:30:00+02:00', datetime.datetime(2024, 1, 31, 10, 30, tzinfo=datetime.timezone.utc)),
+    ('2024-01-31T12:30:00Z', datetime.datetime(2024, 1, 31, 12, 30, tzinfo=datetime.timezone.utc)),
+    ('', None),
+    ('31/01/2024', None)
+])
+def test_parse_lastmod(value, expected):
+    assert parse_lastmod(value) == expected
+
+
+@pytest.mark.parametrize('value, expected', [('0.3', 0.3), ('-1', 0.0), ('2', 1.0), ('high', None), (None, None)])
+def test_parse_priority(value, expected):
+    assert parse_priority(value) == expected
+
+
+def test_seeder_follows_index():
+    index = INDEX.replace(b'</sitemapindex>', b'<sitemap><loc>http://EXAMPLE.com/sitemap.xml</loc></sitemap>'
+                                              b'<sitemap><loc>http://example.com/missing.xml</loc></sitemap>'
+                                              b'</sitemapindex>')
+    pages = {
+        'http://example.com/sitemap.xml': index,
+        'http://example.com/one.xml': URLSET,
+        'http://example.com/two.xml.gz': gzip.compress(BOM + TEXT.replace(b'/a', b'/d'))
+    }
+    crawler, seeder = seed(pages)
+    assert crawler.requested == ['http://example.com/sitemap.xml', 'http://example.com/one.xml',
+                                 'http://example.com/two.xml.gz', 'http://example.com/missing.xml']
+    assert seeder.sitemaps == 3
+    assert crawler.seeded == [('http://example.com/a', 0, 0.8), ('http://example.com/b', 0, 1.0),
+                              ('http://example.com/c', 0, 0.5), ('http://example.com/d', 0, 0.5),
+                              ('http://example.com/b', 0, 0.5), ('http://example.com/c', 0, 0.5)]
+
+
+def test_seeder_since():
+    since = datetime.datetime(2024, 1, 15, tzinfo=datetime.timezone.utc)
+    crawler, _ = seed({'http://example.com/sitemap.xml': URLSET.replace(b'2024-01-31', b'2024-01-01')}, since)
+    assert [url for url, _, _ in crawler.seeded] == ['http://example.com/b', 'http://example.com/c']
+
+
+def test_seeder_survives_malformed_sitemap():
+    index = INDEX.replace(b'one.xml', b'broken.xml')
+    pages = {
+        'http://example.com/sitemap.xml': index,
+        'http://example.com/broken.xml': URLSET[:URLSET.index(b'<url><loc>http://example.com/b')] + b'<url',
+        'http://example.com/two.xml.gz': gzip.compress(TEXT)
+    }
+    crawler, _ = seed(pages)
+    assert [url for url, _, _ in crawler.seeded] == ['http://example.com/a', 'http://example.com/a',
+                                                     'http://example.com/b', 'http://example.com/c']
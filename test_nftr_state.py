@@ -0,0 +1,65 @@
+import pytest
+from nftr_bench import SyntheticSite
+from nftr_crawler import NetrCrawler
+from nftr_state import CrawlState
+
+
+def checkpoint(state_dir):
+    state = CrawlState(str(state_dir))
+    for index, url in enumerate(('http://a/1', 'http://a/2', 'http://a/3', 'http://a/4')):
+        state.add(url, index)
+    state.add('http://a/1', 9)
+    state.record('http://a/1', 200, {'url': 'http://a/1', 'title': 'One'})
+    state.finish('http://a/1', True)
+    state.record('http://a/2', 404)
+    state.finish('http://a/2', False)
+    state.record('http://a/3', 200, {'url': 'http://a/3'})
+    state.close()
+
+
+def test_checkpoint_and_resume(tmp_path):
+    checkpoint(tmp_path)
+    state = CrawlState(str(tmp_path), resume=True)
+    assert state.resumed
+    assert state.urls() == [('http://a/1', 0, 'done'), ('http://a/2', 1, 'skipped'), ('http://a/3', 2, 'pending'),
+                            ('http://a/4', 3, 'pending')]
+    assert list(state.records()) == [{'url': 'http://a/1', 'title': 'One'}]
+    state.close()
+
+
+@pytest.mark.parametrize('populated', [True, False])
+def test_fresh_state(tmp_path, populated):
+    if populated:
+        checkpoint(tmp_path)
+    state = CrawlState(str(tmp_path))
+    assert not state.resumed and state.urls() == []
+    state.close()
+    state = CrawlState(str(tmp_path), resume=True)
+    assert not state.resumed
+    state.close()
+
+
+def test_resumed_crawl_fetches_only_remaining_pages(tmp_path):
+    site = SyntheticSite(pages=40, fanout=3, page_size=1024, hosts=2).start()
+    try:
+        pages = sorted(site.url(page) for page in range(site.pages))
+        crawlers = []
+        for max_pages, resume in ((12, False), (1000, True)):
+            crawler = NetrCrawler()
+            crawler.delay = 0
+            crawler.max_pages = max_pages
+            crawler.max_threads = 4
+            crawler.state = CrawlState(str(tmp_path), resume=resume)
+            requests_before = site.requests
+            crawler.start_crawling(site.url())
+            crawler.state.close()
+            crawlers.append((crawler, site.requests - requests_before))
+    finally:
+        site.stop()
+    (first, _), (second, fetched) = crawlers
+    assert len(first.results) == 12
+    urls = [record['url'] for record in second.results]
+    assert sorted(urls) == pages
+    restored = {record['url']: record for record in first.results}
+    assert {record['url']: record for record in second.results if record['url'] in restored} == restored
+    assert fetched <= site.pages - len(restored) + site.hosts
@@ -0,0 +1,79 @@
+import threading
+import time
+import types
+import pytest
+import nftr_tls
+from nftr_tls import CertificateCache
+
+CERTIFICATE = {'issuer': {'commonName': 'Test CA'}, 'subject': {'commonName': 'example.com'}}
+
+
+class CountingCache(CertificateCache):
+    def __init__(self, certificate=CERTIFICATE, delay=0.0, **kwargs):
+        super().__init__(**kwargs)
+        self.certificate = certificate
+        self.delay = delay
+        self.calls = []
+        self.calls_lock = threading.Lock()
+        
+    def fetch(self, host, port):
+        with self.calls_lock:
+            self.calls.append((host, port))
+        time.sleep(self.delay)
+        return self.certificate
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(nftr_tls, 'time', types.SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+
+def test_concurrent_lookups_fetch_once():
+    cache = CountingCache(delay=0.2)
+    results = []
+    barrier = threading.Barrier(16)
+
+    def run(index):
+        barrier.wait()
+        results.append(cache.get(f"https://example.com/page/{index}"))
+    threads = [threading.Thread(target=run, args=(index,)) for index in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+    assert cache.calls == [('example.com', 443)]
+    assert results == [CERTIFICATE] * 16
+
+
+def test_cache_key_is_host_and_port():
+    cache = CountingCache()
+    for url in ('https://Example.com/a', 'https://example.com:443/b', 'https://example.com:8443/c',
+                'https://www.example.com/d'):
+        cache.get(url)
+    assert cache.calls == [('example.com', 443), ('example.com', 8443), ('www.example.com', 443)]
+
+
+@pytest.mark.parametrize('url', ['http://example.com/', 'ftp://example.com/', 'https:///path'])
+def test_not_https(url):
+    cache = CountingCache()
+    assert cache.get(url) is None
+    assert cache.calls == []
+
+
+@pytest.mark.parametrize('certificate, ttl', [(None, 300), (CERTIFICATE, 3600)], ids=['error', 'certificate'])
+def test_ttl(clock, certificate, ttl):
+    cache = CountingCache(certificate, ttl=3600, error_ttl=300)
+    assert cache.get('https://example.com/') == certificate
+    clock[0] += ttl - 1
+    cache.get('https://example.com/')
+    assert len(cache.calls) == 1
+    clock[0] += 1
+    cache.get('https://example.com/')
+    assert len(cache.calls) == 2
+
+
+def test_connection_errors_return_none():
+    cache = CertificateCache(timeout=1)
+    assert cache.fetch('127.0.0.1', 9) is None
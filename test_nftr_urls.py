@@ -0,0 +1,89 @@
+import pytest
+from nftr_urls import UrlCanonicalizer, normalize_escapes, remove_dot_segments, PATH_SAFE
+
+CASES = {
+    'lowercase_scheme_and_host': ('HTTP://Example.COM/Path', 'http://example.com/Path'),
+    'empty_path': ('https://example.com', 'https://example.com/'),
+    'default_http_port': ('http://example.com:80/', 'http://example.com/'),
+    'default_https_port': ('https://example.com:443/a', 'https://example.com/a'),
+    'other_port_kept': ('https://example.com:8443/', 'https://example.com:8443/'),
+    'http_port_on_https': ('https://example.com:80/', 'https://example.com:80/'),
+    'ipv6_default_port': ('http://[::1]:80/', 'http://[::1]/'),
+    'trailing_dot_host': ('http://example.com./x', 'http://example.com/x'),
+    'trailing_dots_host': ('http://EXAMPLE.com../x', 'http://example.com/x'),
+    'idna_host': ('http://bücher.example/', 'http://xn--bcher-kva.example/'),
+    'userinfo_kept': ('http://user:pw@Example.com/', 'http://user:pw@example.com/'),
+    'dot_segments': ('http://example.com/a/./b/../c', 'http://example.com/a/c'),
+    'dot_segments_above_root': ('http://example.com/../../x', 'http://example.com/x'),
+    'trailing_dot_segment': ('http://example.com/a/b/..', 'http://example.com/a/'),
+    'escaped_dots': ('http://example.com/a/%2e%2e/b', 'http://example.com/b'),
+    'escaped_dots_mixed_case': ('http://example.com/a/%2E%2e/%2e/b', 'http://example.com/b'),
+    'escaped_dots_trailing': ('http://example.com/a/b/%2E%2E', 'http://example.com/a/'),
+    'unreserved_escapes_decoded': ('http://example.com/%7euser/%41', 'http://example.com/~user/A'),
+    'reserved_escapes_uppercased': ('http://example.com/a%2fb%3a', 'http://example.com/a%2Fb%3A'),
+    'non_ascii_path': ('http://example.com/päth?q=ü', 'http://example.com/p%C3%A4th?q=%C3%BC'),
+    'space_in_path': ('http://example.com/a b', 'http://example.com/a%20b'),
+    'fragment_dropped': ('http://example.com/a#section', 'http://example.com/a'),
+    'tracking_params_dropped': ('http://example.com/?utm_source=x&id=1&fbclid=y&UTM_Medium=z',
+                                'http://example.com/?id=1'),
+    'only_tracking_params': ('http://example.com/p?gclid=1', 'http://example.com/p'),
+    'encoded_tracking_param': ('http://example.com/?utm%5Fsource=x&b=1', 'http://example.com/?b=1'),
+    'query_sorted': ('http://example.com/?b=2&a=1&c=3', 'http://example.com/?a=1&b=2&c=3'),
+    'repeated_params_keep_order': ('http://example.com/?b=1&a=2&a=1', 'http://example.com/?a=2&a=1&b=1'),
+    'empty_params_dropped': ('http://example.com/?&a=1&&', 'http://example.com/?a=1'),
+    'mailto': ('mailto:a@example.com', None),
+    'javascript': ('javascript:void(0)', None),
+    'ftp': ('ftp://example.com/file', None),
+    'no_host': ('http:///path', None),
+    'relative_without_base': ('/rel', None),
+    'bad_port': ('http://example.com:99999/', None)
+}
+OPTION_CASES = [
+    ({'sort_query': False}, 'http://example.com/?b=1&a=2', 'http://example.com/?b=1&a=2'),
+    ({'strip_fragments': False}, 'http://example.com/#x y', 'http://example.com/#x%20y'),
+    ({'strip_trailing_slash': True}, 'http://example.com/a/', 'http://example.com/a'),
+    ({'strip_trailing_slash': True}, 'http://example.com/', 'http://example.com/'),
+    ({'drop_params': ()}, 'http://example.com/?utm_source=x', 'http://example.com/?utm_source=x'),
+    ({'drop_params': ['sid', 'ref*']}, 'http://example.com/?sid=1&referrer=2&q=3', 'http://example.com/?q=3'),
+    ({'normalize_encoding': False}, 'http://example.com/%7e/%2e%2e/x', 'http://example.com/%7e/%2e%2e/x'),
+    ({'schemes': ('http', 'https', 'ftp')}, 'FTP://example.com/f', 'ftp://example.com/f')
+]
+
+
+@pytest.mark.parametrize('name', sorted(CASES))
+def test_canonicalize(name):
+    url, expected = CASES[name]
+    assert UrlCanonicalizer().canonicalize(url) == expected
+
+
+@pytest.mark.parametrize('name', sorted(name for name, (_, expected) in CASES.items() if expected))
+def test_idempotent(name):
+    canonicalizer = UrlCanonicalizer()
+    canonical = canonicalizer.canonicalize(CASES[name][0])
+    assert canonicalizer.canonicalize(canonical) == canonical
+
+
+@pytest.mark.parametrize('options, url, expected', OPTION_CASES)
+def test_options(options, url, expected):
+    assert UrlCanonicalizer(**options).canonicalize(url) == expected
+
+
+def test_relative_to_base():
+    canonicalizer = UrlCanonicalizer()
+    assert canonicalizer.canonicalize('../c?b=1&a=2#f', 'http://Example.com/a/b/') == 'http://example.com/a/c?a=2&b=1'
+    assert canonicalizer.canonicalize(' //other.example/x ', 'https://example.com/') == 'https://other.example/x'
+
+
+@pytest.mark.parametrize('path, expected', [
+    ('/a/b/c/./../../g', '/a/g'),
+    ('/a/b/../..', '/'),
+    ('/..', '/'),
+    ('/a/.', '/a/'),
+    ('', '')
+])
+def test_remove_dot_segments(path, expected):
+    assert remove_dot_segments(path) == expected
+
+
+def test_normalize_escapes():
+    assert normalize_escapes('/a%2db%2F%e2%82%ac', PATH_SAFE) == '/a-b%2F%E2%82%AC'
@@ -0,0 +1,129 @@
+import argparse
+import os
+import pytest
+from nftr_core import add_crawl_arguments, configure_crawler
+from nftr_crawler import NetrCrawler
+from nftr_visited import VisitedSet, FingerprintTable, BloomFilter, SPILL_MAGIC, is_spill_file, fingerprint
+
+URLS = [f"https://host{i % 7}.example/page/{i}" for i in range(5000)]
+
+
+def spill_set(path, memory_items=400, **kwargs):
+    visited = VisitedSet(str(path), memory_items=memory_items, expected_items=len(URLS), **kwargs)
+    for url in URLS:
+        visited.add(url)
+    return visited
+
+
+def parse_args(tmp_path, *argv):
+    parser = add_crawl_arguments(argparse.ArgumentParser(), NetrCrawler())
+    args = parser.parse_args(['http://example.com/', '--state-dir', str(tmp_path / 'state')] + list(argv))
+    return parser, args
+
+
+@pytest.mark.parametrize('error_rate', [0.001, 0])
+def test_membership_after_spills(tmp_path, error_rate):
+    visited = spill_set(tmp_path / 'visited.idx', error_rate=error_rate)
+    assert len(visited) == len(URLS)
+    assert visited.disk_items is not None and len(visited.disk_items) >= len(URLS) - 400
+    assert all(url in visited for url in URLS)
+    assert not any(f"https://other.example/{i}" in visited for i in range(5000))
+    visited.close()
+
+
+def test_duplicate_add(tmp_path):
+    visited = spill_set(tmp_path / 'visited.idx')
+    assert not any(visited.add(url) for url in URLS)
+    assert visited.add('https://new.example/')
+    assert not visited.add('https://new.example/')
+    assert len(visited) == len(URLS) + 1
+    visited.close()
+
+
+def test_in_memory_set():
+    visited = VisitedSet()
+    assert visited.add('https://a.example/') and not visited.add('https://a.example/')
+    assert 'https://a.example/' in visited and 'https://b.example/' not in visited
+    visited.close()
+
+
+def test_spill_file_is_sorted(tmp_path):
+    visited = spill_set(tmp_path / 'visited.idx')
+    items = visited.disk_items.tolist()
+    assert items == sorted(items) and len(set(items)) == len(items)
+    assert is_spill_file(visited.path)
+    visited.close()
+
+
+def test_sorted_values():
+    table = FingerprintTable()
+    values = [fingerprint(url) for url in URLS]
+    for value in values:
+        table.add(value)
+    assert list(table.sorted_values()) == sorted(set(values))
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(len(URLS), 0.01)
+    values = [fingerprint(url) for url in URLS]
+    for value in values:
+        bloom.add(value)
+    assert all(value in bloom for value in values)
+    assert sum(fingerprint(f"https://other.example/{i}") in bloom for i in range(5000)) < 150
+
+
+def test_close_removes_spill_file(tmp_path):
+    path = tmp_path / 'visited.idx'
+    visited = spill_set(path)
+    visited.close()
+    assert os.listdir(tmp_path) == []
+    visited.close()
+
+
+def test_refuses_existing_file(tmp_path):
+    path = tmp_path / 'visited.idx'
+    path.write_bytes(b'precious')
+    with pytest.raises(FileExistsError):
+        VisitedSet(str(path))
+    with pytest.raises(FileExistsError):
+        VisitedSet(str(path), replace=True)
+    assert path.read_bytes() == b'precious'
+
+
+def test_replaces_stale_spill_file(tmp_path):
+    path = tmp_path / 'visited.idx'
+    path.write_bytes(SPILL_MAGIC + bytes(16))
+    (tmp_path / 'visited.idx.tmp').write_bytes(SPILL_MAGIC)
+    with pytest.raises(FileExistsError):
+        VisitedSet(str(path))
+    visited = VisitedSet(str(path), replace=True)
+    assert 'https://a.example/' not in visited
+    visited.close()
+    assert os.listdir(tmp_path) == []
+
+
+def test_cli_refuses_existing_spill_file(tmp_path):
+    path = tmp_path / 'visited.idx'
+    path.write_bytes(SPILL_MAGIC)
+    parser, args = parse_args(tmp_path, '--visited-spill', str(path))
+    with pytest.raises(SystemExit):
+        configure_crawler(NetrCrawler(), args, parser)
+
+
+@pytest.mark.parametrize('contents, accepted', [(SPILL_MAGIC + bytes(8), True), (b'precious', False)])
+def test_cli_resume_with_leftover_spill_file(tmp_path, contents, accepted):
+    path = tmp_path / 'visited.idx'
+    path.write_bytes(contents)
+    parser, args = parse_args(tmp_path, '--visited-spill', str(path), '--resume')
+    crawler = NetrCrawler()
+    if not accepted:
+        with pytest.raises(SystemExit):
+            configure_crawler(crawler, args, parser)
+        assert path.read_bytes() == contents
+        return
+    configure_crawler(crawler, args, parser)
+    crawler.state.close()
+    visited = crawler.visited_factory()
+    assert path.read_bytes() == SPILL_MAGIC
+    visited.close()
+    assert not path.exists()